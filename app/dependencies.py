@@ -1,40 +1,105 @@
-from typing import Annotated, AsyncGenerator
+import time
+from typing import Annotated, Any, AsyncGenerator
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from jose import JWTError, jwt
-from sqlmodel import Session, select
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm.attributes import get_history
+from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from .internal.database import engine
-from .internal.env import ALGORITHM, SECRET_KEY
+from .internal.cache import LRUCache
+from .internal.database import engine, read_engine
+from .internal.env import (
+    ALGORITHM,
+    SECRET_KEY,
+    TOKEN_CACHE_SIZE,
+    USER_CACHE_SIZE,
+    USER_CACHE_TTL,
+)
 from .internal.security import oauth2_scheme
+from .internal.writes import SessionWriter, Writer
 from .models.users import User
 
+# Verified token -> username, cached until the token expires.
+token_cache: LRUCache[str, str] = LRUCache(
+    "tokens", maxsize=TOKEN_CACHE_SIZE, ttl=float("inf")
+)
+# Username -> detached copy of the user. Entries are dropped whenever a user is
+# updated or deleted through the ORM; the TTL bounds how long a change made
+# outside the application can go unnoticed.
+user_cache: LRUCache[str, User] = LRUCache(
+    "users", maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL
+)
 
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def invalidate_cached_user(mapper: Any, connection: Any, target: User) -> None:
+    for username in [target.username, *get_history(target, "username").deleted]:
+        user_cache.delete(username)
+
+
+READ_METHODS = frozenset({"GET", "HEAD"})
+
+
+def get_engine(request: Request) -> AsyncEngine:
+    """The read-only engine for GET and HEAD requests, the writer engine otherwise."""
+    return read_engine if request.method in READ_METHODS else engine
+
+
+async def get_session(
+    engine: Annotated[AsyncEngine, Depends(get_engine)],
+) -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSession(engine) as session:
         yield session
 
 
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """A session on the read-only engine, for reads that are not sent as GET."""
+    async with AsyncSession(read_engine) as session:
+        yield session
+
+
+def get_writer(
+    request: Request, session: Annotated[AsyncSession, Depends(get_session)]
+) -> Writer:
+    """The app's group commit writer if it has one, else one for this session."""
+    writer = getattr(request.app.state, "group_commit_writer", None)
+    return writer if writer is not None else SessionWriter(session)
+
+
 async def get_current_user(
-    session: Annotated[Session, Depends(get_session)],
+    session: Annotated[AsyncSession, Depends(get_session)],
     token: Annotated[str, Depends(oauth2_scheme)],
-):
+) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could Not Validate Credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username = payload.get("sub")
-        if username is None:
+    username = token_cache.get(token)
+    if username is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            username = payload.get("sub")
+            if username is None:
+                raise credentials_exception
+        except JWTError:
             raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    user = session.exec(select(User).where(User.username == username)).first()
+        expires_at = payload.get("exp")
+        ttl = None if expires_at is None else expires_at - time.time()
+        token_cache.set(token, username, ttl=ttl)
+
+    user = user_cache.get(username)
     if user is None:
-        raise credentials_exception
+        result = await session.exec(select(User).where(User.username == username))
+        user = result.first()
+        if user is None:
+            raise credentials_exception
+        user = User.model_validate(user)
+        user_cache.set(username, user)
     return user
 
 
@@ -0,0 +1,152 @@
+import asyncio
+import time
+from collections import deque
+
+# Priorities of requests waiting for admission, most important first.
+HIGH, NORMAL, LOW = 0, 1, 2
+PRIORITIES = (HIGH, NORMAL, LOW)
+
+
+class AIMDLimit:
+    """
+    Concurrency limit that adapts to the latency it observes.
+
+    Every request that finishes within `latency_target` seconds raises the limit by
+    `1 / limit`, so by one once `limit` requests have, up to `max_limit`. A request
+    that takes longer cuts it by the factor `backoff`, down to `min_limit`, at most
+    once per `latency_target`, so that the burst of slow responses to requests that
+    were admitted together counts as one signal.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        *,
+        min_limit: int = 1,
+        max_limit: int,
+        latency_target: float,
+        backoff: float = 0.9,
+    ) -> None:
+        self.value = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.decreased_at = float("-inf")
+
+    def __int__(self) -> int:
+        return int(self.value)
+
+    def update(self, latency: float, now: float) -> None:
+        if latency <= self.latency_target:
+            self.value = min(self.max_limit, self.value + 1 / self.value)
+        elif now - self.decreased_at >= self.latency_target:
+            self.value = max(self.min_limit, self.value * self.backoff)
+            self.decreased_at = now
+
+
+class AdmissionController:
+    """
+    Admits at most `limit` concurrent requests and queues at most `max_queue` more.
+
+    Queued requests are admitted by priority, then in arrival order, and give up
+    after `queue_timeout` seconds. When the queue is full, a request takes the place
+    of the last queued request of a lower priority, or is rejected if there is none.
+    `LOW` priority requests are never queued, so they are the first to be shed.
+
+    The controller never awaits between checking and taking a slot, so calls from
+    the event loop cannot interleave and no lock is needed.
+    """
+
+    def __init__(
+        self, name: str, limit: AIMDLimit, *, max_queue: int, queue_timeout: float
+    ) -> None:
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiters: dict[int, deque[asyncio.Future[bool]]] = {
+            priority: deque() for priority in PRIORITIES
+        }
+        controllers[name] = self
+
+    @property
+    def queued(self) -> int:
+        return sum(len(waiters) for waiters in self.waiters.values())
+
+    async def acquire(self, priority: int) -> bool:
+        """
+        Waits for a slot.
+
+        Returns:
+            Whether the request was admitted. If so, it must call `release` when it
+            is done.
+        """
+        if self.in_flight < int(self.limit) and not self.queued:
+            self.in_flight += 1
+            return True
+        if priority == LOW or (
+            self.queued >= self.max_queue and not self._evict(priority)
+        ):
+            return False
+
+        future: asyncio.Future[bool] = asyncio.get_running_loop().create_future()
+        waiters = self.waiters[priority]
+        waiters.append(future)
+        timer = asyncio.get_running_loop().call_later(
+            self.queue_timeout, self._expire, waiters, future
+        )
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled() and future.result():
+                self.release(None)
+            elif future in waiters:
+                waiters.remove(future)
+            raise
+        finally:
+            timer.cancel()
+
+    def release(self, latency: float | None) -> None:
+        """Frees the slot of a request, which took `latency` seconds if it is known."""
+        self.in_flight -= 1
+        if latency is not None:
+            self.limit.update(latency, time.monotonic())
+        while self.in_flight < int(self.limit):
+            future = self._next()
+            if future is None:
+                break
+            self.in_flight += 1
+            future.set_result(True)
+
+    def _next(self) -> asyncio.Future[bool] | None:
+        for priority in PRIORITIES:
+            waiters = self.waiters[priority]
+            while waiters:
+                future = waiters.popleft()
+                if not future.done():
+                    return future
+        return None
+
+    def _evict(self, priority: int) -> bool:
+        for lower in reversed(PRIORITIES):
+            if lower <= priority:
+                break
+            waiters = self.waiters[lower]
+            while waiters:
+                future = waiters.pop()
+                if not future.done():
+                    future.set_result(False)
+                    return True
+        return False
+
+    def _expire(
+        self, waiters: deque[asyncio.Future[bool]], future: asyncio.Future[bool]
+    ) -> None:
+        if not future.done():
+            waiters.remove(future)
+            future.set_result(False)
+
+
+controllers: dict[str, AdmissionController] = {}
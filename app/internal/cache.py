@@ -0,0 +1,97 @@
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, Protocol, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+K_contra = TypeVar("K_contra", bound=Hashable, contravariant=True)
+
+
+class Cache(Protocol[K_contra, V]):
+    """
+    A cache backend. `LRUCache` keeps entries in process memory; a backend shared
+    between processes only needs to provide the same methods.
+    """
+
+    def get(self, key: K_contra) -> V | None: ...
+
+    def set(self, key: K_contra, value: V, *, ttl: float | None = None) -> None: ...
+
+    def delete(self, key: K_contra) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def stats(self) -> dict[str, float]: ...
+
+
+class LRUCache(Generic[K, V]):
+    """
+    In-process cache that evicts the least recently used entry once it holds
+    `maxsize` entries and expires entries `ttl` seconds after they were set.
+
+    A `maxsize` of 0 disables the cache.
+    """
+
+    def __init__(self, name: str, *, maxsize: int, ttl: float) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        caches[name] = self
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: K) -> V | None:
+        entry = self.entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self.entries[key]
+        self.misses += 1
+        return None
+
+    def set(self, key: K, value: V, *, ttl: float | None = None) -> None:
+        """Caches `value` for `ttl` seconds, but never for longer than `self.ttl`."""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if self.maxsize <= 0 or ttl <= 0:
+            return
+        self.entries[key] = (time.monotonic() + ttl, value)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def delete(self, key: K) -> None:
+        self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+        }
+
+
+caches: dict[str, LRUCache] = {}
+
+
+def clear_caches() -> None:
+    for cache in caches.values():
+        cache.clear()
@@ -0,0 +1,34 @@
+import asyncio
+
+
+class ChangeNotifier:
+    """
+    Wakes up the requests waiting for the next write.
+
+    Only writes made by this process are notified. Waiters that must also see writes
+    made by other workers should wait with a timeout and check again.
+    """
+
+    def __init__(self) -> None:
+        self._waiters: set[asyncio.Future[None]] = set()
+
+    def notify(self) -> None:
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        self._waiters.clear()
+
+    async def wait(self, timeout: float) -> bool:
+        """Returns whether a write was notified within `timeout` seconds."""
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiters.discard(waiter)
+
+
+movie_changes = ChangeNotifier()
@@ -1,13 +1,100 @@
-from sqlalchemy.ext.asyncio import create_async_engine
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlmodel import SQLModel
 
-sqlite_file_name = "database.db"
-sqlite_url = f"sqlite+aiosqlite:///{sqlite_file_name}"
+from .env import (
+    DATABASE_ECHO,
+    DATABASE_PATH,
+    DATABASE_READERS,
+    SQLITE_BUSY_TIMEOUT,
+    SQLITE_CACHE_SIZE,
+    SQLITE_MMAP_SIZE,
+    SQLITE_SYNCHRONOUS,
+)
+from .metrics import InstrumentedQueuePool, instrument_engine
+
+
+def create_engine(
+    path: str,
+    *,
+    pool_size: int = 1,
+    readonly: bool = False,
+    echo: bool = False,
+    synchronous: str = "NORMAL",
+    cache_size: int = -64000,
+    mmap_size: int = 0,
+    busy_timeout: int = 5000,
+    name: str | None = None,
+) -> AsyncEngine:
+    """
+    Creates an engine for a SQLite database with at most `pool_size` connections.
+
+    Every new connection is switched to WAL mode, in which readers and the writer do
+    not block each other, and waits up to `busy_timeout` milliseconds for a lock
+    instead of failing with "database is locked". Connections of a `readonly` engine
+    refuse to write.
+
+    With a `name`, the engine's statements and pool checkouts are recorded in the
+    metrics under that name.
+    """
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{path}",
+        echo=echo,
+        connect_args={"check_same_thread": False},
+        poolclass=AsyncAdaptedQueuePool if name is None else InstrumentedQueuePool,
+        pool_logging_name=name,
+        pool_size=pool_size,
+        max_overflow=0,
+    )
+    if name is not None:
+        instrument_engine(engine, name)
+    pragmas = [
+        f"PRAGMA busy_timeout = {busy_timeout:d}",
+        "PRAGMA journal_mode = WAL",
+        f"PRAGMA synchronous = {synchronous}",
+        f"PRAGMA cache_size = {cache_size:d}",
+        f"PRAGMA mmap_size = {mmap_size:d}",
+    ]
+    if readonly:
+        pragmas.append("PRAGMA query_only = ON")
 
-connect_args = {"check_same_thread": False}
-engine = create_async_engine(sqlite_url, echo=True, connect_args=connect_args)
+    @event.listens_for(engine.sync_engine, "connect")
+    def apply_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    return engine
+
+
+engine_options: dict[str, Any] = {
+    "echo": DATABASE_ECHO,
+    "synchronous": SQLITE_SYNCHRONOUS,
+    "cache_size": SQLITE_CACHE_SIZE,
+    "mmap_size": SQLITE_MMAP_SIZE,
+    "busy_timeout": SQLITE_BUSY_TIMEOUT,
+}
+# SQLite allows a single writer at a time, so writes queue up for one connection
+# in the pool rather than for the database lock, while reads spread across several.
+engine = create_engine(DATABASE_PATH, name="writer", **engine_options)
+read_engine = create_engine(
+    DATABASE_PATH,
+    pool_size=DATABASE_READERS,
+    readonly=True,
+    name="reader",
+    **engine_options,
+)
 
 
 async def create_db_and_tables() -> None:
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
+
+
+async def dispose_engines() -> None:
+    await engine.dispose()
+    await read_engine.dispose()
@@ -78,3 +78,199 @@ ENVIRONMENT: str = getenv(
     default="DEVELOPMENT",
     allowed_values=["DEVELOPMENT", "STAGING", "PRODUCTION"],
 )
+RATE_LIMIT_KEYS: list[str] = getenv(
+    "RATE_LIMIT_KEYS",
+    default="ip",
+    converter=lambda x: [key.strip() for key in x.split(",")],
+)
+RATE_LIMIT_MAX_CLIENTS: int = getenv(
+    "RATE_LIMIT_MAX_CLIENTS",
+    default="100000",
+    converter=lambda x: int(x),
+)
+RATE_LIMIT_BACKEND: str = getenv(
+    "RATE_LIMIT_BACKEND",
+    default="memory",
+    allowed_values=["memory", "sqlite"],
+)
+RATE_LIMIT_SQLITE_PATH: str = getenv(
+    "RATE_LIMIT_SQLITE_PATH",
+    default="ratelimit.db",
+)
+BCRYPT_ROUNDS: int = getenv(
+    "BCRYPT_ROUNDS",
+    default="12",
+    converter=lambda x: int(x),
+)
+PASSWORD_WORKERS: int = getenv(
+    "PASSWORD_WORKERS",
+    default="2",
+    converter=lambda x: int(x),
+)
+PASSWORD_MAX_PENDING: int = getenv(
+    "PASSWORD_MAX_PENDING",
+    default="32",
+    converter=lambda x: int(x),
+)
+PASSWORD_QUEUE_TIMEOUT: float = getenv(
+    "PASSWORD_QUEUE_TIMEOUT",
+    default="1.0",
+    converter=lambda x: float(x),
+)
+TOKEN_CACHE_SIZE: int = getenv(
+    "TOKEN_CACHE_SIZE",
+    default="10000",
+    converter=lambda x: int(x),
+)
+USER_CACHE_SIZE: int = getenv(
+    "USER_CACHE_SIZE",
+    default="10000",
+    converter=lambda x: int(x),
+)
+USER_CACHE_TTL: float = getenv(
+    "USER_CACHE_TTL",
+    default="60",
+    converter=lambda x: float(x),
+)
+MOVIE_CACHE_SIZE: int = getenv(
+    "MOVIE_CACHE_SIZE",
+    default="10000",
+    converter=lambda x: int(x),
+)
+MOVIE_CACHE_TTL: float = getenv(
+    "MOVIE_CACHE_TTL",
+    default="5",
+    converter=lambda x: float(x),
+)
+DATABASE_PATH: str = getenv(
+    "DATABASE_PATH",
+    default="database.db",
+)
+DATABASE_ECHO: bool = getenv(
+    "DATABASE_ECHO",
+    default="false",
+    allowed_values=["true", "false"],
+    converter=lambda x: x == "true",
+)
+DATABASE_READERS: int = getenv(
+    "DATABASE_READERS",
+    default="4",
+    converter=lambda x: int(x),
+)
+SQLITE_SYNCHRONOUS: str = getenv(
+    "SQLITE_SYNCHRONOUS",
+    default="NORMAL",
+    allowed_values=["OFF", "NORMAL", "FULL", "EXTRA"],
+)
+SQLITE_CACHE_SIZE: int = getenv(
+    "SQLITE_CACHE_SIZE",
+    default="-64000",
+    converter=lambda x: int(x),
+)
+SQLITE_MMAP_SIZE: int = getenv(
+    "SQLITE_MMAP_SIZE",
+    default="268435456",
+    converter=lambda x: int(x),
+)
+SQLITE_BUSY_TIMEOUT: int = getenv(
+    "SQLITE_BUSY_TIMEOUT",
+    default="5000",
+    converter=lambda x: int(x),
+)
+GROUP_COMMIT: bool = getenv(
+    "GROUP_COMMIT",
+    default="false",
+    allowed_values=["true", "false"],
+    converter=lambda x: x == "true",
+)
+GROUP_COMMIT_WINDOW: float = getenv(
+    "GROUP_COMMIT_WINDOW",
+    default="0.002",
+    converter=lambda x: float(x),
+)
+GROUP_COMMIT_MAX_BATCH: int = getenv(
+    "GROUP_COMMIT_MAX_BATCH",
+    default="100",
+    converter=lambda x: int(x),
+)
+LOG_FILE: str = getenv(
+    "LOG_FILE",
+    default="app.log",
+)
+LOG_MAX_BYTES: int = getenv(
+    "LOG_MAX_BYTES",
+    default="10485760",
+    converter=lambda x: int(x),
+)
+LOG_ROTATE_INTERVAL: float = getenv(
+    "LOG_ROTATE_INTERVAL",
+    default="86400",
+    converter=lambda x: float(x),
+)
+LOG_BACKUP_COUNT: int = getenv(
+    "LOG_BACKUP_COUNT",
+    default="5",
+    converter=lambda x: int(x),
+)
+LOG_QUEUE_SIZE: int = getenv(
+    "LOG_QUEUE_SIZE",
+    default="10000",
+    converter=lambda x: int(x),
+)
+LOG_OVERFLOW: str = getenv(
+    "LOG_OVERFLOW",
+    default="drop",
+    allowed_values=["drop", "block"],
+)
+LOG_DEBUG_SAMPLE_RATE: float = getenv(
+    "LOG_DEBUG_SAMPLE_RATE",
+    default="1",
+    converter=lambda x: float(x),
+)
+METRICS_ENABLED: bool = getenv(
+    "METRICS_ENABLED",
+    default="true",
+    allowed_values=["true", "false"],
+    converter=lambda x: x == "true",
+)
+PROFILER_ENABLED: bool = getenv(
+    "PROFILER_ENABLED",
+    default="false",
+    allowed_values=["true", "false"],
+    converter=lambda x: x == "true",
+)
+PROFILER_SAMPLE_RATE: float = getenv(
+    "PROFILER_SAMPLE_RATE",
+    default="0",
+    converter=lambda x: float(x),
+)
+PROFILER_DIR: str = getenv(
+    "PROFILER_DIR",
+    default="profiles",
+)
+ADMISSION_CONTROL: bool = getenv(
+    "ADMISSION_CONTROL",
+    default="true",
+    allowed_values=["true", "false"],
+    converter=lambda x: x == "true",
+)
+ADMISSION_MAX_CONCURRENCY: int = getenv(
+    "ADMISSION_MAX_CONCURRENCY",
+    default="64",
+    converter=lambda x: int(x),
+)
+ADMISSION_MAX_QUEUE: int = getenv(
+    "ADMISSION_MAX_QUEUE",
+    default="128",
+    converter=lambda x: int(x),
+)
+ADMISSION_QUEUE_TIMEOUT: float = getenv(
+    "ADMISSION_QUEUE_TIMEOUT",
+    default="1.0",
+    converter=lambda x: float(x),
+)
+ADMISSION_LATENCY_TARGET: float = getenv(
+    "ADMISSION_LATENCY_TARGET",
+    default="0.5",
+    converter=lambda x: float(x),
+)
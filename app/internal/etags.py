@@ -0,0 +1,59 @@
+import hashlib
+from typing import Iterable
+
+
+def movie_etag(movie_id: int, version: int) -> str:
+    return f'"{movie_id}-{version}"'
+
+
+def page_etag(versions: Iterable[tuple[int | None, int]]) -> str:
+    """ETag of a list page, given the `(id, version)` of each movie on it, in order."""
+    digest = hashlib.blake2b(digest_size=16)
+    for movie_id, version in versions:
+        digest.update(f"{movie_id}-{version},".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def parse_etags(header: str, *, weak: bool = True) -> list[str]:
+    """
+    Parses the value of an `If-Match` or `If-None-Match` header.
+
+    Weak validators are returned without their `W/` prefix, or dropped if `weak` is
+    false, as `If-Match` requires a strong comparison.
+    """
+    etags = []
+    for etag in header.split(","):
+        etag = etag.strip()
+        if etag.startswith("W/"):
+            if not weak:
+                continue
+            etag = etag[2:]
+        if etag:
+            etags.append(etag)
+    return etags
+
+
+def none_match(header: str | None, etag: str) -> bool:
+    """Whether an `If-None-Match` header lets the request through."""
+    if header is None:
+        return True
+    etags = parse_etags(header)
+    return "*" not in etags and etag not in etags
+
+
+def matching_versions(header: str, movie_id: int) -> list[int] | None:
+    """
+    The versions of a movie that an `If-Match` header accepts, or None if it accepts
+    any version.
+    """
+    etags = parse_etags(header, weak=False)
+    if "*" in etags:
+        return None
+    versions = []
+    prefix = f'"{movie_id}-'
+    for etag in etags:
+        if etag.startswith(prefix) and etag.endswith('"'):
+            version = etag[len(prefix) : -1]
+            if version.isdigit():
+                versions.append(int(version))
+    return versions
@@ -1,10 +1,28 @@
+import atexit
+import datetime as dt
+import fcntl
+import json
 import logging
 import os
+import queue
+import random
+import threading
+import time
 from pathlib import Path
+from typing import Any, TextIO
 
 import structlog
 
-from .env import LOG_LEVEL
+from .env import (
+    LOG_BACKUP_COUNT,
+    LOG_DEBUG_SAMPLE_RATE,
+    LOG_FILE,
+    LOG_LEVEL,
+    LOG_MAX_BYTES,
+    LOG_OVERFLOW,
+    LOG_QUEUE_SIZE,
+    LOG_ROTATE_INTERVAL,
+)
 
 
 def set_process_id(_, __, event_dict):
@@ -12,17 +30,216 @@ def set_process_id(_, __, event_dict):
     return event_dict
 
 
+class LogSink:
+    """
+    Writes log events to a file from a background thread.
+
+    Callers only put the event on a bounded queue. The thread renders the events as
+    JSON lines and writes them in batches, appending to `path` and rotating it once
+    it reaches `max_bytes` or every `rotate_interval` seconds, whichever comes first,
+    keeping `backup_count` old files. Either limit can be disabled with 0.
+
+    Every worker process writes to the same `path`. Rotation holds an exclusive
+    lock on `<path>.lock`, and is skipped if another process has rotated the file
+    since it was opened. A process whose file was rotated by another reopens `path`
+    before its next batch, so that no process keeps writing to a backup for long.
+
+    When the queue is full, an event is dropped, or with `overflow="block"` waits up
+    to `block_timeout` seconds for room first. Dropped events are counted, and the
+    count is written to the log once there is room again.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        max_bytes: int = 0,
+        rotate_interval: float = 0,
+        backup_count: int = 5,
+        queue_size: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 0.5,
+        overflow: str = "drop",
+        block_timeout: float = 0.01,
+    ) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block = overflow == "block"
+        self.block_timeout = block_timeout
+        self.written = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self._reported_dropped = 0
+        self._queue: queue.Queue[dict[str, Any] | None] = queue.Queue(queue_size)
+        self._file = self._open()
+        self._thread = threading.Thread(target=self._run, name="log-sink", daemon=True)
+        self._thread.start()
+
+    def put(self, event_dict: dict[str, Any]) -> None:
+        try:
+            if self.block:
+                self._queue.put(event_dict, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(event_dict)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        """Writes out the events that are still queued and stops the thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._file.close()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "sampled_out": self.sampled_out,
+        }
+
+    def _open(self) -> TextIO:
+        file = self.path.open("at", encoding="utf-8")
+        self._inode = os.fstat(file.fileno()).st_ino
+        self._rollover_at = (
+            time.time() + self.rotate_interval if self.rotate_interval else None
+        )
+        return file
+
+    def _run(self) -> None:
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            self._write([event for event in batch if event is not None])
+            if stop:
+                return
+
+    def _write(self, events: list[dict[str, Any]]) -> None:
+        dropped = self.dropped - self._reported_dropped
+        if dropped:
+            self._reported_dropped += dropped
+            events.append(
+                {
+                    "event": "log_events_dropped",
+                    "count": dropped,
+                    "level": "warning",
+                    "timestamp": dt.datetime.now(dt.timezone.utc)
+                    .isoformat()
+                    .replace("+00:00", "Z"),
+                }
+            )
+        if not events:
+            return
+        if self._rotated_elsewhere():
+            self._file.close()
+            self._file = self._open()
+        self._file.write(
+            "".join(json.dumps(event, default=str) + "\n" for event in events)
+        )
+        self._file.flush()
+        self.written += len(events)
+        if self._should_rotate():
+            self._rotate()
+
+    def _should_rotate(self) -> bool:
+        # The size on disk includes what the other processes wrote.
+        if self.max_bytes and os.fstat(self._file.fileno()).st_size >= self.max_bytes:
+            return True
+        return self._rollover_at is not None and time.time() >= self._rollover_at
+
+    def _rotated_elsewhere(self) -> bool:
+        try:
+            return os.stat(self.path).st_ino != self._inode
+        except FileNotFoundError:
+            return True
+
+    def _rotate(self) -> None:
+        self._file.close()
+        lock_path = self.path.with_name(f"{self.path.name}.lock")
+        with lock_path.open("a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if not self._rotated_elsewhere():
+                self._shift_backups()
+        self._file = self._open()
+
+    def _shift_backups(self) -> None:
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                source = self.path.with_name(f"{self.path.name}.{i}")
+                if source.exists():
+                    source.replace(self.path.with_name(f"{self.path.name}.{i + 1}"))
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink(missing_ok=True)
+
+
+class QueueLogger:
+    """A structlog logger that hands the final event dict over to a `LogSink`."""
+
+    def __init__(self, sink: LogSink) -> None:
+        self.sink = sink
+
+    def msg(self, **event_dict: Any) -> None:
+        self.sink.put(event_dict)
+
+    log = debug = info = warn = warning = msg
+    fatal = failure = err = error = critical = exception = msg
+
+
+class QueueLoggerFactory:
+    def __init__(self, sink: LogSink) -> None:
+        self.sink = sink
+
+    def __call__(self, *args: Any) -> QueueLogger:
+        return QueueLogger(self.sink)
+
+
+def sample_debug(rate: float, sink: LogSink):
+    """Returns a processor that keeps only a `rate` fraction of debug events."""
+
+    def processor(_, method_name: str, event_dict):
+        if method_name == "debug" and random.random() >= rate:
+            sink.sampled_out += 1
+            raise structlog.DropEvent
+        return event_dict
+
+    return processor
+
+
+sink = LogSink(
+    LOG_FILE,
+    max_bytes=LOG_MAX_BYTES,
+    rotate_interval=LOG_ROTATE_INTERVAL,
+    backup_count=LOG_BACKUP_COUNT,
+    queue_size=LOG_QUEUE_SIZE,
+    overflow=LOG_OVERFLOW,
+)
+atexit.register(sink.close)
+
 level = getattr(logging, LOG_LEVEL)
+processors: list[Any] = [
+    structlog.processors.TimeStamper(fmt="iso"),
+    structlog.processors.add_log_level,
+    set_process_id,
+]
+if LOG_DEBUG_SAMPLE_RATE < 1:
+    processors.insert(0, sample_debug(LOG_DEBUG_SAMPLE_RATE, sink))
 structlog.configure(
     wrapper_class=structlog.make_filtering_bound_logger(level),
-    processors=[
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.add_log_level,
-        set_process_id,
-        structlog.processors.JSONRenderer(),
-    ],
-    logger_factory=structlog.WriteLoggerFactory(
-        file=Path("app").with_suffix(".log").open("wt")
-    ),
+    processors=processors,
+    logger_factory=QueueLoggerFactory(sink),
 )
 logger: structlog.stdlib.BoundLogger = structlog.get_logger()
@@ -0,0 +1,216 @@
+import bisect
+import math
+import time
+from collections import defaultdict
+from typing import Any, Callable, Iterable, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+Labels = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Iterable[str]) -> str:
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return f"{{{pairs}}}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: defaultdict[Labels, float] = defaultdict(float)
+        registry.append(self)
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] += amount
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        for labels, value in sorted(self.values.items()):
+            lines.append(
+                f"{self.name}{_format_labels(self.labelnames, labels)} "
+                f"{_format_value(value)}"
+            )
+        return lines
+
+
+class Histogram:
+    """
+    Counts observations into cumulative buckets, as Prometheus expects. Recording
+    one is a binary search and two additions.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.counts: dict[Labels, list[int]] = {}
+        self.sums: defaultdict[Labels, float] = defaultdict(float)
+        registry.append(self)
+
+    def observe(self, value: float, *labels: str) -> None:
+        counts = self.counts.get(labels)
+        if counts is None:
+            counts = self.counts[labels] = [0] * (len(self.buckets) + 1)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sums[labels] += value
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        labelnames = (*self.labelnames, "le")
+        for labels, counts in sorted(self.counts.items()):
+            total = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                total += count
+                le = _format_labels(labelnames, (*labels, _format_value(bound)))
+                lines.append(f"{self.name}_bucket{le} {total}")
+            formatted = _format_labels(self.labelnames, labels)
+            lines.append(
+                f"{self.name}_sum{formatted} {_format_value(self.sums[labels])}"
+            )
+            lines.append(f"{self.name}_count{formatted} {total}")
+        return lines
+
+
+class Gauge:
+    """A gauge whose values are read from `collect` when the metrics are rendered."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        collect: Callable[[], dict[Labels, float]],
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+        registry.append(self)
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+        ]
+        for labels, value in sorted(self.collect().items()):
+            lines.append(
+                f"{self.name}{_format_labels(self.labelnames, labels)} "
+                f"{_format_value(value)}"
+            )
+        return lines
+
+
+registry: list[Counter | Histogram | Gauge] = []
+
+
+def render_metrics() -> str:
+    return "\n".join(line for metric in registry for line in metric.render()) + "\n"
+
+
+http_requests = Counter(
+    "http_requests_total",
+    "Requests by route template, method and status code.",
+    ["route", "method", "status"],
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the end of its response.",
+    ["route", "method"],
+)
+db_statements = Counter(
+    "db_statements_total", "SQL statements executed.", ["engine", "operation"]
+)
+db_statement_duration = Histogram(
+    "db_statement_duration_seconds",
+    "Time spent executing SQL statements.",
+    ["engine", "operation"],
+)
+db_pool_checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool, including opening one.",
+    ["engine"],
+)
+rate_limit_rejections = Counter(
+    "rate_limit_rejections_total", "Requests rejected by the rate limiter."
+)
+rate_limit_errors = Counter(
+    "rate_limit_errors_total",
+    "Requests let through unchecked because the rate limiter's database was locked.",
+)
+admission_rejections = Counter(
+    "admission_rejections_total",
+    "Requests shed by admission control, by route.",
+    ["route"],
+)
+
+OPERATIONS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE"})
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """A pool that records how long each checkout waited for a connection."""
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait.observe(
+                time.perf_counter() - start, self.logging_name or "default"
+            )
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Records the count and duration of every statement executed by `engine`."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("metrics_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        elapsed = time.perf_counter() - conn.info["metrics_start"].pop()
+        words = statement[:16].split(None, 1)
+        operation = words[0].upper() if words else ""
+        if operation not in OPERATIONS:
+            operation = "OTHER"
+        db_statements.inc(name, operation)
+        db_statement_duration.observe(elapsed, name, operation)
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def handle_error(context):
+        if context.connection is not None:
+            starts = context.connection.info.get("metrics_start")
+            if starts:
+                starts.pop()
@@ -0,0 +1,75 @@
+from typing import Hashable, Iterable
+
+from app.models.movies import Movie
+
+from .cache import Cache, LRUCache
+from .env import MOVIE_CACHE_SIZE, MOVIE_CACHE_TTL
+
+# Rendered JSON body, ETag and next cursor of a list page.
+Page = tuple[bytes, str, str | None]
+
+
+class MovieCache:
+    """
+    Read-through cache of movies by id and of list pages.
+
+    Every write bumps `generation`, which is part of the key of every cached page,
+    so a page cached before a write is never served after it. A movie read from the
+    database is only cached if no write happened while it was being read, and a
+    movie written by an update never replaces a cached one with a higher `version`.
+
+    Each process has its own cache, so writes made by other workers are only picked
+    up once the entries expire.
+    """
+
+    def __init__(self, movies: Cache[int, Movie], pages: Cache[Hashable, Page]) -> None:
+        self.movies = movies
+        self.pages = pages
+        self.generation = 0
+
+    def get(self, movie_id: int) -> Movie | None:
+        return self.movies.get(movie_id)
+
+    def put(self, movie: Movie, generation: int) -> None:
+        """Caches a movie read while the cache was at `generation`."""
+        if generation == self.generation and movie.id is not None:
+            self.movies.set(movie.id, Movie.model_validate(movie))
+
+    def get_page(self, key: Hashable) -> Page | None:
+        return self.pages.get((self.generation, key))
+
+    def put_page(self, key: Hashable, page: Page, generation: int) -> None:
+        """Caches a list page read while the cache was at `generation`."""
+        if generation == self.generation:
+            self.pages.set((generation, key), page)
+
+    def updated(self, movie: Movie) -> None:
+        """Records a movie that was created or updated, and caches it."""
+        self.generation += 1
+        if movie.id is None:
+            return
+        cached = self.movies.get(movie.id)
+        if cached is None or cached.version < movie.version:
+            self.movies.set(movie.id, Movie.model_validate(movie))
+
+    def deleted(self, movie_id: int | None = None) -> None:
+        """
+        Records a movie that was deleted, or, without `movie_id`, a write that may
+        have changed any number of movies.
+        """
+        self.generation += 1
+        if movie_id is not None:
+            self.movies.delete(movie_id)
+
+    def invalidate(self, movie_ids: Iterable[int | None]) -> None:
+        """Records a write that updated or deleted `movie_ids`."""
+        self.generation += 1
+        for movie_id in movie_ids:
+            if movie_id is not None:
+                self.movies.delete(movie_id)
+
+
+movie_cache = MovieCache(
+    LRUCache("movies", maxsize=MOVIE_CACHE_SIZE, ttl=MOVIE_CACHE_TTL),
+    LRUCache("movie_pages", maxsize=MOVIE_CACHE_SIZE, ttl=MOVIE_CACHE_TTL),
+)
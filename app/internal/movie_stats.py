@@ -0,0 +1,37 @@
+import asyncio
+
+from sqlalchemy import func, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select
+
+from app.models.movies import REBUILD_MOVIE_YEAR_STATS, MovieYearStats
+
+from .database import engine
+
+
+async def rebuild_movie_stats(engine: AsyncEngine) -> int:
+    """
+    Recomputes the movie statistics from every movie, in one transaction, and
+    returns the number of years they cover.
+
+    The statistics are kept up to date by triggers, so this is only needed if they
+    were changed by hand or the triggers were missing while movies were written.
+    """
+    async with engine.begin() as connection:
+        for statement in REBUILD_MOVIE_YEAR_STATS:
+            await connection.execute(text(statement))
+        result = await connection.execute(
+            select(func.count()).select_from(MovieYearStats)
+        )
+        return result.scalar_one()
+
+
+async def main() -> None:
+    years = await rebuild_movie_stats(engine)
+    await engine.dispose()
+    print(f"Rebuilt the movie statistics of {years} years")
+
+
+if __name__ == "__main__":
+    # python -m app.internal.movie_stats
+    asyncio.run(main())
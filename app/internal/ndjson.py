@@ -0,0 +1,46 @@
+from typing import AsyncIterable, AsyncIterator
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes], *, max_line_length: int = 64 * 1024
+) -> AsyncIterator[bytes | None]:
+    """
+    Splits a byte stream into lines without holding more than one line in memory.
+
+    Args:
+        chunks: The byte stream, e.g. `Request.stream()`.
+        max_line_length: The longest line that is buffered. Longer lines are
+            discarded up to the next newline.
+
+    Yields:
+        Every line without its line ending, or `None` in place of a line that was
+        longer than `max_line_length`, so callers can still count line numbers.
+    """
+    buffer = bytearray()
+    overlong = False
+    async for chunk in chunks:
+        start = 0
+        while (end := chunk.find(b"\n", start)) != -1:
+            if overlong:
+                overlong = False
+                yield None
+            else:
+                buffer += chunk[start:end]
+                yield _line(buffer, max_line_length)
+            buffer.clear()
+            start = end + 1
+        if not overlong:
+            buffer += chunk[start:]
+            if len(buffer) > max_line_length:
+                overlong = True
+                buffer.clear()
+    if overlong:
+        yield None
+    elif buffer:
+        yield _line(buffer, max_line_length)
+
+
+def _line(buffer: bytearray, max_line_length: int) -> bytes | None:
+    if len(buffer) > max_line_length:
+        return None
+    return bytes(buffer.rstrip(b"\r"))
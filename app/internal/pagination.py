@@ -0,0 +1,66 @@
+import base64
+import binascii
+import json
+from typing import Any
+
+from sqlalchemy import ColumnElement, tuple_
+from sqlalchemy.orm import Mapped
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(sort: str, values: tuple[Any, ...]) -> str:
+    """Encodes the sort key and the position of the last row into an opaque
+    cursor."""
+    payload = json.dumps([sort, *values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, size: int) -> tuple[Any, ...]:
+    """
+    Decodes a cursor created by `encode_cursor`.
+
+    Args:
+        cursor: The opaque cursor sent by the client.
+        sort: The sort key of the current request. A cursor issued for a different
+            sort key is rejected, because its position means nothing for this order.
+        size: The number of values the position is expected to hold.
+
+    Returns:
+        The position of the last row of the previous page.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or was issued for another
+            sort key.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursorError("malformed cursor") from e
+
+    if not isinstance(payload, list) or len(payload) != size + 1:
+        raise InvalidCursorError("malformed cursor")
+    if payload[0] != sort:
+        raise InvalidCursorError("cursor was issued for a different sort")
+    if not all(isinstance(value, (str, int, float)) for value in payload[1:]):
+        raise InvalidCursorError("malformed cursor")
+    return tuple(payload[1:])
+
+
+def keyset_predicate(
+    columns: tuple[Mapped[Any], ...],
+    values: tuple[Any, ...],
+    *,
+    descending: bool = False,
+) -> ColumnElement[bool]:
+    """Builds the `WHERE (a, b) > (?, ?)` condition that seeks past the last row of
+    the previous page."""
+    if len(columns) == 1:
+        column, value = columns[0], values[0]
+        return column < value if descending else column > value
+    key = tuple_(*columns)
+    position = tuple_(*values)
+    return key < position if descending else key > position
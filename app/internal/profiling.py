@@ -0,0 +1,159 @@
+import cProfile
+import hashlib
+import hmac
+import json
+import pstats
+import sys
+import time
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterable
+
+import fastapi.routing
+from fastapi.dependencies.models import Dependant
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .env import SECRET_KEY
+
+
+def sign_profile_request(method: str, path: str, expires: int) -> str:
+    """
+    Returns the value of the `X-Profile` header that asks for a profile of a
+    `method` request to `path` until the Unix time `expires`.
+    """
+    message = f"{expires}:{method.upper()} {path}".encode()
+    signature = hmac.new(SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+    return f"{expires}.{signature}"
+
+
+def verify_profile_token(token: str, method: str, path: str, now: float) -> bool:
+    expires, _, _ = token.partition(".")
+    if not expires.isdigit() or int(expires) < now:
+        return False
+    return hmac.compare_digest(token, sign_profile_request(method, path, int(expires)))
+
+
+class RequestProfile:
+    """What is recorded about a single profiled request."""
+
+    def __init__(self) -> None:
+        self.profiler = cProfile.Profile()
+        self.statements: list[dict[str, Any]] = []
+        self.phases: dict[str, float] = {}
+        self._statement_start = 0.0
+
+    def add_phase(self, name: str, elapsed: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def summary(
+        self, method: str, path: str, route: Any, status: int, elapsed: float
+    ) -> dict[str, Any]:
+        stats = pstats.Stats(self.profiler)
+        dependencies = {}
+        dependant = getattr(route, "dependant", None)
+        if dependant is not None:
+            for call in _dependency_calls(dependant):
+                code = getattr(call, "__code__", None)
+                if code is None:
+                    continue
+                key = (code.co_filename, code.co_firstlineno, code.co_name)
+                entry = stats.stats.get(key)  # type: ignore[attr-defined]
+                if entry is not None:
+                    dependencies[call.__qualname__] = entry[3]
+        return {
+            "method": method,
+            "path": path,
+            "route": getattr(route, "path", None),
+            "status": status,
+            "elapsed": elapsed,
+            "phases": self.phases,
+            "dependencies_cpu": dependencies,
+            "sql": {
+                "count": len(self.statements),
+                "elapsed": sum(s["elapsed"] for s in self.statements),
+                "statements": self.statements,
+            },
+        }
+
+    def write(self, directory: Path, name: str, summary: dict[str, Any]) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        self.profiler.dump_stats(directory / f"{name}.prof")
+        (directory / f"{name}.json").write_text(json.dumps(summary, indent=2))
+
+
+current_profile: ContextVar[RequestProfile | None] = ContextVar(
+    "current_profile", default=None
+)
+
+
+def _dependency_calls(dependant: Dependant) -> Iterable[Callable[..., Any]]:
+    for sub_dependant in dependant.dependencies:
+        yield from _dependency_calls(sub_dependant)
+        if sub_dependant.call is not None:
+            yield sub_dependant.call
+
+
+def _timed(name: str, function: Callable[..., Awaitable[Any]]):
+    @wraps(function)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        profile = current_profile.get()
+        if profile is None:
+            return await function(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return await function(*args, **kwargs)
+        finally:
+            profile.add_phase(name, time.perf_counter() - start)
+
+    wrapper.__profiling_wrapped__ = True  # type: ignore[attr-defined]
+    return wrapper
+
+
+def install_profiling(engines: Iterable[AsyncEngine]) -> None:
+    """
+    Hooks the profiler into FastAPI's request handling and into `engines`.
+
+    Only called when profiling is enabled, so that otherwise nothing is wrapped and
+    no event listener is registered. Installing it more than once is harmless.
+    """
+    phases = {
+        "solve_dependencies": "dependencies",
+        "run_endpoint_function": "endpoint",
+        "serialize_response": "serialization",
+    }
+    for function_name, phase in phases.items():
+        function = getattr(fastapi.routing, function_name)
+        if not getattr(function, "__profiling_wrapped__", False):
+            setattr(fastapi.routing, function_name, _timed(phase, function))
+
+    for engine in engines:
+        if event.contains(engine.sync_engine, "before_cursor_execute", _before):
+            continue
+        event.listen(engine.sync_engine, "before_cursor_execute", _before)
+        event.listen(engine.sync_engine, "after_cursor_execute", _after)
+
+
+def _before(conn, cursor, statement, parameters, context, many) -> None:
+    profile = current_profile.get()
+    if profile is not None:
+        profile._statement_start = time.perf_counter()
+
+
+def _after(conn, cursor, statement, parameters, context, many) -> None:
+    profile = current_profile.get()
+    if profile is not None:
+        profile.statements.append(
+            {
+                "statement": statement,
+                "elapsed": time.perf_counter() - profile._statement_start,
+            }
+        )
+
+
+if __name__ == "__main__":
+    # python -m app.internal.profiling GET /v1/movies [SECONDS]
+    method, path = sys.argv[1], sys.argv[2]
+    seconds = int(sys.argv[3]) if len(sys.argv) > 3 else 300
+    print(sign_profile_request(method, path, int(time.time()) + seconds))
@@ -0,0 +1,264 @@
+import os
+import sqlite3
+from collections import OrderedDict
+from typing import Callable, Protocol
+
+from jose import JWTError, jwt
+from starlette.datastructures import Headers
+from starlette.routing import Match
+from starlette.types import Scope
+
+from .env import ALGORITHM, SECRET_KEY
+from .metrics import rate_limit_errors
+
+
+class RateLimiter(Protocol):
+    def hit(self, key: str, now: float) -> float:
+        """
+        Takes a token from the bucket of `key`.
+
+        Returns:
+            0 if the call is allowed, otherwise the number of seconds until the next
+            token is available.
+        """
+        ...
+
+
+class TokenBucketLimiter:
+    """
+    Token bucket rate limiter that keeps two numbers per key.
+
+    Every key starts with `max_calls` tokens and earns them back at
+    `max_calls / period` tokens per second. A bucket that has been idle for `period`
+    is full again, so it is indistinguishable from a new one and is evicted. Keys are
+    kept in least recently used order, which makes both the idle sweep and the
+    eviction above `max_keys` O(1) per call.
+
+    The limiter never awaits, so calls from the event loop cannot interleave and no
+    lock is needed.
+    """
+
+    def __init__(
+        self, max_calls: int, period: float, *, max_keys: int = 100_000
+    ) -> None:
+        self.capacity = float(max_calls)
+        self.period = period
+        self.rate = max_calls / period
+        self.max_keys = max_keys
+        self.buckets: OrderedDict[str, list[float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.buckets)
+
+    def hit(self, key: str, now: float) -> float:
+        buckets = self.buckets
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = [self.capacity, now]
+            if len(buckets) > self.max_keys:
+                buckets.popitem(last=False)
+        else:
+            tokens, updated_at = bucket
+            elapsed = max(0.0, now - updated_at)
+            bucket[0] = min(self.capacity, tokens + elapsed * self.rate)
+            bucket[1] = now
+            buckets.move_to_end(key)
+
+        self._evict_idle(now)
+
+        if bucket[0] < 1:
+            return (1 - bucket[0]) / self.rate
+        bucket[0] -= 1
+        return 0
+
+    def _evict_idle(self, now: float) -> None:
+        buckets = self.buckets
+        while buckets:
+            oldest = next(iter(buckets.values()))
+            if now - oldest[1] < self.period:
+                break
+            buckets.popitem(last=False)
+
+
+class SQLiteTokenBucketLimiter:
+    """
+    Token bucket rate limiter whose buckets live in a SQLite file, so that every
+    worker process on the host draws from the same buckets.
+
+    Each call is a single `INSERT ... ON CONFLICT DO UPDATE ... RETURNING` in
+    autocommit mode. The refill and the withdrawal happen in one atomic statement,
+    so no lock is held between processes beyond that statement. The database runs in
+    WAL mode with `synchronous=OFF`, because losing the buckets on power loss only
+    resets the limits. Every `sweep_interval` calls, buckets idle for a full
+    `period` are deleted, and so are the least recently used ones beyond `max_keys`,
+    so each worker can add at most `sweep_interval` buckets over the cap in between.
+
+    Calls run on the event loop, so a call waits at most `busy_timeout` milliseconds
+    for another process to release the database. If it is still locked, the request
+    is allowed and counted in `rate_limit_errors_total`, rather than stalling every
+    request the worker is serving.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_calls: int,
+        period: float,
+        *,
+        max_keys: int = 100_000,
+        sweep_interval: int = 1000,
+        busy_timeout: int = 5,
+    ) -> None:
+        self.path = path
+        self.capacity = float(max_calls)
+        self.period = period
+        self.rate = max_calls / period
+        self.max_keys = max_keys
+        self.sweep_interval = sweep_interval
+        self.busy_timeout = busy_timeout
+        self.calls = 0
+        self._connection: sqlite3.Connection | None = None
+        self._pid: int | None = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, every worker opens its own.
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = self._connect()
+            self._pid = os.getpid()
+        return self._connection
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.path, isolation_level=None, check_same_thread=False
+        )
+        connection.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout)}")
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS rate_limit (
+                key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                allowed INTEGER NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        connection.execute(
+            """
+            CREATE INDEX IF NOT EXISTS rate_limit_updated_at
+            ON rate_limit (updated_at)
+            """
+        )
+        return connection
+
+    def hit(self, key: str, now: float) -> float:
+        try:
+            tokens, allowed = self._take(key, now)
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e):
+                raise
+            rate_limit_errors.inc()
+            return 0
+
+        self.calls += 1
+        if self.calls % self.sweep_interval == 0:
+            try:
+                self._sweep(now)
+            except sqlite3.OperationalError as e:
+                # The next sweep will catch up.
+                if "locked" not in str(e):
+                    raise
+
+        if allowed:
+            return 0
+        return (1 - tokens) / self.rate
+
+    def _take(self, key: str, now: float) -> tuple[float, int]:
+        # Every SET expression sees the row as it was before the update.
+        return self.connection.execute(
+            """
+            INSERT INTO rate_limit (key, tokens, updated_at, allowed)
+            VALUES (:key, :capacity - 1, :now, 1)
+            ON CONFLICT (key) DO UPDATE SET
+                allowed = min(
+                    :capacity, tokens + max(0, :now - updated_at) * :rate
+                ) >= 1,
+                tokens = min(:capacity, tokens + max(0, :now - updated_at) * :rate)
+                    - (min(:capacity, tokens + max(0, :now - updated_at) * :rate) >= 1),
+                updated_at = :now
+            RETURNING tokens, allowed
+            """,
+            {"key": key, "capacity": self.capacity, "rate": self.rate, "now": now},
+        ).fetchone()
+
+    def _sweep(self, now: float) -> None:
+        self.connection.execute(
+            "DELETE FROM rate_limit WHERE updated_at <= ?", (now - self.period,)
+        )
+        self.connection.execute(
+            """
+            DELETE FROM rate_limit WHERE updated_at < (
+                SELECT updated_at FROM rate_limit
+                ORDER BY updated_at DESC LIMIT 1 OFFSET ?
+            )
+            """,
+            (self.max_keys - 1,),
+        )
+
+
+def create_limiter(
+    backend: str,
+    max_calls: int,
+    period: float,
+    *,
+    max_keys: int = 100_000,
+    path: str = "ratelimit.db",
+) -> RateLimiter:
+    if backend == "sqlite":
+        return SQLiteTokenBucketLimiter(path, max_calls, period, max_keys=max_keys)
+    return TokenBucketLimiter(max_calls, period, max_keys=max_keys)
+
+
+def client_ip(scope: Scope) -> str:
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def token_subject(scope: Scope) -> str | None:
+    """The subject of the request's bearer token, if it has a valid one."""
+    authorization = Headers(scope=scope).get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        subject = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        return None
+    return subject or None
+
+
+def bearer_subject(scope: Scope) -> str:
+    """The subject of a valid bearer token, or the client IP for anonymous calls."""
+    subject = token_subject(scope)
+    return f"sub={subject}" if subject else client_ip(scope)
+
+
+def route(scope: Scope) -> str:
+    """
+    The method and path template of the route the request goes to, so that every
+    movie id shares one bucket. Requests that no route matches share `"unmatched"`.
+    """
+    for candidate in getattr(scope.get("app"), "routes", ()):
+        match, _ = candidate.matches(scope)
+        if match == Match.FULL:
+            return f"{scope['method']} {getattr(candidate, 'path', 'unmatched')}"
+    return f"{scope['method']} unmatched"
+
+
+KEY_FUNCTIONS: dict[str, Callable[[Scope], str]] = {
+    "ip": client_ip,
+    "subject": bearer_subject,
+    "route": route,
+}
@@ -0,0 +1,27 @@
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+
+def render_json(content: Any) -> bytes:
+    """
+    Encodes `content` exactly as FastAPI's `JSONResponse` does, using orjson when
+    it is installed.
+
+    For the strings, integers, lists and dicts that responses are made of, orjson's
+    compact output is byte for byte the same as `json.dumps` with the arguments
+    Starlette uses. Anything orjson refuses, such as integers wider than 64 bits, is
+    encoded by `json` instead, so that it fails or succeeds just as before.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(content)
+        except TypeError:
+            pass
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
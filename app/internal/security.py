@@ -1,4 +1,6 @@
+import asyncio
 import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
 from zoneinfo import ZoneInfo
 
 from fastapi.security import OAuth2PasswordBearer
@@ -9,14 +11,101 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.users import User
 
-from .env import ALGORITHM, SECRET_KEY
+from .env import (
+    ALGORITHM,
+    BCRYPT_ROUNDS,
+    PASSWORD_MAX_PENDING,
+    PASSWORD_QUEUE_TIMEOUT,
+    PASSWORD_WORKERS,
+    SECRET_KEY,
+)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/v1/token")
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+class PasswordVerifierOverloadedError(Exception):
+    pass
+
+
+class PasswordVerifier:
+    """
+    Runs bcrypt on a dedicated thread pool, so that hashing never blocks the event
+    loop.
+
+    At most `max_workers` verifications run at once and at most `max_pending` more
+    wait for a worker. A call that would exceed the queue, or that waits longer than
+    `queue_timeout` seconds, fails fast with `PasswordVerifierOverloadedError`
+    instead of piling up behind a login storm.
+    """
+
+    def __init__(
+        self, max_workers: int, *, max_pending: int, queue_timeout: float
+    ) -> None:
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self.pending = 0
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password"
+        )
+        self._semaphore: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # A semaphore is bound to the event loop it is first used on.
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+            self._loop = loop
+            self.pending = 0
+        return self._semaphore
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        """
+        Verifies a password and rehashes it if its hash uses deprecated settings,
+        such as fewer bcrypt rounds than `BCRYPT_ROUNDS`.
+
+        Returns:
+            Whether the password matches, and the new hash to store if it needs to
+            be updated.
+
+        Raises:
+            PasswordVerifierOverloadedError: If no worker became available in time.
+        """
+        semaphore = self.semaphore
+        if semaphore.locked() and self.pending >= self.max_pending:
+            raise PasswordVerifierOverloadedError()
+
+        self.pending += 1
+        try:
+            await asyncio.wait_for(semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise PasswordVerifierOverloadedError()
+        finally:
+            self.pending -= 1
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor,
+                pwd_context.verify_and_update,
+                plain_password,
+                hashed_password,
+            )
+        finally:
+            semaphore.release()
+
+
+password_verifier = PasswordVerifier(
+    PASSWORD_WORKERS,
+    max_pending=PASSWORD_MAX_PENDING,
+    queue_timeout=PASSWORD_QUEUE_TIMEOUT,
+)
 
 
 async def authenticate_user(
@@ -26,8 +115,20 @@ async def authenticate_user(
     user = result.first()
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    # End the read transaction, so that the session does not hold on to a
+    # connection, possibly the writer's only one, while bcrypt runs.
+    session.expunge(user)
+    await session.rollback()
+    verified, new_hash = await password_verifier.verify_and_update(
+        password, user.hashed_password
+    )
+    if not verified:
         return None
+    if new_hash is not None:
+        session.add(user)
+        user.hashed_password = new_hash
+        await session.commit()
+        await session.refresh(user)
     return user
 
 
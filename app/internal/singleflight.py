@@ -0,0 +1,41 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class SingleFlight(Generic[K, V]):
+    """
+    Coalesces concurrent calls for the same key into a single call.
+
+    The first caller for a key starts `read` in a task of its own, and every caller
+    that asks for the key until that task is done waits for it, getting its result
+    or its exception. Once the task is done the key is forgotten, so later callers
+    start a new read instead of getting a result that may have become stale.
+
+    As the task does not belong to any caller, a caller that is cancelled, such as
+    the request of a client that disconnected, does not cancel the read for the
+    others. `read` must therefore not use resources owned by its caller, such as
+    the request's session.
+    """
+
+    def __init__(self) -> None:
+        self.flights = 0
+        self.shared = 0
+        self._tasks: dict[K, asyncio.Task[V]] = {}
+
+    async def do(self, key: K, read: Callable[[], Awaitable[V]]) -> V:
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(read())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+            self.flights += 1
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: K, task: asyncio.Task[V]) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
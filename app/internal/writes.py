@@ -0,0 +1,114 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Protocol, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+T = TypeVar("T")
+
+# A write that makes its changes on the session it is given, without committing.
+Write = Callable[[AsyncSession], Awaitable[T]]
+
+
+class Writer(Protocol):
+    async def run(self, write: Write[T]) -> T:
+        """
+        Runs `write` and commits it.
+
+        Returns:
+            What `write` returned, once its changes are committed.
+
+        Raises:
+            Whatever `write` raised, in which case none of its changes are committed.
+        """
+        ...
+
+
+class SessionWriter:
+    """Runs every write in its own transaction on the given session."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def run(self, write: Write[T]) -> T:
+        try:
+            result = await write(self.session)
+            await self.session.commit()
+        except BaseException:
+            await self.session.rollback()
+            raise
+        return result
+
+
+class GroupCommitWriter:
+    """
+    Coalesces concurrent writes into shared transactions.
+
+    A single task takes the writes that are queued, waiting up to `window` seconds
+    after the first one for more, up to `max_batch` of them, and runs them one after
+    the other in one transaction with one commit. On SQLite, where every commit
+    takes the write lock and, unless `synchronous` is OFF, an fsync, this trades a
+    little latency for much higher write throughput under concurrency.
+
+    If any write in a batch fails, the whole transaction is rolled back and every
+    write of the batch is retried in a transaction of its own, so that each caller
+    gets its own result or error. Writes must therefore only change the database,
+    and leave side effects such as cache invalidation to the caller.
+    """
+
+    def __init__(
+        self, engine: AsyncEngine, *, window: float = 0.002, max_batch: int = 100
+    ) -> None:
+        self.engine = engine
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: asyncio.Queue[tuple[Write[Any], asyncio.Future[Any]]] | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    async def run(self, write: Write[T]) -> T:
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._commit_batches(self._queue))
+        assert self._queue is not None
+        future: asyncio.Future[T] = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((write, future))
+        return await future
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _commit_batches(
+        self, queue: asyncio.Queue[tuple[Write[Any], asyncio.Future[Any]]]
+    ) -> None:
+        while True:
+            batch = [await queue.get()]
+            if self.window > 0 and queue.qsize() < self.max_batch - 1:
+                await asyncio.sleep(self.window)
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            await self._commit(batch)
+
+    async def _commit(
+        self, batch: list[tuple[Write[Any], asyncio.Future[Any]]]
+    ) -> None:
+        async with AsyncSession(self.engine, expire_on_commit=False) as session:
+            try:
+                results = [await write(session) for write, _ in batch]
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                if len(batch) > 1:
+                    for item in batch:
+                        await self._commit([item])
+                elif not batch[0][1].done():
+                    batch[0][1].set_exception(e)
+                return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -3,22 +3,109 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 # from .internal.database import create_db_and_tables
-from .middlewares import RateLimiterMiddleware
+from .internal.database import dispose_engines, engine, read_engine
+from .internal.env import (
+    ADMISSION_CONTROL,
+    ADMISSION_LATENCY_TARGET,
+    ADMISSION_MAX_CONCURRENCY,
+    ADMISSION_MAX_QUEUE,
+    ADMISSION_QUEUE_TIMEOUT,
+    DATABASE_READERS,
+    GROUP_COMMIT,
+    GROUP_COMMIT_MAX_BATCH,
+    GROUP_COMMIT_WINDOW,
+    METRICS_ENABLED,
+    PROFILER_DIR,
+    PROFILER_ENABLED,
+    PROFILER_SAMPLE_RATE,
+    RATE_LIMIT_BACKEND,
+    RATE_LIMIT_KEYS,
+    RATE_LIMIT_MAX_CLIENTS,
+    RATE_LIMIT_SQLITE_PATH,
+)
+from .internal.profiling import install_profiling
+from .internal.ratelimit import create_limiter
+from .internal.writes import GroupCommitWriter
+from .middlewares import (
+    AdmissionControlMiddleware,
+    MetricsMiddleware,
+    ProfilerMiddleware,
+    RateLimiterMiddleware,
+)
 from .routers import v1
 
 
 @asynccontextmanager
-async def lifespan(_: FastAPI):
+async def lifespan(app: FastAPI):
     # await create_db_and_tables()
     yield
+    if app.state.group_commit_writer is not None:
+        await app.state.group_commit_writer.close()
+    await dispose_engines()
 
 
-def create_app(enable_rate_limiter: bool = True) -> FastAPI:
+def create_app(
+    enable_rate_limiter: bool = True,
+    rate_limit_backend: str = RATE_LIMIT_BACKEND,
+    group_commit: bool = GROUP_COMMIT,
+    enable_metrics: bool = METRICS_ENABLED,
+    enable_profiler: bool = PROFILER_ENABLED,
+    enable_admission_control: bool = ADMISSION_CONTROL,
+) -> FastAPI:
     app = FastAPI(lifespan=lifespan)
     app.include_router(v1.router)
 
+    app.state.group_commit_writer = None
+    if group_commit:
+        app.state.group_commit_writer = GroupCommitWriter(
+            engine, window=GROUP_COMMIT_WINDOW, max_batch=GROUP_COMMIT_MAX_BATCH
+        )
+
+    if enable_profiler:
+        install_profiling([engine, read_engine])
+        app.add_middleware(
+            ProfilerMiddleware, sample_rate=PROFILER_SAMPLE_RATE, directory=PROFILER_DIR
+        )
+
+    if enable_admission_control:
+        app.add_middleware(
+            AdmissionControlMiddleware,
+            routes=app.routes,
+            max_concurrency=ADMISSION_MAX_CONCURRENCY,
+            fixed_limits={
+                # Each export holds a reader connection for as long as it streams,
+                # leave at least half of them to the other reads.
+                "GET /v1/movies/export": max(1, DATABASE_READERS // 2),
+                # Bulk writes take turns on the single writer connection anyway.
+                "POST /v1/movies/bulk": 2,
+                "PATCH /v1/movies/bulk": 2,
+                "DELETE /v1/movies/bulk": 2,
+            },
+            max_queue=ADMISSION_MAX_QUEUE,
+            queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+            latency_target=ADMISSION_LATENCY_TARGET,
+            exempt_paths=["/v1/healthcheck", "/v1/metrics", "/v1/movies/changes"],
+            low_priority_routes=["GET /v1/movies/export", "POST /v1/movies/bulk"],
+        )
+
     if enable_rate_limiter:
-        app.add_middleware(RateLimiterMiddleware, max_calls=2, period=1)
+        limiter = create_limiter(
+            rate_limit_backend,
+            max_calls=2,
+            period=1,
+            max_keys=RATE_LIMIT_MAX_CLIENTS,
+            path=RATE_LIMIT_SQLITE_PATH,
+        )
+        app.add_middleware(
+            RateLimiterMiddleware,
+            max_calls=2,
+            period=1,
+            keys=RATE_LIMIT_KEYS,
+            limiter=limiter,
+        )
+
+    if enable_metrics:
+        app.add_middleware(MetricsMiddleware)
 
     return app
 
@@ -1,48 +1,311 @@
 import asyncio
+import math
+import random
 import time
-from collections import defaultdict, deque
+import uuid
+from pathlib import Path
+from typing import Mapping, Sequence
 
-from fastapi import HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.requests import Request
-from starlette.responses import JSONResponse, Response
-from starlette.types import ASGIApp
+from fastapi import status
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from .internal.admission import HIGH, LOW, NORMAL, AdmissionController, AIMDLimit
+from .internal.metrics import (
+    admission_rejections,
+    http_request_duration,
+    http_requests,
+    rate_limit_rejections,
+)
+from .internal.profiling import RequestProfile, current_profile, verify_profile_token
+from .internal.ratelimit import (
+    KEY_FUNCTIONS,
+    RateLimiter,
+    TokenBucketLimiter,
+    token_subject,
+)
 
-class RateLimiterMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app: ASGIApp, max_calls: int = 2, period: int = 1) -> None:
-        super().__init__(app)
+
+class RateLimiterMiddleware:
+    """
+    Limits every client to `max_calls` requests per `period` seconds.
+
+    Clients are told apart by `keys`, any combination of `"ip"`, `"subject"` (the
+    subject of the bearer token) and `"route"`. At most `max_clients` of them are
+    tracked at once, idle clients are forgotten after `period`.
+
+    The buckets are kept in process memory unless another `limiter` is given, such as
+    a `SQLiteTokenBucketLimiter` shared by all worker processes.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_calls: int = 2,
+        period: int = 1,
+        *,
+        keys: Sequence[str] = ("ip",),
+        max_clients: int = 100_000,
+        limiter: RateLimiter | None = None,
+    ) -> None:
+        self.app = app
         self.max_calls = max_calls
         self.period = period
-        self.rate_limiters: dict[str, deque[float]] = defaultdict(deque)
-        self.lock = asyncio.Lock()
-
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
-        client_ip = request.client.host if request.client else "unknown"
-        current_time = time.time()
+        self.key_functions = [KEY_FUNCTIONS[key] for key in keys]
+        if limiter is None:
+            limiter = TokenBucketLimiter(max_calls, period, max_keys=max_clients)
+        self.limiter = limiter
 
-        async with self.lock:
-            access_times = self.rate_limiters[client_ip]
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-            while access_times and access_times[0] + self.period < current_time:
-                access_times.popleft()
+        key = "|".join(key_function(scope) for key_function in self.key_functions)
+        retry_after = self.limiter.hit(key, time.time())
+        if retry_after:
+            rate_limit_rejections.inc()
+            response = JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": "Too Many Requests"},
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+            await response(scope, receive, send)
+            return
 
-            if len(access_times) >= self.max_calls:
-                return JSONResponse(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    content={"detail": "Too Many Requests"},
-                )
+        response_started = False
 
-            access_times.append(current_time)
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
 
         try:
-            response = await call_next(request)
-        except HTTPException as e:
-            return JSONResponse(status_code=e.status_code, content={"detail": e.detail})
+            await self.app(scope, receive, send_wrapper)
         except Exception:
-            return JSONResponse(
+            if response_started:
+                raise
+            response = JSONResponse(
                 status_code=500, content={"detail": "Internal Server Error"}
             )
-        return response
+            await response(scope, receive, send)
+
+
+class AdmissionControlMiddleware:
+    """
+    Caps the requests in flight on each route, and sheds what would otherwise queue
+    up on the event loop and the database until every request is slow.
+
+    Each route, told apart by method and path template, gets an
+    `AdmissionController` whose limit starts at `max_concurrency` and adapts to its
+    latency with `AIMDLimit`. Routes in `fixed_limits`, keyed like
+    `"GET /v1/movies/export"`, keep the limit given there instead. That suits
+    streaming and bulk routes, which take longer than `latency_target` by design and
+    would otherwise see their limit cut to 1 for good. A request that is not admitted
+    within `queue_timeout` seconds, or finds the queue full, gets an immediate 503
+    with `Retry-After`.
+
+    Requests to `exempt_paths`, such as health checks and long polls, are never
+    limited. Requests to `low_priority_routes`, named the same way, are shed as soon
+    as their route is at its limit. Requests with a valid bearer token are queued
+    ahead of anonymous ones.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        routes: Sequence[BaseRoute],
+        max_concurrency: int = 64,
+        fixed_limits: Mapping[str, int] | None = None,
+        max_queue: int = 128,
+        queue_timeout: float = 1.0,
+        latency_target: float = 0.5,
+        exempt_paths: Sequence[str] = (),
+        low_priority_routes: Sequence[str] = (),
+    ) -> None:
+        self.app = app
+        self.routes = routes
+        self.max_concurrency = max_concurrency
+        self.fixed_limits = fixed_limits or {}
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.latency_target = latency_target
+        self.exempt_paths = frozenset(exempt_paths)
+        self.low_priority_routes = frozenset(low_priority_routes)
+        self.controllers: dict[str, AdmissionController] = {}
+
+    def controller(self, scope: Scope) -> tuple[AdmissionController, int] | None:
+        """The controller of the route `scope` goes to and its priority, if any."""
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                break
+        else:
+            return None
+        path = getattr(route, "path", "")
+        if path in self.exempt_paths:
+            return None
+
+        name = f"{scope['method']} {path}"
+        controller = self.controllers.get(name)
+        if controller is None:
+            limit = self.fixed_limits.get(name, self.max_concurrency)
+            min_limit = limit if name in self.fixed_limits else 1
+            controller = self.controllers[name] = AdmissionController(
+                name,
+                AIMDLimit(
+                    limit,
+                    min_limit=min_limit,
+                    max_limit=limit,
+                    latency_target=self.latency_target,
+                ),
+                max_queue=self.max_queue,
+                queue_timeout=self.queue_timeout,
+            )
+        if name in self.low_priority_routes:
+            priority = LOW
+        elif token_subject(scope) is not None:
+            priority = HIGH
+        else:
+            priority = NORMAL
+        return controller, priority
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        found = self.controller(scope) if scope["type"] == "http" else None
+        if found is None:
+            await self.app(scope, receive, send)
+            return
+
+        controller, priority = found
+        if not await controller.acquire(priority):
+            admission_rejections.inc(controller.name)
+            response = JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"detail": "Server Overloaded"},
+                headers={"Retry-After": str(math.ceil(self.queue_timeout))},
+            )
+            await response(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        latency = None
+        try:
+            await self.app(scope, receive, send)
+            latency = time.perf_counter() - start
+        finally:
+            # A request that failed or was cancelled says nothing about latency.
+            controller.release(latency)
+
+
+class MetricsMiddleware:
+    """
+    Counts requests by route template, method and status code, and records their
+    latency.
+
+    Requests that are not routed, such as those rejected by the rate limiter, are
+    recorded under the route `"unmatched"`, which keeps the number of label values
+    bounded whatever paths clients send.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            http_requests.inc(path, method, str(status_code))
+            http_request_duration.observe(time.perf_counter() - start, path, method)
+
+
+class ProfilerMiddleware:
+    """
+    Profiles single requests on demand.
+
+    A request is profiled if it carries a valid `X-Profile` header, signed with
+    `sign_profile_request`, or is picked at random with probability `sample_rate`.
+    Its call-stack profile is written to `directory` as `<id>.prof`, for `pstats` or
+    snakeviz, next to `<id>.json` with the SQL statements it ran and the time spent
+    resolving dependencies, in the endpoint and serializing the response. The id is
+    returned in the `X-Profile-Id` response header.
+
+    Only one request is profiled at a time, and the call-stack profile also includes
+    whatever other requests run on the event loop meanwhile.
+    """
+
+    def __init__(
+        self, app: ASGIApp, *, sample_rate: float = 0.0, directory: str = "profiles"
+    ) -> None:
+        self.app = app
+        self.sample_rate = sample_rate
+        self.directory = Path(directory)
+        self.active = False
+
+    def should_profile(self, scope: Scope) -> bool:
+        if self.active:
+            return False
+        token = Headers(scope=scope).get("x-profile")
+        if token is not None:
+            return verify_profile_token(
+                token, scope["method"], scope["path"], time.time()
+            )
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self.active = True
+        profile_id = f"{int(time.time())}-{uuid.uuid4().hex[:8]}"
+        profile = RequestProfile()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-profile-id", profile_id.encode()),
+                ]
+            await send(message)
+
+        token = current_profile.set(profile)
+        start = time.perf_counter()
+        profile.profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.profiler.disable()
+            elapsed = time.perf_counter() - start
+            current_profile.reset(token)
+            self.active = False
+            summary = profile.summary(
+                scope["method"],
+                scope["path"],
+                scope.get("route"),
+                status_code,
+                elapsed,
+            )
+            await asyncio.to_thread(profile.write, self.directory, profile_id, summary)
@@ -1,6 +1,9 @@
 import datetime as dt
+from typing import Any, Literal
 from zoneinfo import ZoneInfo
 
+from pydantic import PositiveInt
+from sqlalchemy import DDL, Index, collate, event
 from sqlmodel import Field, SQLModel
 
 
@@ -15,11 +18,197 @@ class MovieBase(SQLModel):
 
 
 class Movie(MovieBase, table=True):
+    __table_args__ = (
+        Index("ix_movie_title_id", "title", "id"),
+        Index("ix_movie_year_id", "year", "id"),
+        Index("ix_movie_runtime_id", "runtime", "id"),
+        # Ids are never reused, so that `"{id}-{version}"` ETags of a deleted movie
+        # cannot match a movie created after it.
+        {"sqlite_autoincrement": True},
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     created_at: dt.datetime = Field(default_factory=now)
     version: int = Field(default=1, ge=1)
 
 
+# Full-text index over `movie.title`. It is an external content FTS5 table, so it
+# stores only the index, and the triggers keep it in sync with every write to `movie`,
+# whichever code path makes it.
+MOVIE_FTS_DDL = (
+    """
+    CREATE VIRTUAL TABLE movie_fts USING fts5(
+        title,
+        content='movie',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER movie_fts_insert AFTER INSERT ON movie BEGIN
+        INSERT INTO movie_fts(rowid, title) VALUES (new.id, new.title);
+    END
+    """,
+    """
+    CREATE TRIGGER movie_fts_delete AFTER DELETE ON movie BEGIN
+        INSERT INTO movie_fts(movie_fts, rowid, title)
+        VALUES ('delete', old.id, old.title);
+    END
+    """,
+    """
+    CREATE TRIGGER movie_fts_update AFTER UPDATE OF title ON movie BEGIN
+        INSERT INTO movie_fts(movie_fts, rowid, title)
+        VALUES ('delete', old.id, old.title);
+        INSERT INTO movie_fts(rowid, title) VALUES (new.id, new.title);
+    END
+    """,
+)
+
+movie_table = Movie.__table__  # type: ignore[attr-defined]
+# Case-insensitive title prefixes, as in `GET /v1/movies?title_prefix=star`.
+Index(
+    "ix_movie_title_nocase_id",
+    collate(movie_table.c.title, "NOCASE"),
+    movie_table.c.id,
+)
+for statement in MOVIE_FTS_DDL:
+    event.listen(
+        movie_table, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+event.listen(
+    movie_table,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS movie_fts").execute_if(dialect="sqlite"),
+)
+
+
+class MovieChange(SQLModel, table=True):
+    """
+    The latest change to each movie, in the order the changes were made.
+
+    Every write to a movie replaces its row with one at the next `seq`, so reading
+    the rows after a given `seq` returns each movie changed since then once, however
+    often it changed. A deleted movie keeps a row with `deleted` set, as a tombstone.
+    """
+
+    __tablename__ = "movie_change"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq: int | None = Field(default=None, primary_key=True)
+    movie_id: int = Field(unique=True)
+    deleted: bool = False
+
+
+# The triggers record every write to `movie` in `movie_change`, whichever code path
+# makes it. `AUTOINCREMENT` guarantees that `seq` never goes back, even after the
+# row with the highest `seq` has been replaced.
+MOVIE_CHANGE_DDL = (
+    """
+    CREATE TRIGGER movie_change_insert AFTER INSERT ON movie BEGIN
+        INSERT OR REPLACE INTO movie_change(movie_id, deleted) VALUES (new.id, 0);
+    END
+    """,
+    """
+    CREATE TRIGGER movie_change_update AFTER UPDATE ON movie BEGIN
+        INSERT OR REPLACE INTO movie_change(movie_id, deleted) VALUES (new.id, 0);
+    END
+    """,
+    """
+    CREATE TRIGGER movie_change_delete AFTER DELETE ON movie BEGIN
+        INSERT OR REPLACE INTO movie_change(movie_id, deleted) VALUES (old.id, 1);
+    END
+    """,
+)
+
+movie_change_table = MovieChange.__table__  # type: ignore[attr-defined]
+for statement in MOVIE_CHANGE_DDL:
+    event.listen(
+        movie_change_table,
+        "after_create",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
+for trigger in ["movie_change_insert", "movie_change_update", "movie_change_delete"]:
+    event.listen(
+        movie_change_table,
+        "before_drop",
+        DDL(f"DROP TRIGGER IF EXISTS {trigger}").execute_if(dialect="sqlite"),
+    )
+
+
+class MovieYearStats(SQLModel, table=True):
+    """The number of movies and their total runtime for each year."""
+
+    __tablename__ = "movie_year_stats"
+
+    year: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    movies: int
+    runtime_total: int
+
+
+# The triggers update `movie_year_stats` in the transaction of every write to
+# `movie`, whichever code path makes it. Years without movies are removed.
+MOVIE_YEAR_STATS_DDL = (
+    """
+    CREATE TRIGGER movie_year_stats_insert AFTER INSERT ON movie BEGIN
+        INSERT INTO movie_year_stats(year, movies, runtime_total)
+        VALUES (new.year, 1, new.runtime)
+        ON CONFLICT(year) DO UPDATE SET
+            movies = movies + 1,
+            runtime_total = runtime_total + excluded.runtime_total;
+    END
+    """,
+    """
+    CREATE TRIGGER movie_year_stats_delete AFTER DELETE ON movie BEGIN
+        UPDATE movie_year_stats
+        SET movies = movies - 1, runtime_total = runtime_total - old.runtime
+        WHERE year = old.year;
+        DELETE FROM movie_year_stats WHERE year = old.year AND movies = 0;
+    END
+    """,
+    """
+    CREATE TRIGGER movie_year_stats_update AFTER UPDATE OF year, runtime ON movie
+    BEGIN
+        UPDATE movie_year_stats
+        SET movies = movies - 1, runtime_total = runtime_total - old.runtime
+        WHERE year = old.year;
+        DELETE FROM movie_year_stats WHERE year = old.year AND movies = 0;
+        INSERT INTO movie_year_stats(year, movies, runtime_total)
+        VALUES (new.year, 1, new.runtime)
+        ON CONFLICT(year) DO UPDATE SET
+            movies = movies + 1,
+            runtime_total = runtime_total + excluded.runtime_total;
+    END
+    """,
+)
+
+# Recomputes `movie_year_stats` from a full scan of `movie`.
+REBUILD_MOVIE_YEAR_STATS = (
+    "DELETE FROM movie_year_stats",
+    """
+    INSERT INTO movie_year_stats(year, movies, runtime_total)
+    SELECT year, count(*), sum(runtime) FROM movie GROUP BY year
+    """,
+)
+
+movie_year_stats_table = MovieYearStats.__table__  # type: ignore[attr-defined]
+for statement in MOVIE_YEAR_STATS_DDL:
+    event.listen(
+        movie_year_stats_table,
+        "after_create",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
+for trigger in [
+    "movie_year_stats_insert",
+    "movie_year_stats_delete",
+    "movie_year_stats_update",
+]:
+    event.listen(
+        movie_year_stats_table,
+        "before_drop",
+        DDL(f"DROP TRIGGER IF EXISTS {trigger}").execute_if(dialect="sqlite"),
+    )
+
+
 class MoviePublic(MovieBase):
     id: int
 
@@ -32,3 +221,75 @@ class MovieUpdate(SQLModel):
     title: str | None = None
     year: int | None = None
     runtime: int | None = None
+
+
+class MovieBatchGet(SQLModel):
+    ids: list[PositiveInt] = Field(min_length=1, max_length=100)
+
+
+class MovieBatch(SQLModel):
+    movies: list[MoviePublic]
+    missing: list[int]
+
+
+class MoviePatch(SQLModel):
+    id: PositiveInt
+    version: PositiveInt | None = None
+    # Fields may be left out, but not set to null, so they default to an unset None
+    # that is not validated and have the constraints of `MovieBase` otherwise.
+    title: str = Field(default=None, min_length=1)
+    year: int = Field(default=None, ge=1888)
+    runtime: int = Field(default=None, ge=1)
+
+
+class MovieBulkUpdate(SQLModel):
+    movies: list[MoviePatch] = Field(min_length=1, max_length=10_000)
+
+
+class MovieBulkDelete(SQLModel):
+    ids: list[PositiveInt] = Field(min_length=1, max_length=10_000)
+
+
+class MovieBulkResult(SQLModel):
+    id: int
+    status: Literal["updated", "deleted", "not_found", "conflict"]
+    version: int | None = None
+
+
+class MovieBulkReport(SQLModel):
+    results: list[MovieBulkResult]
+
+
+class MovieChangePublic(SQLModel):
+    seq: int
+    id: int
+    deleted: bool
+    movie: MoviePublic | None
+
+
+class MovieChanges(SQLModel):
+    changes: list[MovieChangePublic]
+    next_since: int
+
+
+class MovieYearStatsPublic(SQLModel):
+    year: int
+    movies: int
+    average_runtime: float
+
+
+class MovieStats(SQLModel):
+    movies: int
+    average_runtime: float | None
+    years: list[MovieYearStatsPublic]
+
+
+class MovieImportError(SQLModel):
+    line: int
+    errors: list[dict[str, Any]]
+
+
+class MovieImportReport(SQLModel):
+    inserted: int = 0
+    failed: int = 0
+    errors: list[MovieImportError] = Field(default_factory=list)
@@ -10,6 +10,8 @@ class UserBase(SQLModel):
 
 class User(UserBase, table=True):
     id: int | None = Field(default=None, primary_key=True)
+    # Every login and every authenticated request looks users up by name.
+    username: str = Field(unique=True, index=True)
     hashed_password: str
 
 
@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 
 from app import version
+from app.internal.cache import caches
 from app.internal.env import ENVIRONMENT
 from app.internal.log import logger
 
@@ -10,5 +11,11 @@ router = APIRouter(prefix="/healthcheck")
 @router.get("")
 async def healthcheck() -> dict[str, str]:
     """Show routerlication information."""
-    await logger.adebug("This is a test log", hello="world")
+    logger.debug("This is a test log", hello="world")
     return {"status": "available", "version": version, "environment": ENVIRONMENT}
+
+
+@router.get("/caches")
+async def cache_stats() -> dict[str, dict[str, float]]:
+    """Show the size and hit rate of the in-process caches."""
+    return {name: cache.stats() for name, cache in caches.items()}
@@ -0,0 +1,49 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.internal.admission import controllers
+from app.internal.cache import caches
+from app.internal.log import sink
+from app.internal.metrics import Gauge, render_metrics
+
+router = APIRouter(prefix="/metrics")
+
+Gauge(
+    "cache_hit_ratio",
+    "Share of lookups served from each in-process cache.",
+    ["cache"],
+    lambda: {(name,): cache.hit_rate for name, cache in caches.items()},
+)
+Gauge(
+    "cache_entries",
+    "Entries held by each in-process cache.",
+    ["cache"],
+    lambda: {(name,): len(cache) for name, cache in caches.items()},
+)
+Gauge(
+    "log_events",
+    "Log events by outcome since the process started.",
+    ["outcome"],
+    lambda: {(outcome,): count for outcome, count in sink.stats().items()},
+)
+
+Gauge(
+    "admission_concurrency_limit",
+    "Current adaptive concurrency limit of each route.",
+    ["route"],
+    lambda: {(name,): int(c.limit) for name, c in controllers.items()},
+)
+Gauge(
+    "admission_in_flight",
+    "Requests admitted and not yet finished, by route.",
+    ["route"],
+    lambda: {(name,): c.in_flight for name, c in controllers.items()},
+)
+
+
+@router.get("", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Show the application metrics in the Prometheus text format."""
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -1,48 +1,811 @@
-from typing import Annotated
+import csv
+import io
+import json
+import math
+import re
+import time
+from functools import cache
+from typing import Annotated, Any, AsyncIterator, Callable, Hashable, Literal, cast
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
-from sqlmodel import select
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    Update,
+    and_,
+    bindparam,
+    collate,
+    column,
+    delete,
+    func,
+    insert,
+    literal_column,
+    table,
+    tuple_,
+    update,
+)
+from sqlalchemy import select as select_columns
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlalchemy.sql.expression import UnaryExpression
+from sqlalchemy.sql.operators import custom_op
+from sqlmodel import col, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.dependencies import get_session
-from app.models.movies import Movie, MovieCreate, MoviePublic, MovieUpdate
+from app.dependencies import get_engine, get_read_session, get_session, get_writer
+from app.internal.changes import movie_changes
+from app.internal.etags import matching_versions, movie_etag, none_match, page_etag
+from app.internal.movie_cache import Page, movie_cache
+from app.internal.ndjson import iter_lines
+from app.internal.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    keyset_predicate,
+)
+from app.internal.responses import render_json
+from app.internal.singleflight import SingleFlight
+from app.internal.writes import Writer
+from app.models.movies import (
+    Movie,
+    MovieBatch,
+    MovieBatchGet,
+    MovieBulkDelete,
+    MovieBulkReport,
+    MovieBulkResult,
+    MovieBulkUpdate,
+    MovieChange,
+    MovieChanges,
+    MovieCreate,
+    MovieImportError,
+    MovieImportReport,
+    MoviePublic,
+    MovieStats,
+    MovieUpdate,
+    MovieYearStats,
+    movie_table,
+    now,
+)
 
 router = APIRouter(prefix="/movies")
 
+MAX_IMPORT_ERRORS = 100
+
+movie_fts = table("movie_fts", column("rowid"), column("rank"))
+
+MovieSort = Literal[
+    "id", "-id", "title", "-title", "year", "-year", "runtime", "-runtime"
+]
+
+# Columns of `MoviePublic`, in the order its fields are serialized.
+PUBLIC_FIELDS = tuple(MoviePublic.model_fields)
+PUBLIC_COLUMNS = tuple(col(getattr(Movie, name)) for name in PUBLIC_FIELDS)
+
+# Single-statement writes. They are built once, so that SQLAlchemy finds them in its
+# compiled cache without working out a cache key on every request.
+INSERT_MOVIE = insert(Movie).returning(*movie_table.columns)
+DELETE_MOVIE = (
+    delete(Movie).where(col(Movie.id) == bindparam("movie_id")).returning(col(Movie.id))
+)
+
+# Changes after `since`, each with the movie as it is now, or without it if deleted.
+READ_CHANGES = (
+    select_columns(
+        col(MovieChange.seq), col(MovieChange.deleted), col(MovieChange.movie_id)
+    )
+    .add_columns(*PUBLIC_COLUMNS)
+    .select_from(MovieChange)
+    .outerjoin(Movie, col(Movie.id) == col(MovieChange.movie_id))
+    .where(col(MovieChange.seq) > bindparam("since"))
+    .order_by(col(MovieChange.seq))
+    .limit(bindparam("limit"))
+)
+
+# How often a long poll checks for writes made by other workers, which it is not
+# notified of.
+CHANGES_POLL_INTERVAL = 1.0
+
+# Reads of movies and list pages that are not cached, by cache generation, so that
+# a read that starts after a write never shares the result of one from before it.
+movie_reads: SingleFlight[tuple[int, int], Movie] = SingleFlight()
+page_reads: SingleFlight[tuple[int, Hashable], Page] = SingleFlight()
+
+# `year_min, year_max, runtime_min, runtime_max, title_prefix` of a list request.
+MovieFilters = tuple[int | None, int | None, int | None, int | None, str | None]
+
+# How many rows checked in a walk along an index cost as much as one row read from
+# the range of another index and sorted.
+RANGE_ROW_COST = 4
+
+# The positions in `MovieFilters` of the filters on each column with an index.
+FILTER_FIELDS = {"year": (0, 1), "runtime": (2, 3), "title": (4,)}
+
+SORT_KEYS = {
+    "id": ("id",),
+    "title": ("title", "id"),
+    "year": ("year", "id"),
+    "runtime": ("runtime", "id"),
+}
+
 
 @router.get("", response_model=list[MoviePublic])
 async def list_movies(
+    *,
+    engine: Annotated[AsyncEngine, Depends(get_engine)],
+    offset: int = Query(default=0, ge=0),
+    cursor: str | None = None,
+    limit: int = Query(default=100, ge=1, le=100),
+    sort: MovieSort = "id",
+    year_min: int | None = None,
+    year_max: int | None = None,
+    runtime_min: int | None = None,
+    runtime_max: int | None = None,
+    title_prefix: Annotated[str | None, Query(min_length=1, max_length=200)] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+):
+    """
+    Show the details of all movies, or of those within a range of years or
+    runtimes, or whose title starts with `title_prefix`, ignoring ASCII case.
+
+    Pages are ordered by `(sort, id)`. When a page is full, the `X-Next-Cursor`
+    response header carries an opaque cursor for the next page, which seeks past the
+    last row using an index instead of skipping `offset` rows. Every filter is
+    served by an index too.
+
+    The `ETag` of a page changes whenever a movie on it is added, removed or updated,
+    and a request with a matching `If-None-Match` gets an empty 304 response.
+    Concurrent requests for a page that is not cached share a single query.
+    """
+    if cursor is not None and offset:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor And Offset Are Mutually Exclusive",
+        )
+
+    filters = (year_min, year_max, runtime_min, runtime_max, title_prefix)
+    page_key = (offset, cursor, limit, sort, filters)
+    page = movie_cache.get_page(page_key)
+    if page is None:
+        generation = movie_cache.generation
+        page = await page_reads.do(
+            (generation, page_key),
+            lambda: _read_page(engine, offset, cursor, limit, sort, filters),
+        )
+        movie_cache.put_page(page_key, page, generation)
+    return _page_response(page, if_none_match)
+
+
+async def _read_page(
+    engine: AsyncEngine,
+    offset: int,
+    cursor: str | None,
+    limit: int,
+    sort: MovieSort,
+    filters: MovieFilters,
+) -> Page:
+    # Selects plain rows rather than `Movie` objects and renders them directly, as
+    # they need neither the ORM nor validation against `MoviePublic` on the way out.
+    async with engine.connect() as conn:
+        indexed = await page_index(conn, offset + limit, sort, filters)
+        statement = page_statement(offset, cursor, limit, sort, filters, indexed)
+        rows = (await conn.execute(statement)).all()
+    next_cursor = None
+    if rows and len(rows) == limit:
+        last = rows[-1]._mapping
+        keys = SORT_KEYS[sort.lstrip("-")]
+        next_cursor = encode_cursor(sort, tuple(last[key] for key in keys))
+    etag = page_etag((row.id, row.version) for row in rows)
+    body = render_json([dict(zip(PUBLIC_FIELDS, row)) for row in rows])
+    return body, etag, next_cursor
+
+
+def page_statement(
+    offset: int,
+    cursor: str | None,
+    limit: int,
+    sort: MovieSort,
+    filters: MovieFilters,
+    indexed: str | None = None,
+) -> Select:
+    """
+    The query for a page of `GET /v1/movies`, which reads the rows that match from
+    the index of the column `indexed`, as picked by `page_index`.
+    """
+    descending = sort.startswith("-")
+    keys = SORT_KEYS[sort.lstrip("-")]
+    columns = tuple(col(getattr(Movie, key)) for key in keys)
+    statement = (
+        select_columns(*PUBLIC_COLUMNS, col(Movie.version))
+        .where(*movie_filters(*filters, indexed=indexed))
+        .order_by(*_sort_order(sort))
+    )
+    if cursor is not None:
+        try:
+            position = decode_cursor(cursor, sort, len(keys))
+        except InvalidCursorError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid Cursor"
+            )
+        predicate = keyset_predicate(columns, position, descending=descending)
+        if (
+            indexed in ("year", "runtime")
+            and indexed == keys[0]
+            and _within(position[0], filters, indexed, descending)
+        ):
+            # SQLite seeks to only one lower bound of the index, so it is told that
+            # the cursor, which is past the one of the filter, is the tighter.
+            predicate = func.likelihood(predicate, literal_column("0.001"))
+        statement = statement.where(predicate)
+    else:
+        statement = statement.offset(offset)
+    return statement.limit(limit)
+
+
+def _within(value: Any, filters: MovieFilters, name: str, descending: bool) -> bool:
+    """Whether `value` is past the bound that the filters on `name` start from."""
+    start = filters[FILTER_FIELDS[name][descending]]
+    if start is None:
+        return True
+    if not isinstance(value, (int, float)) or isinstance(start, str):
+        return False
+    return value <= start if descending else value >= start
+
+
+async def page_index(
+    conn: AsyncConnection, rows: int, sort: MovieSort, filters: MovieFilters
+) -> str | None:
+    """
+    The filtered column whose index a page of `GET /v1/movies` is read from, or
+    `None` to walk the rows in the order of `sort` until `rows` of them match.
+
+    Walking visits about `rows / s` of the `n` movies, where `s` is the share that
+    match, and reading the matches from an index visits `s * n` of them, each of
+    which then costs about `RANGE_ROW_COST` walked rows to look up and sort. So the
+    walk is cheaper unless fewer than `sqrt(rows * n / RANGE_ROW_COST)` match, and
+    the index of each filtered column is counted up to that many matches. If no
+    filter is that selective, the costs are estimated from how many of the first
+    rows of the walk match.
+    """
+    columns = [
+        name
+        for name, fields in FILTER_FIELDS.items()
+        if any(filters[field] is not None for field in fields)
+    ]
+    if not columns:
+        return None
+    # An index on the sort column reads the range in order. The `NOCASE` title
+    # index is not in the order of `sort=title`.
+    key = sort.lstrip("-")
+    if key in columns and key != "title":
+        return key
+
+    # The largest id bounds the number of movies without counting them.
+    total = (await conn.execute(select_columns(func.max(col(Movie.id))))).scalar() or 0
+    cap = math.isqrt(rows * total // RANGE_ROW_COST) + 1
+    probes = []
+    for name in columns:
+        matches = (
+            select_columns(literal_column("1"))
+            .where(*movie_filters(*_column_filters(filters, name), indexed=name))
+            .limit(cap)
+            .subquery()
+        )
+        probes.append(
+            select_columns(func.count()).select_from(matches).scalar_subquery()
+        )
+    counts = (await conn.execute(select_columns(*probes))).one()
+    count, name = min(zip(counts, columns))
+    if count < cap:
+        return name
+
+    # Every filter keeps too many rows on its own, but together they may keep few,
+    # or few near the start of the walk, if they go with the sort order. Their
+    # shares, and the one of all of them, are estimated from the first `cap` rows
+    # of the walk.
+    walked = select_columns(col(Movie.id)).order_by(*_sort_order(sort)).limit(cap)
+    counters = [
+        func.count().filter(and_(*movie_filters(*only)))
+        for only in [_column_filters(filters, name) for name in columns] + [filters]
+    ]
+    *shares, joint = (
+        await conn.execute(
+            select_columns(*counters).where(col(Movie.id).in_(walked.scalar_subquery()))
+        )
+    ).one()
+    walk_cost = rows * cap / joint if joint else math.inf
+    range_cost, name = min(
+        (RANGE_ROW_COST * share * total / cap, name)
+        for share, name in zip(shares, columns)
+    )
+    return name if range_cost < walk_cost else None
+
+
+def _column_filters(filters: MovieFilters, name: str) -> MovieFilters:
+    """The filters on the column `name` alone."""
+    fields = FILTER_FIELDS[name]
+    return cast(
+        MovieFilters,
+        tuple(value if i in fields else None for i, value in enumerate(filters)),
+    )
+
+
+def _sort_order(sort: MovieSort) -> list[ColumnElement[Any]]:
+    """The `ORDER BY` of a page of `GET /v1/movies` with the given `sort`."""
+    columns = [movie_table.c[key] for key in SORT_KEYS[sort.lstrip("-")]]
+    if sort.startswith("-"):
+        return [column.desc() for column in columns]
+    return columns
+
+
+def movie_filters(
+    year_min: int | None,
+    year_max: int | None,
+    runtime_min: int | None,
+    runtime_max: int | None,
+    title_prefix: str | None = None,
+    *,
+    indexed: str | None = None,
+) -> list[ColumnElement[Any]]:
+    """
+    The conditions of the given filters.
+
+    Only those on the column `indexed` can be served by its index, and they are
+    given a low `likelihood`, as SQLite otherwise guesses that a condition with a
+    single bound keeps a quarter of the rows. The others are on `+column`, which
+    SQLite checks on each row read rather than picking an index for it.
+    """
+
+    conditions: list[ColumnElement[Any]] = []
+
+    def add(name: str, bound: Callable[[Any], ColumnElement[Any]]) -> None:
+        expression = movie_table.c[name]
+        if name != indexed:
+            conditions.append(bound(_unindexed(expression)))
+        else:
+            # The likelihood must be a literal rather than a bound parameter.
+            conditions.append(
+                func.likelihood(bound(expression), literal_column("0.01"))
+            )
+
+    if year_min is not None:
+        add("year", lambda year: year >= year_min)
+    if year_max is not None:
+        add("year", lambda year: year <= year_max)
+    if runtime_min is not None:
+        add("runtime", lambda runtime: runtime >= runtime_min)
+    if runtime_max is not None:
+        add("runtime", lambda runtime: runtime <= runtime_max)
+    if title_prefix is not None:
+        # A range on `ix_movie_title_nocase_id`, unlike `LIKE`, which SQLite only
+        # serves from an index if the column itself is declared `NOCASE`.
+        add("title", lambda title: collate(title, "NOCASE") >= title_prefix)
+        add(
+            "title",
+            lambda title: collate(title, "NOCASE") < title_prefix + "\U0010ffff",
+        )
+    return conditions
+
+
+def _unindexed(expression: ColumnElement[Any]) -> ColumnElement[Any]:
+    """`+expression`, which has the same value but is never served by an index."""
+    return UnaryExpression(expression, operator=custom_op("+"), type_=expression.type)
+
+
+def _page_response(page: Page, if_none_match: str | None) -> Response:
+    body, etag, next_cursor = page
+    headers = {"ETag": etag}
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = next_cursor
+    if not none_match(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@router.get("/search", response_model=list[MoviePublic])
+async def search_movies(
     *,
     session: Annotated[AsyncSession, Depends(get_session)],
-    offset: int = 0,
-    limit: int = Query(default=100, le=100),
+    q: str = Query(min_length=1, max_length=200),
+    year_min: int | None = None,
+    year_max: int | None = None,
+    runtime_min: int | None = None,
+    runtime_max: int | None = None,
+    limit: int = Query(default=20, ge=1, le=100),
 ):
-    """Show the details of all movies."""
-    result = await session.exec(select(Movie).offset(offset).limit(limit))
+    """
+    Search movies by title, best matches first.
+
+    Every word of the query is matched as a prefix, so `q=star wa` finds
+    "Star Wars". Results can be narrowed down by year and runtime.
+    """
+    terms = re.findall(r"\w+", q)
+    if not terms:
+        return []
+    match = " ".join(f'"{term}"*' for term in terms)
+
+    statement = (
+        select(Movie)
+        .join(movie_fts, movie_fts.c.rowid == Movie.id)
+        .where(literal_column("movie_fts").op("MATCH")(match))
+    )
+    statement = statement.where(
+        *movie_filters(year_min, year_max, runtime_min, runtime_max)
+    )
+
+    result = await session.exec(statement.order_by(movie_fts.c.rank).limit(limit))
     movies = result.all()
     return movies
 
 
+@router.get("/export", response_class=StreamingResponse)
+async def export_movies(
+    *,
+    engine: Annotated[AsyncEngine, Depends(get_engine)],
+    format: Literal["ndjson", "csv"] = "ndjson",
+    chunk_size: int = Query(default=1000, ge=1, le=10_000),
+):
+    """
+    Stream every movie as newline-delimited JSON or CSV.
+
+    Rows are read through a server-side cursor `chunk_size` at a time and written
+    out as they are read, so memory use does not depend on the size of the catalog.
+    """
+    fields = list(MoviePublic.model_fields)
+    statement = select_columns(*(col(getattr(Movie, name)) for name in fields))
+    chunks = _read_chunks(engine, statement.order_by(col(Movie.id)), chunk_size)
+    if format == "csv":
+        content = _render_csv(chunks, fields)
+        media_type = "text/csv"
+    else:
+        content = _render_ndjson(chunks)
+        media_type = "application/x-ndjson"
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="movies.{format}"'},
+    )
+
+
+async def _read_chunks(
+    engine: AsyncEngine, statement: Select, chunk_size: int
+) -> AsyncIterator[list[dict]]:
+    async with engine.connect() as connection:
+        result = await connection.stream(statement)
+        async for rows in result.mappings().partitions(chunk_size):
+            yield [dict(row) for row in rows]
+
+
+async def _render_ndjson(chunks: AsyncIterator[list[dict]]) -> AsyncIterator[str]:
+    async for rows in chunks:
+        yield "".join(
+            json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for row in rows
+        )
+
+
+async def _render_csv(
+    chunks: AsyncIterator[list[dict]], fields: list[str]
+) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    writer.writeheader()
+    async for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+@router.get("/stats", response_model=MovieStats)
+async def show_movie_stats(
+    *,
+    session: Annotated[AsyncSession, Depends(get_session)],
+):
+    """
+    Show the number of movies and their average runtime, overall and by year.
+
+    The statistics are read from a summary with a row per year, which every write to
+    a movie updates in its own transaction, so they never scan the catalog.
+    """
+    result = await session.exec(
+        select(MovieYearStats).order_by(col(MovieYearStats.year))
+    )
+    years = result.all()
+    movies = sum(stats.movies for stats in years)
+    runtime_total = sum(stats.runtime_total for stats in years)
+    return {
+        "movies": movies,
+        "average_runtime": runtime_total / movies if movies else None,
+        "years": [
+            {
+                "year": stats.year,
+                "movies": stats.movies,
+                "average_runtime": stats.runtime_total / stats.movies,
+            }
+            for stats in years
+        ],
+    }
+
+
+@router.get("/changes", response_model=MovieChanges)
+async def list_movie_changes(
+    *,
+    session: Annotated[AsyncSession, Depends(get_session)],
+    since: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, ge=1, le=1000),
+    wait: float = Query(default=0, ge=0, le=30),
+):
+    """
+    Show the movies created, updated or deleted after the change `since`.
+
+    Each movie is listed once, at its latest change, with its current details, or
+    with `deleted` set and no details if it was deleted. Passing the `next_since` of
+    a response as `since` continues from its last change, so a client that keeps a
+    copy in sync only reads what changed. A response with `limit` changes may be
+    followed by more.
+
+    With `wait`, a request that finds no changes waits up to `wait` seconds for one
+    before returning an empty list.
+    """
+    deadline = time.monotonic() + wait
+    params = {"since": since, "limit": limit}
+    conn = await session.connection()
+    rows = (await conn.execute(READ_CHANGES, params)).all()
+    while not rows and (remaining := deadline - time.monotonic()) > 0:
+        # Ends the read transaction, so that the next read sees new commits.
+        await session.rollback()
+        await movie_changes.wait(min(remaining, CHANGES_POLL_INTERVAL))
+        conn = await session.connection()
+        rows = (await conn.execute(READ_CHANGES, params)).all()
+
+    changes = [
+        {
+            "seq": seq,
+            "id": movie_id,
+            "deleted": deleted,
+            "movie": None if deleted else dict(zip(PUBLIC_FIELDS, movie)),
+        }
+        for seq, deleted, movie_id, *movie in rows
+    ]
+    next_since = rows[-1].seq if rows else since
+    body = render_json({"changes": changes, "next_since": next_since})
+    return Response(body, media_type="application/json")
+
+
 @router.post("", response_model=MoviePublic)
 async def create_movie(
-    *, session: Annotated[AsyncSession, Depends(get_session)], movie: MovieCreate
+    *, writer: Annotated[Writer, Depends(get_writer)], movie: MovieCreate
 ):
     """Create a new movie."""
-    db_movie = Movie.model_validate(movie)
-    session.add(db_movie)
-    await session.commit()
-    await session.refresh(db_movie)
+    values = Movie.model_validate(movie).model_dump(exclude={"id"})
+
+    async def write(session: AsyncSession) -> Movie:
+        connection = await session.connection()
+        row = (await connection.execute(INSERT_MOVIE, values)).one()
+        return Movie.model_validate(row._mapping)
+
+    db_movie = await writer.run(write)
+    movie_cache.updated(db_movie)
+    movie_changes.notify()
     return db_movie
 
 
+@router.post("/bulk", response_model=MovieImportReport)
+async def import_movies(
+    *,
+    session: Annotated[AsyncSession, Depends(get_session)],
+    request: Request,
+    batch_size: int = Query(default=1000, ge=1, le=5000),
+):
+    """
+    Create movies from a newline-delimited JSON body, one movie per line.
+
+    The body is read as a stream and the valid lines are inserted `batch_size` at a
+    time, each batch with a single multi-row INSERT in its own transaction. Invalid
+    lines are skipped and reported by line number, up to the first
+    `MAX_IMPORT_ERRORS` of them.
+    """
+    report = MovieImportReport()
+    batch: list[dict] = []
+    number = 0
+    async for line in iter_lines(request.stream()):
+        number += 1
+        if line is None:
+            error = {"type": "line_too_long", "loc": [], "msg": "Line Too Long"}
+            _report_import_error(report, number, [error])
+            continue
+        if not line.strip():
+            continue
+        try:
+            movie = MovieCreate.model_validate_json(line)
+        except ValidationError as e:
+            errors = e.errors(
+                include_url=False, include_input=False, include_context=False
+            )
+            _report_import_error(report, number, [dict(error) for error in errors])
+            continue
+
+        batch.append({**movie.model_dump(), "created_at": now(), "version": 1})
+        if len(batch) >= batch_size:
+            report.inserted += await _insert_movies(session, batch)
+            batch = []
+    if batch:
+        report.inserted += await _insert_movies(session, batch)
+    return report
+
+
+@router.patch("/bulk", response_model=MovieBulkReport)
+async def update_movies(
+    *,
+    writer: Annotated[Writer, Depends(get_writer)],
+    batch: MovieBulkUpdate,
+):
+    """
+    Update up to 10,000 movies in a single transaction.
+
+    Each item holds a movie's id and the fields to change, and optionally the
+    `version` it must still be at. Items making the same change are applied with a
+    single `UPDATE`, which increments the version of every movie it changes. The
+    result of each item is reported in order: `updated` with the new version,
+    `not_found`, or `conflict` with the current version if the movie was at another
+    one.
+    """
+    ids = [patch.id for patch in batch.movies]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Duplicate Movie Ids"
+        )
+
+    async def write(session: AsyncSession) -> dict[int, MovieBulkResult]:
+        connection = await session.connection()
+        result = await connection.execute(
+            select_columns(col(Movie.id), col(Movie.version)).where(
+                col(Movie.id).in_(ids)
+            )
+        )
+        versions: dict[int | None, int] = dict(result.tuples().all())
+        results = {}
+        changes: dict[tuple, list[tuple[int, int]]] = {}
+        for patch in batch.movies:
+            version = versions.get(patch.id)
+            if version is None:
+                results[patch.id] = MovieBulkResult(id=patch.id, status="not_found")
+            elif patch.version is not None and patch.version != version:
+                results[patch.id] = MovieBulkResult(
+                    id=patch.id, status="conflict", version=version
+                )
+            else:
+                values = patch.model_dump(exclude_unset=True, exclude={"id", "version"})
+                key = tuple(sorted(values.items()))
+                changes.setdefault(key, []).append((patch.id, version))
+
+        for key, rows in changes.items():
+            # Matching on the version read above too, so that a movie changed since
+            # then is reported as a conflict rather than overwritten.
+            statement = (
+                update(Movie)
+                .where(tuple_(col(Movie.id), col(Movie.version)).in_(rows))
+                .values(**dict(key), version=Movie.version + 1)
+                .returning(col(Movie.id), col(Movie.version))
+            )
+            updated = dict((await connection.execute(statement)).tuples().all())
+            for movie_id, _ in rows:
+                results[movie_id] = (
+                    MovieBulkResult(
+                        id=movie_id, status="updated", version=updated[movie_id]
+                    )
+                    if movie_id in updated
+                    else MovieBulkResult(id=movie_id, status="conflict")
+                )
+        return results
+
+    results = await writer.run(write)
+    movie_cache.invalidate(
+        movie_id for movie_id, result in results.items() if result.status == "updated"
+    )
+    movie_changes.notify()
+    return MovieBulkReport(results=[results[movie_id] for movie_id in ids])
+
+
+@router.delete("/bulk", response_model=MovieBulkReport)
+async def delete_movies(
+    *,
+    writer: Annotated[Writer, Depends(get_writer)],
+    batch: MovieBulkDelete,
+):
+    """
+    Delete up to 10,000 movies with a single `DELETE`.
+
+    The result of each id is reported in order, without duplicates: `deleted` or
+    `not_found`.
+    """
+    ids = list(dict.fromkeys(batch.ids))
+
+    async def write(session: AsyncSession) -> set[int | None]:
+        connection = await session.connection()
+        result = await connection.execute(
+            delete(Movie).where(col(Movie.id).in_(ids)).returning(col(Movie.id))
+        )
+        return set(result.scalars())
+
+    deleted = await writer.run(write)
+    movie_cache.invalidate(deleted)
+    movie_changes.notify()
+    return MovieBulkReport(
+        results=[
+            MovieBulkResult(
+                id=movie_id, status="deleted" if movie_id in deleted else "not_found"
+            )
+            for movie_id in ids
+        ]
+    )
+
+
+def _report_import_error(
+    report: MovieImportReport, line: int, errors: list[dict]
+) -> None:
+    report.failed += 1
+    if len(report.errors) < MAX_IMPORT_ERRORS:
+        report.errors.append(MovieImportError(line=line, errors=errors))
+
+
+async def _insert_movies(session: AsyncSession, movies: list[dict]) -> int:
+    connection = await session.connection()
+    await connection.execute(insert(Movie).values(movies))
+    await session.commit()
+    movie_cache.deleted()
+    movie_changes.notify()
+    return len(movies)
+
+
 @router.get("/{movie_id}", response_model=MoviePublic)
 async def show_movie(
     *,
-    session: Annotated[AsyncSession, Depends(get_session)],
+    engine: Annotated[AsyncEngine, Depends(get_engine)],
+    response: Response,
     movie_id: int = Path(..., ge=1),
+    if_none_match: Annotated[str | None, Header()] = None,
 ):
-    """Show the details of a specific movie."""
-    movie = await session.get(Movie, movie_id)
+    """
+    Show the details of a specific movie.
+
+    The `ETag` is derived from the movie's version, and a request with a matching
+    `If-None-Match` gets an empty 304 response. Concurrent requests for a movie that
+    is not cached share a single query.
+    """
+    movie = movie_cache.get(movie_id)
+    if movie is None:
+        generation = movie_cache.generation
+        movie = await movie_reads.do(
+            (generation, movie_id), lambda: _read_movie(engine, movie_id)
+        )
+        movie_cache.put(movie, generation)
+
+    etag = movie_etag(movie_id, movie.version)
+    if not none_match(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+    response.headers["ETag"] = etag
+    return movie
+
+
+async def _read_movie(engine: AsyncEngine, movie_id: int) -> Movie:
+    async with AsyncSession(engine) as session:
+        movie = await session.get(Movie, movie_id)
     if not movie:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Movie Not Found"
@@ -50,40 +813,124 @@ async def show_movie(
     return movie
 
 
+@router.post("/batch-get", response_model=MovieBatch)
+async def batch_get_movies(
+    *,
+    session: Annotated[AsyncSession, Depends(get_read_session)],
+    batch: MovieBatchGet,
+):
+    """
+    Show the details of up to 100 movies by id.
+
+    Movies are returned in the order of `ids`, without duplicates, and the ids of
+    movies that do not exist are listed in `missing`. Movies that are not cached are
+    read with a single query.
+    """
+    ids = list(dict.fromkeys(batch.ids))
+    movies: dict[int | None, Movie] = {}
+    for movie_id in ids:
+        cached = movie_cache.get(movie_id)
+        if cached is not None:
+            movies[movie_id] = cached
+
+    uncached = [movie_id for movie_id in ids if movie_id not in movies]
+    if uncached:
+        generation = movie_cache.generation
+        result = await session.exec(select(Movie).where(col(Movie.id).in_(uncached)))
+        for movie in result:
+            movie_cache.put(movie, generation)
+            movies[movie.id] = movie
+
+    return MovieBatch(
+        movies=[
+            MoviePublic.model_validate(movies[movie_id])
+            for movie_id in ids
+            if movie_id in movies
+        ],
+        missing=[movie_id for movie_id in ids if movie_id not in movies],
+    )
+
+
 @router.patch("/{movie_id}", response_model=MoviePublic)
 async def update_movie(
     *,
-    session: Annotated[AsyncSession, Depends(get_session)],
+    writer: Annotated[Writer, Depends(get_writer)],
+    response: Response,
     movie_id: int = Path(..., ge=1),
     movie: MovieUpdate,
+    if_match: Annotated[str | None, Header()] = None,
 ):
-    """Update the details of a specific movie."""
-    db_movie = await session.get(Movie, movie_id)
-    if not db_movie:
+    """
+    Update the details of a specific movie.
+
+    Every update increments the movie's version. With `If-Match`, the update only
+    happens if the movie is still at one of the given versions, checked and
+    incremented by a single `UPDATE`, and otherwise fails with 412.
+    """
+    values = movie.model_dump(exclude_unset=True)
+    parameters: dict[str, Any] = {f"new_{field}": values[field] for field in values}
+    parameters["movie_id"] = movie_id
+    versions = None if if_match is None else matching_versions(if_match, movie_id)
+    if versions is not None:
+        parameters["versions"] = versions
+    statement = _update_movie_statement(tuple(values), versions is not None)
+
+    async def write(session: AsyncSession) -> Movie:
+        connection = await session.connection()
+        row = (await connection.execute(statement, parameters)).one_or_none()
+        if row is not None:
+            return Movie.model_validate(row._mapping)
+        # Only a conditional update needs a second look to tell 412 from 404.
+        exists = select_columns(col(Movie.id)).where(col(Movie.id) == movie_id)
+        if if_match is not None and await connection.scalar(exists) is not None:
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="Movie Was Modified",
+            )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Movie Not Found"
         )
-    movie_data = movie.model_dump(exclude_unset=True)
-    for key, value in movie_data.items():
-        setattr(db_movie, key, value)
-    session.add(db_movie)
-    await session.commit()
-    await session.refresh(db_movie)
+
+    db_movie = await writer.run(write)
+    movie_cache.updated(db_movie)
+    movie_changes.notify()
+    response.headers["ETag"] = movie_etag(movie_id, db_movie.version)
     return db_movie
 
 
+@cache
+def _update_movie_statement(fields: tuple[str, ...], conditional: bool) -> Update:
+    statement = (
+        update(Movie)
+        .where(col(Movie.id) == bindparam("movie_id"))
+        .values({field: bindparam(f"new_{field}") for field in fields})
+        .values(version=Movie.version + 1)
+        .returning(*movie_table.columns)
+    )
+    if conditional:
+        statement = statement.where(
+            col(Movie.version).in_(bindparam("versions", expanding=True))
+        )
+    return statement
+
+
 @router.delete("/{movie_id}")
 async def delete_movie(
     *,
-    session: Annotated[AsyncSession, Depends(get_session)],
+    writer: Annotated[Writer, Depends(get_writer)],
     movie_id: int = Path(ge=1),
 ):
     """Delete a specific movie."""
-    movie = await session.get(Movie, movie_id)
-    if not movie:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Movie Not Found"
-        )
-    await session.delete(movie)
-    await session.commit()
+
+    async def write(session: AsyncSession) -> None:
+        connection = await session.connection()
+        result = await connection.execute(DELETE_MOVIE, {"movie_id": movie_id})
+        if result.first() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Movie Not Found"
+            )
+
+    await writer.run(write)
+    movie_cache.deleted(movie_id)
+    movie_changes.notify()
     return {"ok": True}
@@ -7,7 +7,11 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.dependencies import get_session
 from app.internal.env import ACCESS_TOKEN_EXPIRE_MINUTES
-from app.internal.security import authenticate_user, create_access_token
+from app.internal.security import (
+    PasswordVerifierOverloadedError,
+    authenticate_user,
+    create_access_token,
+)
 from app.models.tokens import Token
 
 router = APIRouter(prefix="/tokens")
@@ -19,9 +23,16 @@ async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     session: Annotated[AsyncSession, Depends(get_session)],
 ) -> Token:
-    user = await authenticate_user(
-        form_data.username, form_data.password, session=session
-    )
+    try:
+        user = await authenticate_user(
+            form_data.username, form_data.password, session=session
+        )
+    except PasswordVerifierOverloadedError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too Many Login Attempts",
+            headers={"Retry-After": "1"},
+        )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
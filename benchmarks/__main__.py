@@ -0,0 +1,115 @@
+"""
+Reproducible load tests for every v1 endpoint.
+
+Usage:
+    python -m benchmarks dataset PATH [--movies N] [--users N] [--seed N]
+    python -m benchmarks run DATASET [--scenario NAME ...] [--concurrency N]
+        [--duration SECONDS] [--seed N] [--uvicorn] [--port N] [--output PATH]
+        [--save-baseline NAME]
+    python -m benchmarks compare REPORT [--baseline NAME] [--tolerance FRACTION]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+from typing import Any
+
+
+def dataset_command(args: argparse.Namespace) -> int:
+    from . import dataset
+
+    dataset.main(args.path, args.movies, args.users, args.seed)
+    return 0
+
+
+def run_command(args: argparse.Namespace) -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        # Scenarios write to the database, so they run against a scratch copy. The
+        # application reads its configuration when it is first imported, which
+        # happens below, after the environment points at the copy.
+        database = f"{directory}/benchmark.db"
+        shutil.copyfile(args.dataset, database)
+        os.environ["DATABASE_PATH"] = database
+        os.environ.setdefault("LOG_FILE", f"{directory}/app.log")
+
+        from . import runner
+        from .compare import baseline_path
+        from .scenarios import SCENARIOS
+
+        unknown = set(args.scenario or []) - set(SCENARIOS)
+        if unknown:
+            print(f"unknown scenarios: {', '.join(sorted(unknown))}", file=sys.stderr)
+            return 2
+        report = asyncio.run(
+            runner.run(
+                scenarios=args.scenario or list(SCENARIOS),
+                concurrency=args.concurrency,
+                duration=args.duration,
+                seed=args.seed,
+                uvicorn=args.uvicorn,
+                port=args.port,
+            )
+        )
+
+    output = json.dumps(report, indent=2) + "\n"
+    if args.save_baseline:
+        path = baseline_path(args.save_baseline)
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(output)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    elif not args.save_baseline:
+        sys.stdout.write(output)
+    return 0
+
+
+def compare_command(args: argparse.Namespace) -> int:
+    from . import compare
+
+    return compare.main(args.report, args.baseline, args.tolerance)
+
+
+def parse_args(argv: list[str] | None = None) -> Any:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description=__doc__.splitlines()[1]
+    )
+    commands = parser.add_subparsers(required=True)
+
+    parser_dataset = commands.add_parser("dataset", help="generate a dataset")
+    parser_dataset.add_argument("path")
+    parser_dataset.add_argument("--movies", type=int, default=100_000)
+    parser_dataset.add_argument("--users", type=int, default=1000)
+    parser_dataset.add_argument("--seed", type=int, default=0)
+    parser_dataset.set_defaults(command=dataset_command)
+
+    parser_run = commands.add_parser("run", help="run scenarios against a dataset")
+    parser_run.add_argument("dataset")
+    parser_run.add_argument(
+        "--scenario", action="append", help="may be repeated; defaults to all"
+    )
+    parser_run.add_argument("--concurrency", type=int, default=10)
+    parser_run.add_argument("--duration", type=float, default=5.0)
+    parser_run.add_argument("--seed", type=int, default=0)
+    parser_run.add_argument("--uvicorn", action="store_true")
+    parser_run.add_argument("--port", type=int, default=8765)
+    parser_run.add_argument("--output")
+    parser_run.add_argument("--save-baseline", metavar="NAME")
+    parser_run.set_defaults(command=run_command)
+
+    parser_compare = commands.add_parser("compare", help="compare with a baseline")
+    parser_compare.add_argument("report")
+    parser_compare.add_argument("--baseline", default="default")
+    parser_compare.add_argument("--tolerance", type=float, default=0.2)
+    parser_compare.set_defaults(command=compare_command)
+
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    sys.exit(args.command(args))
@@ -0,0 +1,81 @@
+"""
+Compares a benchmark report with a stored baseline.
+
+A scenario has regressed when its throughput fell, or its p95 latency rose, by more
+than the tolerance. Exits with status 1 if any scenario regressed, has errors, or
+has no baseline, which means the baseline must be regenerated with `run
+--save-baseline` after adding a scenario.
+
+Usage:
+    python -m benchmarks compare REPORT [--baseline NAME] [--tolerance FRACTION]
+"""
+
+import json
+from pathlib import Path
+from typing import Any
+
+BASELINES = Path(__file__).parent / "baselines"
+
+
+def baseline_path(name: str) -> Path:
+    """The stored baseline called `name`, or `name` itself if it is a JSON file."""
+    if name.endswith(".json"):
+        return Path(name)
+    return BASELINES / f"{name}.json"
+
+
+def load(path: str | Path) -> dict[str, Any]:
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare(
+    baseline: dict[str, Any], report: dict[str, Any], tolerance: float
+) -> list[str]:
+    """Returns a description of every regression of `report` against `baseline`."""
+    regressions = []
+    for name, result in report["scenarios"].items():
+        if result["errors"]:
+            regressions.append(f"{name}: {result['errors']} errors")
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            regressions.append(f"{name}: no baseline")
+            continue
+        if result["throughput"] < before["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {before['throughput']:.1f} -> "
+                f"{result['throughput']:.1f} req/s"
+            )
+        p95_before = before.get("latency_ms", {}).get("p95")
+        p95 = result.get("latency_ms", {}).get("p95")
+        if p95_before is not None and p95 is not None:
+            if p95 > p95_before * (1 + tolerance):
+                regressions.append(f"{name}: p95 {p95_before:.2f} -> {p95:.2f} ms")
+    return regressions
+
+
+def format_comparison(baseline: dict[str, Any], report: dict[str, Any]) -> str:
+    lines = [f"{'scenario':<20} {'req/s':>21}  {'p95 ms':>21}"]
+    for name, result in report["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        p95 = result.get("latency_ms", {}).get("p95", 0)
+        if before is None:
+            throughput = f"- -> {result['throughput']:.1f}"
+            lines.append(f"{name:<20} {throughput:>21}  - -> {p95:.2f}")
+            continue
+        throughput = f"{before['throughput']:.1f} -> {result['throughput']:.1f}"
+        p95_before = before.get("latency_ms", {}).get("p95", 0)
+        lines.append(f"{name:<20} {throughput:>21}  {p95_before:.2f} -> {p95:.2f}")
+    return "\n".join(lines)
+
+
+def main(report_path: str, baseline_name: str, tolerance: float) -> int:
+    baseline = load(baseline_path(baseline_name))
+    report = load(report_path)
+    if baseline["meta"]["dataset"] != report["meta"]["dataset"]:
+        print("warning: the report and the baseline used different datasets")
+    print(format_comparison(baseline, report))
+    regressions = compare(baseline, report, tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
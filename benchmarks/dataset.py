@@ -0,0 +1,99 @@
+"""
+Seeded synthetic dataset for the benchmark suite.
+
+The same `--seed` always produces the same database: movies with titles made of
+random words, years and runtimes, and users `user0` to `user<N-1>` who all have the
+password `password`.
+
+Usage:
+    python -m benchmarks dataset PATH [--movies N] [--users N] [--seed N]
+"""
+
+import random
+import sqlite3
+import time
+from pathlib import Path
+from typing import Iterator
+
+from sqlalchemy import create_engine
+from sqlmodel import SQLModel
+
+from app.internal.security import pwd_context
+
+# Imported for their tables.
+from app.models.movies import Movie  # noqa: F401
+from app.models.users import User  # noqa: F401
+
+PASSWORD = "password"
+
+WORDS = (
+    "star wars trek return empire night day dark knight last first man woman "
+    "love story city lost found king queen ghost dragon river mountain sea war "
+    "peace secret life death dream house road home fire ice summer winter "
+    "spring fall blue red golden silent wild great little big new old heart "
+    "moon sun shadow light time machine game girl boy world journey island"
+).split()
+
+CHUNK_SIZE = 10_000
+
+
+def movie_rows(count: int, rng: random.Random) -> Iterator[tuple]:
+    created_at = "2024-01-01 00:00:00.000000"
+    for _ in range(count):
+        title = " ".join(rng.choices(WORDS, k=rng.randint(1, 4))).title()
+        year = rng.randint(1920, 2024)
+        runtime = rng.randint(60, 200)
+        yield (title, year, runtime, created_at, 1)
+
+
+def user_rows(count: int, hashed_password: str) -> Iterator[tuple]:
+    for i in range(count):
+        yield (f"user{i}", f"user{i}@example.com", f"User {i}", False, hashed_password)
+
+
+def insert(
+    connection: sqlite3.Connection, statement: str, rows: Iterator[tuple]
+) -> None:
+    while True:
+        chunk = [row for _, row in zip(range(CHUNK_SIZE), rows)]
+        if not chunk:
+            return
+        connection.executemany(statement, chunk)
+
+
+def generate(path: str, *, movies: int, users: int, seed: int = 0) -> None:
+    """Creates a fresh database at `path` holding `movies` movies and `users` users."""
+    Path(path).unlink(missing_ok=True)
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    engine.dispose()
+
+    rng = random.Random(seed)
+    # bcrypt is slow by design, and every user has the same password anyway.
+    hashed_password = pwd_context.hash(PASSWORD)
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute("PRAGMA journal_mode = WAL")
+        insert(
+            connection,
+            "INSERT INTO movie (title, year, runtime, created_at, version) "
+            "VALUES (?, ?, ?, ?, ?)",
+            movie_rows(movies, rng),
+        )
+        insert(
+            connection,
+            'INSERT INTO "user" (username, email, full_name, disabled, '
+            "hashed_password) VALUES (?, ?, ?, ?, ?)",
+            user_rows(users, hashed_password),
+        )
+    connection.execute("ANALYZE")
+    connection.close()
+
+
+def main(path: str, movies: int, users: int, seed: int) -> None:
+    start = time.perf_counter()
+    generate(path, movies=movies, users=users, seed=seed)
+    print(
+        f"{movies} movies and {users} users written to {path} "
+        f"in {time.perf_counter() - start:.1f} s"
+    )
@@ -0,0 +1,91 @@
+"""
+Write throughput of `POST /v1/movies` with and without group commit.
+
+For each level of concurrency, that many clients create movies in-process against a
+file database using the production engine profile, first with a commit per request
+and then with the group commit writer.
+
+Usage:
+    python -m benchmarks.group_commit [--writes N] [--synchronous MODE]
+        [--concurrency N [N ...]]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from typing import AsyncGenerator
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.dependencies import get_session
+from app.internal.database import create_engine
+from app.internal.writes import GroupCommitWriter
+from app.main import create_app
+
+
+async def measure(
+    engine: AsyncEngine, writes: int, concurrency: int, group_commit: bool
+) -> float:
+    async def get_session_override() -> AsyncGenerator[AsyncSession, None]:
+        async with AsyncSession(engine) as session:
+            yield session
+
+    app = create_app(enable_rate_limiter=False)
+    app.dependency_overrides[get_session] = get_session_override
+    if group_commit:
+        app.state.group_commit_writer = GroupCommitWriter(engine)
+    transport = ASGITransport(app=app)  # type: ignore
+    movie = {"title": "Moana", "year": 2016, "runtime": 107}
+
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+
+        async def write(count: int) -> None:
+            for _ in range(count):
+                response = await client.post("/v1/movies", json=movie)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(write(writes // concurrency) for _ in range(concurrency))
+        )
+        elapsed = time.perf_counter() - start
+    if group_commit:
+        await app.state.group_commit_writer.close()
+    return writes // concurrency * concurrency / elapsed
+
+
+async def main(writes: int, synchronous: str, levels: list[int]) -> None:
+    print(f"{writes} writes, synchronous={synchronous}")
+    for concurrency in levels:
+        results = []
+        for group_commit in (False, True):
+            with tempfile.TemporaryDirectory() as directory:
+                engine = create_engine(
+                    f"{directory}/benchmark.db", synchronous=synchronous
+                )
+                async with engine.begin() as conn:
+                    await conn.run_sync(SQLModel.metadata.create_all)
+                results.append(await measure(engine, writes, concurrency, group_commit))
+                await engine.dispose()
+        per_request, grouped = results
+        print(
+            f"{concurrency:4} writers: commit per request {per_request:7.0f} writes/s, "
+            f"group commit {grouped:7.0f} writes/s ({grouped / per_request:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writes", type=int, default=2_000)
+    parser.add_argument(
+        "--synchronous", default="FULL", choices=["OFF", "NORMAL", "FULL", "EXTRA"]
+    )
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[50, 100, 250, 500]
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.writes, args.synchronous, args.concurrency))
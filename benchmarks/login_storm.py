@@ -0,0 +1,113 @@
+"""
+Latency of `GET /v1/healthcheck` during a storm of logins.
+
+Sends `--logins` concurrent `POST /v1/tokens` requests in-process while another
+client polls the healthcheck, once with bcrypt on the event loop as it used to run
+and once on the password verifier's thread pool.
+
+Usage:
+    python -m benchmarks.login_storm [--logins N] [--concurrency N]
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from typing import AsyncGenerator
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.dependencies import get_session
+from app.internal import security
+from app.main import create_app
+from app.models.users import User
+
+
+async def create_engine(directory: str) -> AsyncEngine:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{directory}/benchmark.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with AsyncSession(engine) as session:
+        session.add(
+            User(username="johndoe", hashed_password=security.pwd_context.hash("pw"))
+        )
+        await session.commit()
+    return engine
+
+
+async def verify_on_event_loop(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return security.pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+async def storm(engine: AsyncEngine, logins: int, concurrency: int) -> list[float]:
+    async def get_session_override() -> AsyncGenerator[AsyncSession, None]:
+        async with AsyncSession(engine) as session:
+            yield session
+
+    app = create_app(enable_rate_limiter=False)
+    app.dependency_overrides[get_session] = get_session_override
+    transport = ASGITransport(app=app)  # type: ignore
+    latencies: list[float] = []
+    done = asyncio.Event()
+
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def login() -> None:
+            async with semaphore:
+                await client.post(
+                    "/v1/tokens", data={"username": "johndoe", "password": "pw"}
+                )
+
+        async def poll() -> None:
+            # Latency is measured from when the healthcheck was due, so that time
+            # spent waiting for a blocked event loop is counted too.
+            due = time.perf_counter()
+            while not done.is_set():
+                due += 0.01
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+                await client.get("/v1/healthcheck")
+                latencies.append((time.perf_counter() - due) * 1000)
+                due = max(due, time.perf_counter())
+
+        poller = asyncio.create_task(poll())
+        await asyncio.gather(*(login() for _ in range(logins)))
+        done.set()
+        await poller
+    return latencies
+
+
+def report(name: str, latencies: list[float]) -> None:
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    print(
+        f"{name:>12}: {len(latencies):4} healthchecks, "
+        f"p50 {quantiles[49]:7.1f} ms, p99 {quantiles[98]:7.1f} ms, "
+        f"max {max(latencies):7.1f} ms"
+    )
+
+
+async def main(logins: int, concurrency: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = await create_engine(directory)
+        print(f"{logins} logins, {concurrency} at a time")
+
+        executor_verify = security.password_verifier.verify_and_update
+        security.password_verifier.verify_and_update = verify_on_event_loop  # type: ignore
+        report("event loop", await storm(engine, logins, concurrency))
+        security.password_verifier.verify_and_update = executor_verify  # type: ignore
+        report("thread pool", await storm(engine, logins, concurrency))
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.concurrency))
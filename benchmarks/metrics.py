@@ -0,0 +1,70 @@
+"""
+Cost of collecting metrics.
+
+Measures the per-request overhead of `MetricsMiddleware` by driving it directly with
+synthetic ASGI calls, and the per-statement overhead of the SQL statement and pool
+instrumentation against a file database.
+
+Usage:
+    python -m benchmarks.metrics [--requests N] [--statements N]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+from sqlalchemy import text
+from starlette.types import ASGIApp
+
+from app.internal.database import create_engine
+from app.middlewares import MetricsMiddleware
+from benchmarks.rate_limiter import endpoint, make_receive, make_scope, send
+
+
+async def measure_requests(app: ASGIApp, requests: int) -> float:
+    scope = make_scope(0)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), make_receive(), send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def measure_statements(path: str, statements: int, name: str | None) -> float:
+    engine = create_engine(path, name=name)
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        start = time.perf_counter()
+        for i in range(statements):
+            await conn.execute(text("SELECT :i"), {"i": i})
+        elapsed = time.perf_counter() - start
+    await engine.dispose()
+    return elapsed / statements * 1e6
+
+
+async def main(requests: int, statements: int) -> None:
+    await measure_requests(endpoint, requests)
+    baseline = await measure_requests(endpoint, requests)
+    instrumented = await measure_requests(MetricsMiddleware(endpoint), requests)
+    print(
+        f"{requests} requests: {baseline:6.2f} us/request without metrics, "
+        f"{instrumented:6.2f} us/request with ({instrumented - baseline:+.2f} us)"
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = f"{directory}/benchmark.db"
+        await measure_statements(path, statements, None)
+        baseline = await measure_statements(path, statements, None)
+        instrumented = await measure_statements(path, statements, "benchmark")
+    print(
+        f"{statements} statements: {baseline:6.2f} us/statement without metrics, "
+        f"{instrumented:6.2f} us/statement with ({instrumented - baseline:+.2f} us)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--statements", type=int, default=20_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.statements))
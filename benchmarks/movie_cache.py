@@ -0,0 +1,111 @@
+"""
+Throughput of `GET /v1/movies/{id}` and `GET /v1/movies` with and without the
+movie cache.
+
+Requests are sent in-process against a file database holding `--movies` movies.
+Movie ids follow a Zipf-like distribution, so that a few popular titles get most of
+the traffic, and list requests cycle through the first `--pages` pages.
+
+Usage:
+    python -m benchmarks.movie_cache [--requests N] [--movies N] [--pages N]
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from typing import AsyncGenerator
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.dependencies import get_session
+from app.internal.cache import LRUCache, clear_caches
+from app.internal.movie_cache import MovieCache, movie_cache
+from app.main import create_app
+from app.models.movies import Movie, now
+from app.routers.v1 import movies as movies_router
+
+
+async def create_engine(directory: str, movies: int) -> AsyncEngine:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{directory}/benchmark.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.execute(
+            insert(Movie).values(
+                [
+                    {
+                        "title": f"Movie {i}",
+                        "year": 1900 + i % 120,
+                        "runtime": 60 + i % 120,
+                        "created_at": now(),
+                        "version": 1,
+                    }
+                    for i in range(movies)
+                ]
+            )
+        )
+    return engine
+
+
+async def measure(engine: AsyncEngine, paths: list[str]) -> float:
+    async def get_session_override() -> AsyncGenerator[AsyncSession, None]:
+        async with AsyncSession(engine) as session:
+            yield session
+
+    app = create_app(enable_rate_limiter=False)
+    app.dependency_overrides[get_session] = get_session_override
+    transport = ASGITransport(app=app)  # type: ignore
+    clear_caches()
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        start = time.perf_counter()
+        for path in paths:
+            response = await client.get(path)
+            response.raise_for_status()
+        return len(paths) / (time.perf_counter() - start)
+
+
+async def main(requests: int, movies: int, pages: int) -> None:
+    rng = random.Random(0)
+    weights = [1 / rank for rank in range(1, movies + 1)]
+    ids = rng.choices(range(1, movies + 1), weights, k=requests)
+    scenarios = {
+        "show": [f"/v1/movies/{movie_id}" for movie_id in ids],
+        "list": [f"/v1/movies?offset={i % pages * 100}" for i in range(requests)],
+    }
+
+    disabled = MovieCache(
+        LRUCache("movies_disabled", maxsize=0, ttl=0),
+        LRUCache("movie_pages_disabled", maxsize=0, ttl=0),
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        engine = await create_engine(directory, movies)
+        print(f"{requests} requests, {movies} movies")
+        for name, paths in scenarios.items():
+            movies_router.movie_cache = disabled
+            uncached = await measure(engine, paths)
+            movies_router.movie_cache = movie_cache
+            cached = await measure(engine, paths)
+            if name == "show":
+                stats = movie_cache.movies.stats()
+            else:
+                stats = movie_cache.pages.stats()
+            print(
+                f"{name:>5}: uncached {uncached:8.0f} req/s, "
+                f"cached {cached:8.0f} req/s ({cached / uncached:.1f}x), "
+                f"hit rate {stats['hit_rate']:.1%}"
+            )
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--movies", type=int, default=10_000)
+    parser.add_argument("--pages", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.movies, args.pages))
@@ -0,0 +1,187 @@
+"""
+Per-request overhead of the rate limiter middleware.
+
+Drives the middleware directly with synthetic ASGI calls against an app that does
+nothing, so the numbers are the cost of the middleware alone. The previous
+`BaseHTTPMiddleware` implementation is kept here for comparison.
+
+With `--processes N`, N processes instead share one SQLite bucket and the number of
+calls let through is checked against the limit.
+
+Usage:
+    python -m benchmarks.rate_limiter [--requests N] [--clients N] [--processes N]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict, deque
+from typing import Callable
+
+from fastapi import HTTPException, status
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.internal.ratelimit import SQLiteTokenBucketLimiter
+from app.middlewares import RateLimiterMiddleware
+
+
+class LegacyRateLimiterMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app: ASGIApp, max_calls: int = 2, period: int = 1) -> None:
+        super().__init__(app)
+        self.max_calls = max_calls
+        self.period = period
+        self.rate_limiters: dict[str, deque[float]] = defaultdict(deque)
+        self.lock = asyncio.Lock()
+
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        client_ip = request.client.host if request.client else "unknown"
+        current_time = time.time()
+
+        async with self.lock:
+            access_times = self.rate_limiters[client_ip]
+
+            while access_times and access_times[0] + self.period < current_time:
+                access_times.popleft()
+
+            if len(access_times) >= self.max_calls:
+                return JSONResponse(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    content={"detail": "Too Many Requests"},
+                )
+
+            access_times.append(current_time)
+
+        try:
+            response = await call_next(request)
+        except HTTPException as e:
+            return JSONResponse(status_code=e.status_code, content={"detail": e.detail})
+        except Exception:
+            return JSONResponse(
+                status_code=500, content={"detail": "Internal Server Error"}
+            )
+        return response
+
+
+async def endpoint(scope: Scope, receive: Receive, send: Send) -> None:
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+def make_receive() -> Receive:
+    received = False
+
+    async def receive() -> Message:
+        nonlocal received
+        if received:
+            # Like a server, block until the client disconnects.
+            await asyncio.Event().wait()
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    return receive
+
+
+async def send(message: Message) -> None:
+    pass
+
+
+def make_scope(client: int) -> Scope:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/v1/healthcheck",
+        "raw_path": b"/v1/healthcheck",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [],
+        "client": (f"10.{client >> 16 & 255}.{client >> 8 & 255}.{client & 255}", 0),
+        "server": ("test", 80),
+    }
+
+
+async def measure(app: ASGIApp, requests: int, clients: int) -> float:
+    scopes = [make_scope(i) for i in range(clients)]
+    start = time.perf_counter()
+    for i in range(requests):
+        await app(scopes[i % clients], make_receive(), send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def measure_memory(app: ASGIApp, requests: int, clients: int) -> int:
+    tracemalloc.start()
+    await measure(app, requests, clients)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current
+
+
+async def main(requests: int, clients: int, directory: str) -> None:
+    # A limit that is never hit, so every call takes the full path through the app.
+    max_calls, period = requests, 60
+
+    def sqlite_app() -> ASGIApp:
+        path = tempfile.mktemp(suffix=".db", dir=directory)
+        limiter = SQLiteTokenBucketLimiter(path, max_calls, period)
+        return RateLimiterMiddleware(endpoint, max_calls, period, limiter=limiter)
+
+    apps: dict[str, Callable[[], ASGIApp]] = {
+        "no middleware": lambda: endpoint,
+        "legacy": lambda: LegacyRateLimiterMiddleware(endpoint, max_calls, period),
+        "memory": lambda: RateLimiterMiddleware(endpoint, max_calls, period),
+        "sqlite": sqlite_app,
+    }
+    await measure(endpoint, requests, clients)
+    baseline = await measure(endpoint, requests, clients)
+    print(f"{requests} requests from {clients} clients")
+    for name, factory in apps.items():
+        per_request = await measure(factory(), requests, clients)
+        memory = await measure_memory(factory(), requests, clients)
+        print(
+            f"{name:>14}: {per_request:7.2f} us/request, "
+            f"overhead {per_request - baseline:7.2f} us, "
+            f"retained memory {memory / 1024:9.1f} KiB"
+        )
+
+
+def hammer(path: str, max_calls: int, requests: int) -> int:
+    limiter = SQLiteTokenBucketLimiter(path, max_calls, 3600)
+    return sum(limiter.hit("client", time.time()) == 0 for _ in range(requests))
+
+
+def shared(processes: int, requests: int, directory: str) -> None:
+    path = os.path.join(directory, "shared.db")
+    max_calls = requests // 2
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        allowed = pool.starmap(hammer, [(path, max_calls, requests)] * processes)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{processes} processes x {requests} calls against a limit of {max_calls}: "
+        f"{sum(allowed)} allowed ({allowed}), "
+        f"{elapsed / (processes * requests) * 1e6:.2f} us/call wall clock"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=50_000)
+    parser.add_argument("--clients", type=int, default=10_000)
+    parser.add_argument("--processes", type=int, default=0)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        if args.processes:
+            shared(args.processes, args.requests, directory)
+        else:
+            asyncio.run(main(args.requests, args.clients, directory))
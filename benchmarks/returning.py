@@ -0,0 +1,171 @@
+"""
+Cost of a movie write with ORM round trips and with a single `... RETURNING`.
+
+Runs `--writes` creates, updates and deletes against a file database using the
+production engine profile, each in its own transaction, first as the endpoints used
+to make them, through the ORM, and then by calling the endpoints. Reports the
+statements per write, the latency of a write including its commit, and how long it
+holds the write lock: from its first statement that writes to the end of its commit.
+
+Usage:
+    python -m benchmarks.returning [--writes N]
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from typing import Any, Awaitable, Callable
+
+from fastapi import HTTPException, Response
+from sqlalchemy import event, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlmodel import SQLModel, col
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.internal.database import create_engine
+from app.internal.movie_cache import movie_cache
+from app.internal.writes import SessionWriter
+from app.models.movies import Movie, MovieCreate, MovieUpdate
+from app.routers.v1 import movies
+
+MOVIE = MovieCreate(title="Moana", year=2016, runtime=107)
+
+
+async def create_with_orm(writer: SessionWriter, movie_id: int) -> None:
+    async def write(session: AsyncSession) -> Movie:
+        db_movie = Movie.model_validate(MOVIE)
+        session.add(db_movie)
+        await session.flush()
+        return Movie.model_validate(db_movie)
+
+    movie_cache.updated(await writer.run(write))
+
+
+async def update_with_orm(writer: SessionWriter, movie_id: int) -> None:
+    statement = (
+        update(Movie)
+        .where(col(Movie.id) == movie_id)
+        .values(year=2017, version=Movie.version + 1)
+    )
+
+    async def write(session: AsyncSession) -> Movie:
+        connection = await session.connection()
+        await connection.execute(statement)
+        db_movie = await session.get(Movie, movie_id, populate_existing=True)
+        if db_movie is None:
+            raise HTTPException(status_code=404)
+        return Movie.model_validate(db_movie)
+
+    movie_cache.updated(await writer.run(write))
+
+
+async def delete_with_orm(writer: SessionWriter, movie_id: int) -> None:
+    async def write(session: AsyncSession) -> None:
+        movie = await session.get(Movie, movie_id)
+        if not movie:
+            raise HTTPException(status_code=404)
+        await session.delete(movie)
+        await session.flush()
+
+    await writer.run(write)
+    movie_cache.deleted(movie_id)
+
+
+async def create_with_returning(writer: SessionWriter, movie_id: int) -> None:
+    await movies.create_movie(writer=writer, movie=MOVIE)
+
+
+async def update_with_returning(writer: SessionWriter, movie_id: int) -> None:
+    await movies.update_movie(
+        writer=writer,
+        response=Response(),
+        movie_id=movie_id,
+        movie=MovieUpdate(year=2017),
+        if_match=None,
+    )
+
+
+async def delete_with_returning(writer: SessionWriter, movie_id: int) -> None:
+    await movies.delete_movie(writer=writer, movie_id=movie_id)
+
+
+class Recorder:
+    """Counts the statements of each transaction and times its write lock."""
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.statements = 0
+        self.locked_at: float | None = None
+        self.lock_times: list[float] = []
+        event.listen(engine.sync_engine, "before_cursor_execute", self.before)
+        event.listen(Session, "after_commit", self.after_commit)
+
+    def before(self, conn, cursor, statement: str, *args: Any) -> None:
+        self.statements += 1
+        # SQLite takes the write lock with the first statement that writes.
+        if self.locked_at is None and not statement.startswith("SELECT"):
+            self.locked_at = time.perf_counter()
+
+    def after_commit(self, session: Session) -> None:
+        if self.locked_at is not None:
+            self.lock_times.append(time.perf_counter() - self.locked_at)
+        self.locked_at = None
+
+
+async def measure(
+    engine: AsyncEngine,
+    recorder: Recorder,
+    operation: Callable[[SessionWriter, int], Awaitable[None]],
+    ids: range,
+) -> tuple[float, float, float]:
+    recorder.statements = 0
+    recorder.lock_times = []
+    latencies = []
+    for movie_id in ids:
+        start = time.perf_counter()
+        async with AsyncSession(engine) as session:
+            await operation(SessionWriter(session), movie_id)
+        latencies.append(time.perf_counter() - start)
+    return (
+        recorder.statements / len(ids),
+        statistics.fmean(latencies) * 1e6,
+        statistics.fmean(recorder.lock_times) * 1e6,
+    )
+
+
+async def main(writes: int) -> None:
+    operations = [
+        ("create", create_with_orm, create_with_returning),
+        ("update", update_with_orm, update_with_returning),
+        ("delete", delete_with_orm, delete_with_returning),
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"{directory}/benchmark.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        recorder = Recorder(engine)
+
+        # Creates make movies 1 to 2N, updated and then deleted half by each variant.
+        for name, with_orm, with_returning in operations:
+            orm = await measure(engine, recorder, with_orm, range(1, writes + 1))
+            returning = await measure(
+                engine, recorder, with_returning, range(writes + 1, 2 * writes + 1)
+            )
+            for label, (statements, latency, lock) in [
+                ("ORM", orm),
+                ("RETURNING", returning),
+            ]:
+                print(
+                    f"{name} {label:<9} {statements:4.1f} statements/write, "
+                    f"{latency:7.1f} us/write, write lock held {lock:7.1f} us"
+                )
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writes", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.writes))
@@ -0,0 +1,216 @@
+"""
+Drives the scenarios against a copy of a benchmark dataset and reports throughput
+and latency percentiles as JSON.
+
+The application runs either in-process, behind httpx's ASGI transport, or as a
+real uvicorn server on localhost. Either way it reads its configuration from the
+environment, so `DATABASE_PATH` must point at the scratch copy of the dataset before
+this module is imported; `python -m benchmarks run` takes care of that.
+
+Usage:
+    python -m benchmarks run DATASET [--scenario NAME ...] [--concurrency N]
+        [--duration SECONDS] [--uvicorn] [--output PATH] [--save-baseline NAME]
+"""
+
+import asyncio
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from httpx import ASGITransport, AsyncClient, HTTPError
+
+from .scenarios import SCENARIOS, Context, Scenario
+
+
+def describe(path: str) -> dict[str, int]:
+    connection = sqlite3.connect(path)
+    try:
+        (movies,) = connection.execute("SELECT max(id) FROM movie").fetchone()
+        (users,) = connection.execute('SELECT count(*) FROM "user"').fetchone()
+    finally:
+        connection.close()
+    return {"movies": movies or 0, "users": users}
+
+
+def git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict[str, Any]:
+    result: dict[str, Any] = {
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed": round(elapsed, 3),
+        "throughput": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+    }
+    if len(latencies) > 1:
+        percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        result["latency_ms"] = {
+            "mean": round(statistics.fmean(latencies) * 1000, 3),
+            "p50": round(percentiles[49] * 1000, 3),
+            "p95": round(percentiles[94] * 1000, 3),
+            "p99": round(percentiles[98] * 1000, 3),
+            "max": round(max(latencies) * 1000, 3),
+        }
+    return result
+
+
+async def run_scenario(
+    client: AsyncClient,
+    scenario: Scenario,
+    context: Context,
+    *,
+    concurrency: int,
+    duration: float,
+) -> dict[str, Any]:
+    """
+    Sends requests from `concurrency` workers for `duration` seconds, or until the
+    scenario's request budget is spent.
+    """
+    budget = scenario.max_requests
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker(deadline: float, record: bool) -> None:
+        nonlocal budget, errors
+        while time.perf_counter() < deadline:
+            if budget is not None:
+                if budget <= 0:
+                    return
+                budget -= 1
+            start = time.perf_counter()
+            try:
+                response = await scenario.send(client, context)
+                ok = response.status_code in scenario.expected
+            except HTTPError:
+                ok = False
+            if not record:
+                return
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    # One unrecorded request per worker, so that connections are open and caches
+    # have seen their first request before the clock starts.
+    if budget is None:
+        await asyncio.gather(
+            *(worker(float("inf"), record=False) for _ in range(concurrency))
+        )
+
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(worker(deadline, record=True) for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+@asynccontextmanager
+async def in_process_client() -> AsyncIterator[AsyncClient]:
+    from .server import create_benchmark_app
+
+    app = create_benchmark_app()
+    transport = ASGITransport(app=app)  # type: ignore
+    # The transport does not send lifespan events, so the writer and the engines
+    # are shut down by entering the lifespan here.
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            yield client
+
+
+@asynccontextmanager
+async def uvicorn_client(port: int) -> AsyncIterator[AsyncClient]:
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "benchmarks.server:create_benchmark_app",
+            "--factory",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ]
+    )
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        async with AsyncClient(base_url=base_url, timeout=60) as client:
+            for _ in range(100):
+                if server.poll() is not None:
+                    raise RuntimeError("uvicorn exited before it was ready")
+                try:
+                    await client.get("/v1/healthcheck")
+                    break
+                except HTTPError:
+                    await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn did not become ready")
+            yield client
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def run(
+    *,
+    scenarios: list[str],
+    concurrency: int,
+    duration: float,
+    seed: int,
+    uvicorn: bool,
+    port: int,
+) -> dict[str, Any]:
+    """Runs `scenarios` in order against the database at `DATABASE_PATH`."""
+    size = describe(os.environ["DATABASE_PATH"])
+    report: dict[str, Any] = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "dataset": size,
+            "mode": "uvicorn" if uvicorn else "in-process",
+            "concurrency": concurrency,
+            "duration": duration,
+            "seed": seed,
+        },
+        "scenarios": {},
+    }
+    client_context = uvicorn_client(port) if uvicorn else in_process_client()
+    async with client_context as client:
+        for index, name in enumerate(scenarios):
+            context = Context(size["movies"], size["users"], seed + index)
+            result = await run_scenario(
+                client,
+                SCENARIOS[name],
+                context,
+                concurrency=concurrency,
+                duration=duration,
+            )
+            report["scenarios"][name] = result
+            print(format_result(name, result), file=sys.stderr)
+    return report
+
+
+def format_result(name: str, result: dict[str, Any]) -> str:
+    latency = result.get("latency_ms", {})
+    return (
+        f"{name:<20} {result['throughput']:>9.1f} req/s  "
+        f"p50 {latency.get('p50', 0):>8.2f} ms  "
+        f"p95 {latency.get('p95', 0):>8.2f} ms  "
+        f"p99 {latency.get('p99', 0):>8.2f} ms  "
+        f"{result['errors']} errors"
+    )
@@ -0,0 +1,196 @@
+"""
+One scenario per route under `app/routers/v1`.
+
+A scenario sends a single request, picking its parameters from the shared `Context`,
+and lists the status codes that count as a success.
+"""
+
+import json
+import random
+from typing import Awaitable, Callable
+
+from httpx import AsyncClient, Response
+
+from app.internal.security import create_access_token
+
+from .dataset import PASSWORD, WORDS
+
+
+class Context:
+    """What a scenario needs to know about the dataset, and its random generator."""
+
+    def __init__(self, movies: int, users: int, seed: int) -> None:
+        self.movies = movies
+        self.users = users
+        self.rng = random.Random(seed)
+        self.cursors: list[str] = []
+        self.tokens = [
+            create_access_token({"sub": f"user{i}"}) for i in range(min(users, 100))
+        ]
+
+    def movie_id(self) -> int:
+        # Most traffic goes to the first 1% of the catalog, as with popular titles.
+        if self.rng.random() < 0.8:
+            return self.rng.randint(1, max(1, self.movies // 100))
+        return self.rng.randint(1, max(1, self.movies))
+
+    def movie(self) -> dict:
+        return {
+            "title": " ".join(self.rng.choices(WORDS, k=3)).title(),
+            "year": self.rng.randint(1920, 2024),
+            "runtime": self.rng.randint(60, 200),
+        }
+
+    def bearer(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.rng.choice(self.tokens)}"}
+
+
+class Scenario:
+    def __init__(
+        self,
+        name: str,
+        send: Callable[[AsyncClient, Context], Awaitable[Response]],
+        *,
+        expected: frozenset[int] = frozenset({200}),
+        max_requests: int | None = None,
+    ) -> None:
+        self.name = name
+        self.send = send
+        self.expected = expected
+        self.max_requests = max_requests
+
+
+async def healthcheck(client: AsyncClient, context: Context) -> Response:
+    return await client.get("/v1/healthcheck")
+
+
+async def cache_stats(client: AsyncClient, context: Context) -> Response:
+    return await client.get("/v1/healthcheck/caches")
+
+
+async def metrics(client: AsyncClient, context: Context) -> Response:
+    return await client.get("/v1/metrics")
+
+
+async def list_movies(client: AsyncClient, context: Context) -> Response:
+    params: dict[str, str | int] = {
+        "offset": context.rng.randrange(0, 1000, 100),
+        "sort": context.rng.choice(["id", "-id", "title", "-year", "runtime"]),
+    }
+    return await client.get("/v1/movies", params=params)
+
+
+async def list_movies_cursor(client: AsyncClient, context: Context) -> Response:
+    # Walks through the catalog by title, a page at a time.
+    params = {"sort": "title"}
+    if context.cursors:
+        params["cursor"] = context.cursors.pop()
+    response = await client.get("/v1/movies", params=params)
+    if "X-Next-Cursor" in response.headers:
+        context.cursors.append(response.headers["X-Next-Cursor"])
+    return response
+
+
+async def search_movies(client: AsyncClient, context: Context) -> Response:
+    params: dict[str, str | int] = {"q": " ".join(context.rng.choices(WORDS, k=2))}
+    if context.rng.random() < 0.5:
+        params["year_min"] = context.rng.randint(1920, 2000)
+    return await client.get("/v1/movies/search", params=params)
+
+
+async def export_movies(client: AsyncClient, context: Context) -> Response:
+    return await client.get("/v1/movies/export", params={"format": "ndjson"})
+
+
+async def movie_stats(client: AsyncClient, context: Context) -> Response:
+    return await client.get("/v1/movies/stats")
+
+
+async def movie_changes(client: AsyncClient, context: Context) -> Response:
+    # A client catching up on recent changes: every movie of the dataset was its
+    # own change, so `since` near the end returns a short tail.
+    since = max(0, context.movies - context.rng.randint(0, 200))
+    return await client.get("/v1/movies/changes", params={"since": since})
+
+
+async def show_movie(client: AsyncClient, context: Context) -> Response:
+    return await client.get(f"/v1/movies/{context.movie_id()}")
+
+
+async def batch_get_movies(client: AsyncClient, context: Context) -> Response:
+    ids = [context.movie_id() for _ in range(30)]
+    return await client.post("/v1/movies/batch-get", json={"ids": ids})
+
+
+async def create_movie(client: AsyncClient, context: Context) -> Response:
+    return await client.post("/v1/movies", json=context.movie())
+
+
+async def import_movies(client: AsyncClient, context: Context) -> Response:
+    body = "".join(json.dumps(context.movie()) + "\n" for _ in range(100))
+    return await client.post("/v1/movies/bulk", content=body)
+
+
+async def update_movie(client: AsyncClient, context: Context) -> Response:
+    movie_id = context.movie_id()
+    body = {"runtime": context.rng.randint(60, 200)}
+    return await client.patch(f"/v1/movies/{movie_id}", json=body)
+
+
+async def update_movies(client: AsyncClient, context: Context) -> Response:
+    # The same correction to 100 movies, applied with a single UPDATE.
+    ids = {context.movie_id() for _ in range(100)}
+    runtime = context.rng.randint(60, 200)
+    body = {"movies": [{"id": movie_id, "runtime": runtime} for movie_id in ids]}
+    return await client.patch("/v1/movies/bulk", json=body)
+
+
+async def delete_movie(client: AsyncClient, context: Context) -> Response:
+    movie_id = context.rng.randint(1, max(1, context.movies))
+    return await client.delete(f"/v1/movies/{movie_id}")
+
+
+async def delete_movies(client: AsyncClient, context: Context) -> Response:
+    ids = [context.rng.randint(1, max(1, context.movies)) for _ in range(100)]
+    return await client.request("DELETE", "/v1/movies/bulk", json={"ids": ids})
+
+
+async def login(client: AsyncClient, context: Context) -> Response:
+    username = f"user{context.rng.randrange(context.users)}"
+    return await client.post(
+        "/v1/tokens", data={"username": username, "password": PASSWORD}
+    )
+
+
+async def read_users_me(client: AsyncClient, context: Context) -> Response:
+    return await client.get("/v1/users/me", headers=context.bearer())
+
+
+SHEDDABLE = frozenset({200, 503})
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in [
+        Scenario("healthcheck", healthcheck),
+        Scenario("cache_stats", cache_stats),
+        Scenario("metrics", metrics),
+        Scenario("list_movies", list_movies),
+        Scenario("list_movies_cursor", list_movies_cursor),
+        Scenario("search_movies", search_movies),
+        # Exports and bulk writes are shed first once 4 of them are in flight.
+        Scenario("export_movies", export_movies, expected=SHEDDABLE, max_requests=5),
+        Scenario("movie_stats", movie_stats),
+        Scenario("movie_changes", movie_changes),
+        Scenario("show_movie", show_movie, expected=frozenset({200, 404})),
+        Scenario("batch_get_movies", batch_get_movies),
+        Scenario("create_movie", create_movie),
+        Scenario("import_movies", import_movies, expected=SHEDDABLE, max_requests=50),
+        Scenario("update_movie", update_movie, expected=frozenset({200, 404})),
+        Scenario("update_movies", update_movies, expected=SHEDDABLE),
+        Scenario("delete_movie", delete_movie, expected=frozenset({200, 404})),
+        Scenario("delete_movies", delete_movies, expected=SHEDDABLE, max_requests=50),
+        # bcrypt makes every login take tens of milliseconds of CPU.
+        Scenario("login", login, expected=frozenset({200, 503}), max_requests=50),
+        Scenario("read_users_me", read_users_me),
+    ]
+}
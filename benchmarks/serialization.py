@@ -0,0 +1,123 @@
+"""
+Rows per second read and serialized for `GET /v1/movies` pages.
+
+Compares, for `--pages` pages of 100 movies read from a file database, the way list
+pages used to be served, as `Movie` objects validated against the
+`list[MoviePublic]` response model and encoded with `json`, with selecting plain rows
+and rendering them with `render_json`, with and without orjson. Also checks that
+all of them produce the same bytes.
+
+Usage:
+    python -m benchmarks.serialization [--movies N] [--pages N]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from typing import Awaitable, Callable
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import insert
+from sqlalchemy import select as select_columns
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import SQLModel, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.internal import responses
+from app.internal.responses import render_json
+from app.models.movies import Movie, MoviePublic, now
+from app.routers.v1.movies import PUBLIC_COLUMNS, PUBLIC_FIELDS
+
+PAGE_SIZE = 100
+
+response_field = create_response_field("Response", list[MoviePublic])
+
+
+async def create_engine(directory: str, movies: int) -> AsyncEngine:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{directory}/benchmark.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.execute(
+            insert(Movie).values(
+                [
+                    {
+                        "title": f"Movie {i} – Première",
+                        "year": 1900 + i % 120,
+                        "runtime": 60 + i % 120,
+                        "created_at": now(),
+                        "version": 1,
+                    }
+                    for i in range(movies)
+                ]
+            )
+        )
+    return engine
+
+
+async def orm_page(session: AsyncSession, offset: int) -> bytes:
+    statement = select(Movie).order_by(col(Movie.id)).offset(offset).limit(PAGE_SIZE)
+    movies = (await session.exec(statement)).all()
+    content = await serialize_response(field=response_field, response_content=movies)
+    return JSONResponse(content).body
+
+
+async def row_page(session: AsyncSession, offset: int) -> bytes:
+    statement = (
+        select_columns(*PUBLIC_COLUMNS, col(Movie.version))
+        .order_by(col(Movie.id))
+        .offset(offset)
+        .limit(PAGE_SIZE)
+    )
+    conn = await session.connection()
+    rows = (await conn.execute(statement)).all()
+    return render_json([dict(zip(PUBLIC_FIELDS, row)) for row in rows])
+
+
+async def measure(
+    engine: AsyncEngine,
+    page: Callable[[AsyncSession, int], Awaitable[bytes]],
+    pages: int,
+    movies: int,
+) -> tuple[float, list[bytes]]:
+    bodies = []
+    async with AsyncSession(engine) as session:
+        start = time.perf_counter()
+        for i in range(pages):
+            bodies.append(await page(session, i * PAGE_SIZE % movies))
+            # Like a request, each page starts with an empty identity map.
+            session.expunge_all()
+        elapsed = time.perf_counter() - start
+    return pages * PAGE_SIZE / elapsed, bodies
+
+
+async def main(movies: int, pages: int) -> None:
+    orjson = responses.orjson
+    with tempfile.TemporaryDirectory() as directory:
+        engine = await create_engine(directory, movies)
+        await measure(engine, orm_page, pages, movies)
+
+        before, expected = await measure(engine, orm_page, pages, movies)
+        responses.orjson = None  # type: ignore[assignment]
+        rows_json, bodies_json = await measure(engine, row_page, pages, movies)
+        responses.orjson = orjson
+        rows_orjson, bodies_orjson = await measure(engine, row_page, pages, movies)
+        await engine.dispose()
+
+    assert bodies_json == expected and bodies_orjson == expected
+    print(f"ORM objects + response model + json: {before:9.0f} rows/s")
+    print(f"plain rows + json:                   {rows_json:9.0f} rows/s")
+    if orjson is None:
+        print("plain rows + orjson:                 orjson is not installed")
+    else:
+        print(f"plain rows + orjson:                 {rows_orjson:9.0f} rows/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--movies", type=int, default=10_000)
+    parser.add_argument("--pages", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.movies, args.pages))
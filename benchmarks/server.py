@@ -0,0 +1,8 @@
+from fastapi import FastAPI
+
+from app.main import create_app
+
+
+def create_benchmark_app() -> FastAPI:
+    """The application as deployed, but without the rate limiter."""
+    return create_app(enable_rate_limiter=False)
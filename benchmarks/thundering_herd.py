@@ -0,0 +1,125 @@
+"""
+Cost of a thundering herd of identical reads, with and without single-flight.
+
+Sends `--rounds` herds of `--concurrency` concurrent requests for the same movie, and
+for the same list page, through the endpoints, against a file database read through
+a pool of `--readers` connections as in production. The caches are cleared before
+every herd, as when a popular title has just been linked or a write has just
+invalidated it. Reports the queries per herd and the time until its last response.
+
+Usage:
+    python -m benchmarks.thundering_herd [--concurrency N] [--rounds N] [--readers N]
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Hashable
+
+from fastapi import Response
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import SQLModel
+
+from app.internal.cache import clear_caches
+from app.internal.database import create_engine
+from app.models.movies import Movie, now
+from app.routers.v1 import movies
+
+
+class NoFlight:
+    """Runs every read, as the endpoints did before single-flight."""
+
+    async def do(self, key: Hashable, read: Callable[[], Awaitable[Any]]) -> Any:
+        return await read()
+
+
+async def show_movie(engine: AsyncEngine) -> None:
+    await movies.show_movie(
+        engine=engine, response=Response(), movie_id=1, if_none_match=None
+    )
+
+
+async def list_movies(engine: AsyncEngine) -> None:
+    await movies.list_movies(
+        engine=engine,
+        offset=0,
+        cursor=None,
+        limit=100,
+        sort="title",
+        if_none_match=None,
+    )
+
+
+async def measure(
+    engine: AsyncEngine,
+    request: Callable[[AsyncEngine], Awaitable[None]],
+    concurrency: int,
+    rounds: int,
+) -> tuple[float, float]:
+    queries = 0
+
+    def count(*args: Any) -> None:
+        nonlocal queries
+        queries += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    durations = []
+    for _ in range(rounds):
+        clear_caches()
+        start = time.perf_counter()
+        await asyncio.gather(*(request(engine) for _ in range(concurrency)))
+        durations.append(time.perf_counter() - start)
+    event.remove(engine.sync_engine, "before_cursor_execute", count)
+    return queries / rounds, statistics.median(durations) * 1e3
+
+
+async def main(concurrency: int, rounds: int, readers: int) -> None:
+    movie_reads, page_reads = movies.movie_reads, movies.page_reads
+    with tempfile.TemporaryDirectory() as directory:
+        path = f"{directory}/benchmark.db"
+        writer = create_engine(path)
+        async with writer.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+            await conn.execute(
+                insert(Movie),
+                [
+                    {
+                        "title": f"Movie {i}",
+                        "year": 2000,
+                        "runtime": 100,
+                        "created_at": now(),
+                        "version": 1,
+                    }
+                    for i in range(10_000)
+                ],
+            )
+        await writer.dispose()
+        engine = create_engine(path, pool_size=readers, readonly=True)
+
+        for name, request in [("show_movie", show_movie), ("list_movies", list_movies)]:
+            await measure(engine, request, concurrency, 1)
+            movies.movie_reads, movies.page_reads = NoFlight(), NoFlight()  # type: ignore[assignment]
+            before = await measure(engine, request, concurrency, rounds)
+            movies.movie_reads, movies.page_reads = movie_reads, page_reads
+            after = await measure(engine, request, concurrency, rounds)
+            for label, (queries, latency) in [
+                ("without single-flight", before),
+                ("with single-flight", after),
+            ]:
+                print(
+                    f"{name:<11} {label:<21} {queries:6.1f} queries/herd, "
+                    f"last response after {latency:7.2f} ms"
+                )
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.rounds, args.readers))
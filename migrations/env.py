@@ -2,7 +2,8 @@ import asyncio
 from logging.config import fileConfig
 
 from alembic import context
-from app.models import Movie, User  # noqa: F401
+from app.models.movies import Movie  # noqa: F401
+from app.models.users import User  # noqa: F401
 from sqlalchemy import pool
 from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
@@ -31,6 +32,15 @@ target_metadata.naming_convention = {
     "pk": "pk_%(table_name)s",
 }
 
+
+def include_name(name, type_, parent_names) -> bool:
+    # The full-text index and its shadow tables are managed by hand-written
+    # revisions, autogenerate would otherwise try to drop them.
+    if type_ == "table":
+        return name is None or not name.startswith("movie_fts")
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -55,6 +65,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -62,7 +73,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
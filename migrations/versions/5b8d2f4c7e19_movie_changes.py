@@ -0,0 +1,64 @@
+"""movie changes
+
+Revision ID: 5b8d2f4c7e19
+Revises: 9e3d5a61f0c4
+Create Date: 2026-10-17 14:21:47.305118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8d2f4c7e19'
+down_revision: Union[str, None] = '9e3d5a61f0c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'movie_change',
+        sa.Column('seq', sa.Integer(), nullable=False),
+        sa.Column('movie_id', sa.Integer(), nullable=False),
+        sa.Column('deleted', sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint('seq'),
+        sa.UniqueConstraint('movie_id'),
+        sqlite_autoincrement=True,
+    )
+    op.execute(
+        """
+        CREATE TRIGGER movie_change_insert AFTER INSERT ON movie BEGIN
+            INSERT OR REPLACE INTO movie_change(movie_id, deleted) VALUES (new.id, 0);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER movie_change_update AFTER UPDATE ON movie BEGIN
+            INSERT OR REPLACE INTO movie_change(movie_id, deleted) VALUES (new.id, 0);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER movie_change_delete AFTER DELETE ON movie BEGIN
+            INSERT OR REPLACE INTO movie_change(movie_id, deleted) VALUES (old.id, 1);
+        END
+        """
+    )
+    # Existing movies are the first changes, so that reading from the start of the
+    # feed returns the whole catalog.
+    op.execute(
+        "INSERT INTO movie_change(movie_id, deleted) SELECT id, 0 FROM movie ORDER BY id"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER movie_change_delete")
+    op.execute("DROP TRIGGER movie_change_update")
+    op.execute("DROP TRIGGER movie_change_insert")
+    op.drop_table('movie_change')
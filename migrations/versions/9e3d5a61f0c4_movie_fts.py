@@ -0,0 +1,64 @@
+"""movie fts
+
+Revision ID: 9e3d5a61f0c4
+Revises: 4c1f0b7e9a2d
+Create Date: 2026-10-17 10:03:12.861542
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e3d5a61f0c4'
+down_revision: Union[str, None] = '4c1f0b7e9a2d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE movie_fts USING fts5(
+            title,
+            content='movie',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER movie_fts_insert AFTER INSERT ON movie BEGIN
+            INSERT INTO movie_fts(rowid, title) VALUES (new.id, new.title);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER movie_fts_delete AFTER DELETE ON movie BEGIN
+            INSERT INTO movie_fts(movie_fts, rowid, title)
+            VALUES ('delete', old.id, old.title);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER movie_fts_update AFTER UPDATE OF title ON movie BEGIN
+            INSERT INTO movie_fts(movie_fts, rowid, title)
+            VALUES ('delete', old.id, old.title);
+            INSERT INTO movie_fts(rowid, title) VALUES (new.id, new.title);
+        END
+        """
+    )
+    op.execute("INSERT INTO movie_fts(movie_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER movie_fts_update")
+    op.execute("DROP TRIGGER movie_fts_delete")
+    op.execute("DROP TRIGGER movie_fts_insert")
+    op.execute("DROP TABLE movie_fts")
@@ -0,0 +1,79 @@
+"""movie year stats
+
+Revision ID: c3a9e6f1d2b8
+Revises: 5b8d2f4c7e19
+Create Date: 2026-10-17 15:02:36.518270
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a9e6f1d2b8'
+down_revision: Union[str, None] = '5b8d2f4c7e19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'movie_year_stats',
+        sa.Column('year', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('movies', sa.Integer(), nullable=False),
+        sa.Column('runtime_total', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('year'),
+    )
+    op.execute(
+        """
+        CREATE TRIGGER movie_year_stats_insert AFTER INSERT ON movie BEGIN
+            INSERT INTO movie_year_stats(year, movies, runtime_total)
+            VALUES (new.year, 1, new.runtime)
+            ON CONFLICT(year) DO UPDATE SET
+                movies = movies + 1,
+                runtime_total = runtime_total + excluded.runtime_total;
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER movie_year_stats_delete AFTER DELETE ON movie BEGIN
+            UPDATE movie_year_stats
+            SET movies = movies - 1, runtime_total = runtime_total - old.runtime
+            WHERE year = old.year;
+            DELETE FROM movie_year_stats WHERE year = old.year AND movies = 0;
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER movie_year_stats_update AFTER UPDATE OF year, runtime ON movie
+        BEGIN
+            UPDATE movie_year_stats
+            SET movies = movies - 1, runtime_total = runtime_total - old.runtime
+            WHERE year = old.year;
+            DELETE FROM movie_year_stats WHERE year = old.year AND movies = 0;
+            INSERT INTO movie_year_stats(year, movies, runtime_total)
+            VALUES (new.year, 1, new.runtime)
+            ON CONFLICT(year) DO UPDATE SET
+                movies = movies + 1,
+                runtime_total = runtime_total + excluded.runtime_total;
+        END
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO movie_year_stats(year, movies, runtime_total)
+        SELECT year, count(*), sum(runtime) FROM movie GROUP BY year
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER movie_year_stats_update")
+    op.execute("DROP TRIGGER movie_year_stats_delete")
+    op.execute("DROP TRIGGER movie_year_stats_insert")
+    op.drop_table('movie_year_stats')
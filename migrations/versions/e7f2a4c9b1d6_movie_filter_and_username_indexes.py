@@ -0,0 +1,35 @@
+"""movie filter and username indexes
+
+Revision ID: e7f2a4c9b1d6
+Revises: c3a9e6f1d2b8
+Create Date: 2026-10-17 16:40:09.271834
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7f2a4c9b1d6'
+down_revision: Union[str, None] = 'c3a9e6f1d2b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_movie_title_nocase_id',
+        'movie',
+        [sa.text('title COLLATE "NOCASE"'), 'id'],
+        unique=False,
+    )
+    # Fails if two users already share a username, which must be resolved first.
+    op.create_index(op.f('ix_user_username'), 'user', ['username'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_user_username'), table_name='user')
+    op.drop_index('ix_movie_title_nocase_id', table_name='movie')
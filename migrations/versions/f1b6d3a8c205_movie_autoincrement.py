@@ -0,0 +1,76 @@
+"""movie autoincrement
+
+Revision ID: f1b6d3a8c205
+Revises: e7f2a4c9b1d6
+Create Date: 2026-10-17 18:12:40.519273
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b6d3a8c205'
+down_revision: Union[str, None] = 'e7f2a4c9b1d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def rebuild_movie(autoincrement: bool) -> None:
+    # SQLite cannot alter a primary key, so the table is copied into a new one.
+    # Dropping the old table drops its indexes and triggers, which are recreated
+    # from their saved definitions once the new table has taken its name.
+    schema = op.get_bind().execute(
+        sa.text(
+            "SELECT sql FROM sqlite_master "
+            "WHERE tbl_name = 'movie' AND type IN ('index', 'trigger') "
+            "AND sql IS NOT NULL"
+        )
+    ).scalars().all()
+    if autoincrement:
+        id_column, primary_key = 'id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT', ''
+    else:
+        id_column, primary_key = 'id INTEGER NOT NULL', ', CONSTRAINT pk_movie PRIMARY KEY (id)'
+    op.execute(
+        f"""
+        CREATE TABLE movie_new (
+            title VARCHAR NOT NULL,
+            year INTEGER NOT NULL,
+            runtime INTEGER NOT NULL,
+            {id_column},
+            created_at DATETIME NOT NULL,
+            version INTEGER NOT NULL{primary_key}
+        )
+        """
+    )
+    op.execute(
+        "INSERT INTO movie_new (title, year, runtime, id, created_at, version) "
+        "SELECT title, year, runtime, id, created_at, version FROM movie"
+    )
+    op.execute('DROP TABLE movie')
+    op.execute('ALTER TABLE movie_new RENAME TO movie')
+    for statement in schema:
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    rebuild_movie(autoincrement=True)
+    # Ids of movies deleted before now may still be in clients' ETags, and the
+    # change feed remembers the highest of them.
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'movie'")
+    op.execute(
+        """
+        INSERT INTO sqlite_sequence (name, seq) SELECT 'movie', max(
+            (SELECT coalesce(max(id), 0) FROM movie),
+            (SELECT coalesce(max(movie_id), 0) FROM movie_change)
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    rebuild_movie(autoincrement=False)
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'movie'")
@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# The application opens its log file on import. Test runs write it to a scratch
+# directory rather than into the working tree, unless LOG_FILE says otherwise.
+os.environ.setdefault(
+    "LOG_FILE", os.path.join(tempfile.mkdtemp(prefix="popcorn-tests-"), "app.log")
+)
@@ -3,12 +3,13 @@ from typing import AsyncGenerator
 import pytest
 from fastapi import FastAPI
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel.pool import StaticPool
 
-from app.dependencies import get_session
+from app.dependencies import get_engine, get_read_session, get_session
+from app.internal.cache import clear_caches
 from app.main import create_app
 
 
@@ -17,8 +18,13 @@ def anyio_backend():
     return "asyncio"
 
 
+@pytest.fixture(autouse=True)
+def clear_in_process_caches() -> None:
+    clear_caches()
+
+
 @pytest.fixture()
-async def session() -> AsyncGenerator[AsyncSession, None]:
+async def engine() -> AsyncGenerator[AsyncEngine, None]:
     sqlite_url = "sqlite+aiosqlite://"
     engine = create_async_engine(
         sqlite_url,
@@ -27,17 +33,30 @@ async def session() -> AsyncGenerator[AsyncSession, None]:
     )
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture()
+async def session(engine: AsyncEngine) -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSession(engine) as session:
         yield session
 
 
 @pytest.fixture()
-async def app(session: AsyncSession) -> AsyncGenerator[FastAPI, None]:
+async def app(
+    engine: AsyncEngine, session: AsyncSession
+) -> AsyncGenerator[FastAPI, None]:
+    def get_engine_override():
+        return engine
+
     def get_session_override():
         return session
 
     app_ = create_app(enable_rate_limiter=False)
+    app_.dependency_overrides[get_engine] = get_engine_override
     app_.dependency_overrides[get_session] = get_session_override
+    app_.dependency_overrides[get_read_session] = get_session_override
     yield app_
     app_.dependency_overrides.clear()
 
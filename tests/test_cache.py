@@ -0,0 +1,31 @@
+import pytest
+
+from app.internal.cache import LRUCache
+
+
+def test_lru_eviction() -> None:
+    cache: LRUCache[str, int] = LRUCache("test", maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert list(cache.entries) == ["a", "c"]
+    assert cache.get("b") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_ttl(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = 0.0
+    monkeypatch.setattr("app.internal.cache.time.monotonic", lambda: now)
+    cache: LRUCache[str, int] = LRUCache("test", maxsize=2, ttl=10)
+    cache.set("a", 1, ttl=5)
+    cache.set("b", 2, ttl=30)
+    cache.set("c", 3, ttl=-1)
+
+    now = 6.0
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    now = 11.0
+    assert cache.get("b") is None
+    assert cache.get("c") is None
@@ -0,0 +1,62 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.internal.database import create_engine
+from app.internal.metrics import db_pool_checkout_wait, db_statements
+
+
+@pytest.mark.anyio
+async def test_engine_pragmas(tmp_path: Path) -> None:
+    engine = create_engine(
+        str(tmp_path / "test.db"), synchronous="NORMAL", mmap_size=1 << 20
+    )
+    async with engine.connect() as conn:
+        assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+        assert (await conn.execute(text("PRAGMA synchronous"))).scalar() == 1
+        assert (await conn.execute(text("PRAGMA mmap_size"))).scalar() == 1 << 20
+        assert (await conn.execute(text("PRAGMA busy_timeout"))).scalar() == 5000
+    await engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_readers_do_not_block_on_writer(tmp_path: Path) -> None:
+    path = str(tmp_path / "test.db")
+    writer = create_engine(path)
+    readers = create_engine(path, pool_size=4, readonly=True)
+    async with writer.begin() as conn:
+        await conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        await conn.execute(text("INSERT INTO t VALUES (1)"))
+
+    async def read() -> int:
+        async with readers.connect() as conn:
+            return (await conn.execute(text("SELECT count(*) FROM t"))).scalar_one()
+
+    async with writer.begin() as conn:
+        # An open write transaction, which the readers must not wait for.
+        await conn.execute(text("INSERT INTO t VALUES (2)"))
+        assert await asyncio.gather(*(read() for _ in range(8))) == [1] * 8
+
+    async with readers.connect() as conn:
+        with pytest.raises(OperationalError, match="readonly"):
+            await conn.execute(text("INSERT INTO t VALUES (3)"))
+    await writer.dispose()
+    await readers.dispose()
+
+
+@pytest.mark.anyio
+async def test_engine_metrics(tmp_path: Path) -> None:
+    engine = create_engine(str(tmp_path / "test.db"), name="test")
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        await conn.execute(text("INSERT INTO t VALUES (1)"))
+        await conn.execute(text("SELECT x FROM t"))
+    await engine.dispose()
+
+    assert db_statements.values[("test", "SELECT")] == 1
+    assert db_statements.values[("test", "INSERT")] == 1
+    assert db_statements.values[("test", "OTHER")] == 1
+    assert sum(db_pool_checkout_wait.counts[("test",)]) == 1
@@ -0,0 +1,85 @@
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from app.internal.log import LogSink
+
+
+def test_log_sink_appends(tmp_path: Path) -> None:
+    path = tmp_path / "app.log"
+    path.write_text('{"event": "before restart"}\n')
+    sink = LogSink(str(path))
+    sink.put({"event": "after restart"})
+    sink.close()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert lines == [{"event": "before restart"}, {"event": "after restart"}]
+
+
+def test_log_sink_rotation(tmp_path: Path) -> None:
+    path = tmp_path / "app.log"
+    sink = LogSink(str(path), max_bytes=100, backup_count=2, batch_size=1)
+    for i in range(20):
+        sink.put({"event": "hello", "i": i})
+    sink.close()
+
+    assert sorted(file.name for file in tmp_path.iterdir()) == [
+        "app.log",
+        "app.log.1",
+        "app.log.2",
+        "app.log.lock",
+    ]
+    for backup in ["app.log.1", "app.log.2"]:
+        assert (tmp_path / backup).stat().st_size >= 100
+    assert sink.written == 20
+
+
+def test_log_sink_rotation_shared(tmp_path: Path) -> None:
+    # Two sinks on the same path stand in for two worker processes.
+    path = tmp_path / "app.log"
+    sinks = [
+        LogSink(str(path), max_bytes=200, backup_count=100, batch_size=1)
+        for _ in range(2)
+    ]
+    for i in range(100):
+        sinks[i % 2].put({"event": "hello", "i": i})
+    for sink in sinks:
+        sink.close()
+
+    files = sorted(tmp_path.glob("app.log*"))
+    lines = [
+        json.loads(line)
+        for file in files
+        if file.name != "app.log.lock"
+        for line in file.read_text().splitlines()
+    ]
+    assert sorted(line["i"] for line in lines) == list(range(100))
+    # A file that one sink has just rotated is not rotated again by the other.
+    for file in files:
+        if file.name not in ("app.log", "app.log.lock"):
+            assert file.stat().st_size >= 200
+
+
+def test_log_sink_drops(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    path = tmp_path / "app.log"
+    unblocked = threading.Event()
+    write = LogSink._write
+
+    def blocked_write(self: LogSink, events: list) -> None:
+        unblocked.wait()
+        write(self, events)
+
+    monkeypatch.setattr(LogSink, "_write", blocked_write)
+    sink = LogSink(str(path), queue_size=2, batch_size=1)
+    for i in range(10):
+        sink.put({"event": "hello", "i": i})
+    assert 7 <= sink.dropped <= 8
+    unblocked.set()
+    sink.close()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    dropped = [line for line in lines if line["event"] == "log_events_dropped"]
+    assert [line["count"] for line in dropped] == [sink.dropped]
+    assert len(lines) == 10 - sink.dropped + 1
@@ -0,0 +1,354 @@
+import asyncio
+from pathlib import Path
+from typing import AsyncGenerator
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.internal.admission import HIGH, LOW, NORMAL, AdmissionController, AIMDLimit
+from app.internal.metrics import rate_limit_errors, rate_limit_rejections
+from app.internal.ratelimit import SQLiteTokenBucketLimiter, TokenBucketLimiter
+from app.internal.security import create_access_token
+from app.middlewares import AdmissionControlMiddleware, RateLimiterMiddleware
+
+
+def create_test_app(**options) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/a")
+    async def a() -> dict[str, bool]:
+        return {"ok": True}
+
+    @app.get("/b")
+    async def b() -> dict[str, bool]:
+        return {"ok": True}
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int) -> dict[str, int]:
+        return {"id": item_id}
+
+    @app.get("/error")
+    async def error() -> None:
+        raise RuntimeError("boom")
+
+    app.add_middleware(RateLimiterMiddleware, **options)
+    return app
+
+
+@pytest.fixture()
+async def limited_client() -> AsyncGenerator[AsyncClient, None]:
+    app = create_test_app(max_calls=2, period=60, keys=["ip", "route"])
+    async with AsyncClient(
+        transport=ASGITransport(app=app),  # type: ignore
+        base_url="http://test",
+    ) as client:
+        yield client
+
+
+@pytest.mark.anyio
+async def test_rate_limiter(limited_client: AsyncClient) -> None:
+    rejections = rate_limit_rejections.values[()]
+    assert (await limited_client.get("/a")).status_code == 200
+    assert (await limited_client.get("/a")).status_code == 200
+
+    response = await limited_client.get("/a")
+    assert response.status_code == 429
+    assert response.json() == {"detail": "Too Many Requests"}
+    assert response.headers["Retry-After"] == "30"
+    assert rate_limit_rejections.values[()] == rejections + 1
+
+    assert (await limited_client.get("/b")).status_code == 200
+
+
+@pytest.mark.anyio
+async def test_rate_limiter_route_template(limited_client: AsyncClient) -> None:
+    assert (await limited_client.get("/items/1")).status_code == 200
+    assert (await limited_client.get("/items/2")).status_code == 200
+    assert (await limited_client.get("/items/3")).status_code == 429
+
+    assert (await limited_client.get("/missing/1")).status_code == 404
+    assert (await limited_client.get("/missing/2")).status_code == 404
+    assert (await limited_client.get("/missing/3")).status_code == 429
+
+
+@pytest.mark.anyio
+async def test_rate_limiter_error(limited_client: AsyncClient) -> None:
+    response = await limited_client.get("/error")
+    assert response.status_code == 500
+    assert response.json() == {"detail": "Internal Server Error"}
+
+
+def test_token_bucket_refill() -> None:
+    limiter = TokenBucketLimiter(2, 1)
+
+    assert limiter.hit("a", 0.0) == 0
+    assert limiter.hit("a", 0.0) == 0
+    assert limiter.hit("a", 0.0) == pytest.approx(0.5)
+    assert limiter.hit("a", 0.5) == 0
+    assert limiter.hit("a", 0.5) == pytest.approx(0.5)
+
+
+def test_token_bucket_eviction() -> None:
+    limiter = TokenBucketLimiter(2, 1, max_keys=3)
+
+    for i in range(5):
+        limiter.hit(str(i), 0.0)
+    assert list(limiter.buckets) == ["2", "3", "4"]
+
+    limiter.hit("5", 1.0)
+    assert list(limiter.buckets) == ["5"]
+
+
+def test_sqlite_token_bucket_shared(tmp_path: Path) -> None:
+    path = str(tmp_path / "ratelimit.db")
+    worker_1 = SQLiteTokenBucketLimiter(path, 2, 1)
+    worker_2 = SQLiteTokenBucketLimiter(path, 2, 1)
+
+    assert worker_1.hit("a", 0.0) == 0
+    assert worker_2.hit("a", 0.0) == 0
+    assert worker_1.hit("a", 0.0) == pytest.approx(0.5)
+    assert worker_2.hit("a", 0.5) == 0
+    assert worker_1.hit("a", 0.5) == pytest.approx(0.5)
+    assert worker_2.hit("b", 0.5) == 0
+
+
+def test_sqlite_token_bucket_max_keys(tmp_path: Path) -> None:
+    limiter = SQLiteTokenBucketLimiter(
+        str(tmp_path / "ratelimit.db"), 2, 60, max_keys=3, sweep_interval=5
+    )
+
+    for i in range(5):
+        limiter.hit(str(i), float(i))
+    keys = limiter.connection.execute("SELECT key FROM rate_limit ORDER BY key")
+    assert [key for (key,) in keys] == ["2", "3", "4"]
+
+
+def test_sqlite_token_bucket_locked(tmp_path: Path) -> None:
+    path = str(tmp_path / "ratelimit.db")
+    limiter = SQLiteTokenBucketLimiter(path, 1, 60)
+    other = SQLiteTokenBucketLimiter(path, 1, 60)
+    assert limiter.hit("a", 0.0) == 0
+    errors = rate_limit_errors.values[()]
+
+    # Another process holds the write lock for longer than `busy_timeout`.
+    other.connection.execute("BEGIN IMMEDIATE")
+    assert limiter.hit("a", 0.0) == 0
+    assert rate_limit_errors.values[()] == errors + 1
+    other.connection.execute("ROLLBACK")
+
+    assert limiter.hit("a", 0.0) > 0
+
+
+def create_admission_controller(limit: int, **options) -> AdmissionController:
+    return AdmissionController(
+        "test",
+        AIMDLimit(limit, max_limit=limit, latency_target=1.0),
+        **{"max_queue": 2, "queue_timeout": 60, **options},
+    )
+
+
+def test_aimd_limit() -> None:
+    limit = AIMDLimit(4, max_limit=8, latency_target=1.0, backoff=0.5)
+
+    for _ in range(4):
+        limit.update(0.1, 0.0)
+    assert int(limit) == 4
+    limit.update(0.1, 0.0)
+    assert int(limit) == 5
+
+    limit.update(2.0, 10.0)
+    assert int(limit) == 2
+    # Slow responses within `latency_target` of a decrease count once.
+    limit.update(2.0, 10.5)
+    assert int(limit) == 2
+    limit.update(2.0, 11.0)
+    assert int(limit) == 1
+    limit.update(2.0, 12.0)
+    assert int(limit) == 1
+
+
+@pytest.mark.anyio
+async def test_admission_priority() -> None:
+    controller = create_admission_controller(1)
+    assert await controller.acquire(NORMAL)
+
+    normal = asyncio.create_task(controller.acquire(NORMAL))
+    high = asyncio.create_task(controller.acquire(HIGH))
+    await asyncio.sleep(0)
+    assert controller.queued == 2
+    # Bulk requests are shed rather than queued, and a full queue drops a lower
+    # priority request for a higher priority one.
+    assert not await controller.acquire(LOW)
+    assert not await controller.acquire(NORMAL)
+    late_high = asyncio.create_task(controller.acquire(HIGH))
+    assert not await normal
+
+    controller.release(0.1)
+    assert await high
+    assert not late_high.done()
+    controller.release(0.1)
+    assert await late_high
+    controller.release(0.1)
+    assert controller.in_flight == 0
+
+
+@pytest.mark.anyio
+async def test_admission_queue_timeout() -> None:
+    controller = create_admission_controller(1, queue_timeout=0.01)
+    assert await controller.acquire(NORMAL)
+
+    assert not await controller.acquire(HIGH)
+    assert controller.queued == 0
+
+    waiter = asyncio.create_task(controller.acquire(NORMAL))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert controller.queued == 0
+    controller.release(0.1)
+    assert controller.in_flight == 0
+
+
+@pytest.mark.anyio
+async def test_admission_control_middleware() -> None:
+    app = FastAPI()
+    release = asyncio.Event()
+
+    @app.get("/slow")
+    async def slow() -> dict[str, bool]:
+        await release.wait()
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health() -> dict[str, bool]:
+        return {"ok": True}
+
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        routes=app.routes,
+        max_concurrency=1,
+        max_queue=1,
+        queue_timeout=60,
+        exempt_paths=["/health"],
+    )
+    async with AsyncClient(
+        transport=ASGITransport(app=app),  # type: ignore
+        base_url="http://test",
+    ) as client:
+        admitted = asyncio.create_task(client.get("/slow"))
+        queued = asyncio.create_task(client.get("/slow"))
+        await asyncio.sleep(0.05)
+
+        response = await client.get("/slow")
+        assert response.status_code == 503
+        assert response.json() == {"detail": "Server Overloaded"}
+        assert response.headers["Retry-After"] == "60"
+        assert (await client.get("/health")).status_code == 200
+
+        release.set()
+        assert (await admitted).status_code == 200
+        assert (await queued).status_code == 200
+
+
+@pytest.mark.anyio
+async def test_admission_control_low_priority_routes() -> None:
+    app = FastAPI()
+    release = asyncio.Event()
+
+    @app.post("/bulk")
+    @app.delete("/bulk")
+    async def bulk() -> dict[str, bool]:
+        await release.wait()
+        return {"ok": True}
+
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        routes=app.routes,
+        max_concurrency=1,
+        max_queue=1,
+        queue_timeout=60,
+        low_priority_routes=["POST /bulk"],
+    )
+    async with AsyncClient(
+        transport=ASGITransport(app=app),  # type: ignore
+        base_url="http://test",
+    ) as client:
+        admitted = [
+            asyncio.create_task(client.post("/bulk")),
+            asyncio.create_task(client.delete("/bulk")),
+        ]
+        await asyncio.sleep(0.05)
+
+        # A low priority route is shed at its limit, the same path with another
+        # method is queued.
+        assert (await client.post("/bulk")).status_code == 503
+        queued = asyncio.create_task(client.delete("/bulk"))
+        await asyncio.sleep(0.05)
+        assert not queued.done()
+
+        release.set()
+        for response in await asyncio.gather(*admitted, queued):
+            assert response.status_code == 200
+
+
+@pytest.mark.parametrize(
+    "authorization, priority",
+    [
+        (None, NORMAL),
+        ("x", NORMAL),
+        ("Bearer not-a-token", NORMAL),
+        (f"Bearer {create_access_token({'sub': 'johndoe'})}", HIGH),
+    ],
+)
+def test_admission_control_priority(authorization: str | None, priority: int) -> None:
+    app = FastAPI()
+
+    @app.get("/a")
+    async def a() -> dict[str, bool]:
+        return {"ok": True}
+
+    middleware = AdmissionControlMiddleware(app, routes=app.routes)
+    headers = (
+        [] if authorization is None else [(b"authorization", authorization.encode())]
+    )
+    scope = {"type": "http", "method": "GET", "path": "/a", "headers": headers}
+
+    found = middleware.controller(scope)
+
+    assert found is not None
+    assert found[1] == priority
+
+
+def test_admission_control_fixed_limits() -> None:
+    app = FastAPI()
+
+    @app.get("/export")
+    async def export() -> dict[str, bool]:
+        return {"ok": True}
+
+    @app.get("/a")
+    async def a() -> dict[str, bool]:
+        return {"ok": True}
+
+    middleware = AdmissionControlMiddleware(
+        app,
+        routes=app.routes,
+        max_concurrency=8,
+        fixed_limits={"GET /export": 2},
+        latency_target=0.1,
+    )
+    limits = {}
+    for path in ["/export", "/a"]:
+        found = middleware.controller(
+            {"type": "http", "method": "GET", "path": path, "headers": []}
+        )
+        assert found is not None
+        limit = found[0].limit
+        # Responses slower than the target, such as a long export stream.
+        for now in range(20):
+            limit.update(5.0, float(now))
+        limits[path] = int(limit)
+
+    assert limits == {"/export": 2, "/a": 1}
@@ -0,0 +1,30 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.internal.movie_stats import rebuild_movie_stats
+from app.models.movies import Movie, MovieYearStats
+
+
+@pytest.mark.anyio
+async def test_rebuild_movie_stats(engine: AsyncEngine, session: AsyncSession) -> None:
+    session.add(Movie(title="Moana", year=2016, runtime=107))
+    session.add(Movie(title="Arrival", year=2016, runtime=116))
+    session.add(Movie(title="The Martian", year=2015, runtime=151))
+    await session.commit()
+    conn = await session.connection()
+    await conn.exec_driver_sql("UPDATE movie_year_stats SET movies = 42")
+    await conn.exec_driver_sql("INSERT INTO movie_year_stats VALUES (1900, 1, 60)")
+    await session.commit()
+
+    assert await rebuild_movie_stats(engine) == 2
+
+    result = await session.exec(
+        select(MovieYearStats).order_by(col(MovieYearStats.year))
+    )
+    stats = result.all()
+    assert [(s.year, s.movies, s.runtime_total) for s in stats] == [
+        (2015, 1, 151),
+        (2016, 2, 223),
+    ]
@@ -0,0 +1,21 @@
+import pytest
+from fastapi.responses import JSONResponse
+
+from app.internal import responses
+from app.internal.responses import render_json
+
+CONTENT = [
+    {"title": "Amélie", "year": 2001, "runtime": 122, "id": 1},
+    {"title": '"Quoted" \\ 千と千尋の神隠し 🎬', "year": 2001, "runtime": 125, "id": 2},
+    {"title": "".join(chr(i) for i in range(0x80)) + "  ", "id": 3},
+    {"id": 2**70},
+]
+
+
+@pytest.mark.parametrize("orjson", [responses.orjson, None])
+def test_render_json_matches_json_response(
+    monkeypatch: pytest.MonkeyPatch, orjson: object
+) -> None:
+    monkeypatch.setattr(responses, "orjson", orjson)
+    assert render_json(CONTENT) == JSONResponse(CONTENT).body
+    assert render_json([]) == JSONResponse([]).body
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from app.internal.singleflight import SingleFlight
+
+
+@pytest.mark.anyio
+async def test_concurrent_calls_share_a_read() -> None:
+    flight: SingleFlight[str, int] = SingleFlight()
+    reads = 0
+
+    async def read() -> int:
+        nonlocal reads
+        reads += 1
+        result = reads
+        await asyncio.sleep(0.01)
+        return result
+
+    assert await asyncio.gather(*(flight.do("a", read) for _ in range(10))) == [1] * 10
+    assert (flight.flights, flight.shared) == (1, 9)
+
+    # Once the read is done, the next call reads again.
+    assert await flight.do("a", read) == 2
+    assert await asyncio.gather(flight.do("a", read), flight.do("b", read)) == [3, 4]
+
+
+@pytest.mark.anyio
+async def test_errors_reach_every_caller() -> None:
+    flight: SingleFlight[str, int] = SingleFlight()
+
+    async def read() -> int:
+        await asyncio.sleep(0.01)
+        raise LookupError("a")
+
+    results = await asyncio.gather(
+        *(flight.do("a", read) for _ in range(3)), return_exceptions=True
+    )
+    assert [type(result) for result in results] == [LookupError] * 3
+    assert flight._tasks == {}
+
+
+@pytest.mark.anyio
+async def test_cancelled_caller_does_not_cancel_the_read() -> None:
+    flight: SingleFlight[str, int] = SingleFlight()
+    done = asyncio.Event()
+
+    async def read() -> int:
+        await done.wait()
+        return 1
+
+    first = asyncio.create_task(flight.do("a", read))
+    second = asyncio.create_task(flight.do("a", read))
+    await asyncio.sleep(0)
+    first.cancel()
+    done.set()
+
+    assert await second == 1
+    with pytest.raises(asyncio.CancelledError):
+        await first
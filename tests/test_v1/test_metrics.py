@@ -0,0 +1,34 @@
+import pytest
+from httpx import AsyncClient
+
+from app.internal.metrics import http_request_duration, http_requests
+
+
+@pytest.mark.anyio
+async def test_metrics(client: AsyncClient) -> None:
+    labels = ("/v1/movies/{movie_id}", "GET", "404")
+    before = http_requests.values[labels]
+
+    assert (await client.get("/v1/movies/1")).status_code == 404
+    assert (await client.get("/v1/movies/2")).status_code == 404
+    assert http_requests.values[labels] == before + 2
+    assert sum(http_request_duration.counts[labels[:2]]) >= 2
+
+    response = await client.get("/v1/metrics")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    assert "# TYPE http_request_duration_seconds histogram" in lines
+    assert (
+        'http_requests_total{route="/v1/movies/{movie_id}",method="GET",status="404"}'
+        f" {int(before) + 2}"
+    ) in lines
+    assert any(line.startswith('cache_hit_ratio{cache="movies"}') for line in lines)
+
+
+@pytest.mark.anyio
+async def test_metrics_unmatched(client: AsyncClient) -> None:
+    labels = ("unmatched", "GET", "404")
+    before = http_requests.values[labels]
+    assert (await client.get("/v1/nothing/here")).status_code == 404
+    assert http_requests.values[labels] == before + 1
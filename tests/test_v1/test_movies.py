@@ -1,9 +1,16 @@
+import asyncio
+import json
+import time
+
 import pytest
+from fastapi.responses import JSONResponse
 from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app import version
-from app.models.movies import Movie
+from app.models.movies import Movie, MoviePublic
 
 
 @pytest.mark.anyio
@@ -42,6 +49,7 @@ async def test_read_movies(session: AsyncSession, client: AsyncClient):
     session.add(movie_1)
     session.add(movie_2)
     await session.commit()
+    await session.refresh(movie_1)
 
     response = await client.get("/v1/movies")
     data = response.json()
@@ -76,21 +84,138 @@ async def test_read_movie(session: AsyncSession, client: AsyncClient):
     assert data["id"] == movie.id
 
 
+@pytest.mark.anyio
+async def test_batch_get_movies(session: AsyncSession, client: AsyncClient) -> None:
+    session.add(Movie(title="Moana", year=2016, runtime=107))
+    session.add(Movie(title="The Martian", year=2015, runtime=151))
+    session.add(Movie(title="Arrival", year=2016, runtime=116))
+    await session.commit()
+    # Cached, so only the other ids are looked up.
+    await client.get("/v1/movies/2")
+
+    response = await client.post("/v1/movies/batch-get", json={"ids": [3, 42, 2, 3, 1]})
+    data = response.json()
+
+    assert response.status_code == 200
+    assert [movie["title"] for movie in data["movies"]] == [
+        "Arrival",
+        "The Martian",
+        "Moana",
+    ]
+    assert data["movies"][0] == {
+        "title": "Arrival",
+        "year": 2016,
+        "runtime": 116,
+        "id": 3,
+    }
+    assert data["missing"] == [42]
+
+
+@pytest.mark.anyio
+async def test_batch_get_movies_invalid(client: AsyncClient) -> None:
+    for ids in [[], [0], list(range(1, 102))]:
+        response = await client.post("/v1/movies/batch-get", json={"ids": ids})
+        assert response.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_update_movies(session: AsyncSession, client: AsyncClient) -> None:
+    session.add(Movie(title="Moana", year=2015, runtime=107))
+    session.add(Movie(title="The Martian", year=2014, runtime=151))
+    session.add(Movie(title="Arrival", year=2015, runtime=116))
+    await session.commit()
+
+    response = await client.patch(
+        "/v1/movies/bulk",
+        json={
+            "movies": [
+                {"id": 2, "year": 2015},
+                {"id": 42, "year": 2015},
+                {"id": 1, "year": 2016, "version": 1},
+                {"id": 3, "year": 2016, "version": 2},
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json()["results"] == [
+        {"id": 2, "status": "updated", "version": 2},
+        {"id": 42, "status": "not_found", "version": None},
+        {"id": 1, "status": "updated", "version": 2},
+        {"id": 3, "status": "conflict", "version": 1},
+    ]
+    data = (await client.get("/v1/movies")).json()
+    assert [movie["year"] for movie in data] == [2016, 2015, 2015]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "patch",
+    [
+        {"id": 1, "title": None},
+        {"id": 1, "title": ""},
+        {"id": 1, "year": 1800},
+        {"id": 1, "runtime": -3},
+        {"id": 1, "runtime": None},
+    ],
+)
+async def test_update_movies_invalid(
+    session: AsyncSession, client: AsyncClient, patch: dict
+) -> None:
+    session.add(Movie(title="Moana", year=2015, runtime=107))
+    await session.commit()
+
+    response = await client.patch("/v1/movies/bulk", json={"movies": [patch]})
+
+    assert response.status_code == 422
+    movie = (await client.get("/v1/movies/1")).json()
+    assert movie == {"id": 1, "title": "Moana", "year": 2015, "runtime": 107}
+
+
+@pytest.mark.anyio
+async def test_update_movies_duplicate_ids(client: AsyncClient) -> None:
+    response = await client.patch(
+        "/v1/movies/bulk", json={"movies": [{"id": 1}, {"id": 1, "year": 2016}]}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_delete_movies(session: AsyncSession, client: AsyncClient) -> None:
+    session.add(Movie(title="Moana", year=2016, runtime=107))
+    session.add(Movie(title="The Martian", year=2015, runtime=151))
+    await session.commit()
+    await client.get("/v1/movies/1")
+
+    response = await client.request(
+        "DELETE", "/v1/movies/bulk", json={"ids": [1, 42, 1]}
+    )
+
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json()["results"]] == [
+        "deleted",
+        "not_found",
+    ]
+    assert (await client.get("/v1/movies/1")).status_code == 404
+    assert [movie["id"] for movie in (await client.get("/v1/movies")).json()] == [2]
+
+
 @pytest.mark.anyio
 async def test_update_movie(session: AsyncSession, client: AsyncClient) -> None:
     movie = Movie(title="Moana", year=2015, runtime=107)
     session.add(movie)
     await session.commit()
     await session.refresh(movie)
+    movie_id = movie.id
 
-    response = await client.patch(f"/v1/movies/{movie.id}", json={"year": 2016})
+    response = await client.patch(f"/v1/movies/{movie_id}", json={"year": 2016})
     data = response.json()
 
     assert response.status_code == 200
     assert data["title"] == "Moana"
     assert data["year"] == 2016
     assert data["runtime"] == 107
-    assert data["id"] == movie.id
+    assert data["id"] == movie_id
 
 
 @pytest.mark.anyio
@@ -99,10 +224,484 @@ async def test_delete_movie(session: AsyncSession, client: AsyncClient) -> None:
     session.add(movie)
     await session.commit()
     await session.refresh(movie)
+    movie_id = movie.id
 
-    response = await client.delete(f"/v1/movies/{movie.id}")
+    response = await client.delete(f"/v1/movies/{movie_id}")
 
-    movie_in_db = await session.get(Movie, movie.id)
+    movie_in_db = await session.get(Movie, movie_id)
 
     assert response.status_code == 200
     assert movie_in_db is None
+
+
+@pytest.mark.anyio
+async def test_read_movies_cursor(session: AsyncSession, client: AsyncClient) -> None:
+    session.add(Movie(title="Moana", year=2016, runtime=107))
+    session.add(Movie(title="The Martian", year=2015, runtime=151))
+    session.add(Movie(title="Arrival", year=2016, runtime=116))
+    await session.commit()
+
+    response = await client.get("/v1/movies", params={"sort": "-year", "limit": 2})
+    data = response.json()
+
+    assert response.status_code == 200
+    assert [movie["title"] for movie in data] == ["Arrival", "Moana"]
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = await client.get(
+        "/v1/movies", params={"sort": "-year", "limit": 2, "cursor": cursor}
+    )
+    data = response.json()
+
+    assert response.status_code == 200
+    assert [movie["title"] for movie in data] == ["The Martian"]
+    assert "X-Next-Cursor" not in response.headers
+
+
+@pytest.mark.anyio
+async def test_read_movies_paging_bounds(client: AsyncClient) -> None:
+    # SQLite reads `LIMIT -1` as no limit at all.
+    assert (await client.get("/v1/movies?limit=-1")).status_code == 422
+    assert (await client.get("/v1/movies?limit=0")).status_code == 422
+    assert (await client.get("/v1/movies?offset=-1")).status_code == 422
+
+
+@pytest.mark.anyio
+async def test_read_movies_cursor_invalid(client: AsyncClient) -> None:
+    response = await client.get("/v1/movies", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+    response = await client.get("/v1/movies", params={"cursor": "x", "offset": 10})
+    assert response.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_search_movies(session: AsyncSession, client: AsyncClient) -> None:
+    session.add(Movie(title="Star Wars", year=1977, runtime=121))
+    session.add(Movie(title="Star Trek", year=2009, runtime=127))
+    session.add(Movie(title="The Martian", year=2015, runtime=151))
+    await session.commit()
+
+    response = await client.get("/v1/movies/search", params={"q": "sta"})
+    data = response.json()
+
+    assert response.status_code == 200
+    assert {movie["title"] for movie in data} == {"Star Wars", "Star Trek"}
+
+    response = await client.get(
+        "/v1/movies/search", params={"q": "star", "year_min": 2000}
+    )
+    data = response.json()
+
+    assert response.status_code == 200
+    assert [movie["title"] for movie in data] == ["Star Trek"]
+
+
+@pytest.mark.anyio
+async def test_search_movies_in_sync(client: AsyncClient) -> None:
+    response = await client.post(
+        "/v1/movies", json={"title": "Moana", "year": 2016, "runtime": 107}
+    )
+    movie_id = response.json()["id"]
+
+    await client.patch(f"/v1/movies/{movie_id}", json={"title": "Vaiana"})
+
+    response = await client.get("/v1/movies/search", params={"q": "moana"})
+    assert response.json() == []
+    response = await client.get("/v1/movies/search", params={"q": "vaiana"})
+    assert [movie["id"] for movie in response.json()] == [movie_id]
+
+    await client.delete(f"/v1/movies/{movie_id}")
+
+    response = await client.get("/v1/movies/search", params={"q": "vaiana"})
+    assert response.json() == []
+
+
+@pytest.mark.anyio
+async def test_import_movies(session: AsyncSession, client: AsyncClient) -> None:
+    lines = [
+        '{"title": "Moana", "year": 2016, "runtime": 107}',
+        '{"title": "The Martian", "year": 2015}',
+        "",
+        '{"title": "Arrival", "year": 2016, "runtime": 116}',
+        "{not json",
+        '{"title": "' + "x" * 70_000 + '", "year": 2016, "runtime": 1}',
+        '{"title": "Her", "year": 2013, "runtime": 126}',
+    ]
+
+    response = await client.post(
+        "/v1/movies/bulk",
+        params={"batch_size": 2},
+        content="\n".join(lines).encode(),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data["inserted"] == 3
+    assert data["failed"] == 3
+    assert [error["line"] for error in data["errors"]] == [2, 5, 6]
+    assert data["errors"][0]["errors"][0]["loc"] == ["runtime"]
+
+    movies = (await client.get("/v1/movies")).json()
+    assert [movie["title"] for movie in movies] == ["Moana", "Arrival", "Her"]
+
+
+@pytest.mark.anyio
+async def test_export_movies(session: AsyncSession, client: AsyncClient) -> None:
+    session.add(Movie(title="Moana", year=2016, runtime=107))
+    session.add(Movie(title="Léon", year=1994, runtime=110))
+    session.add(Movie(title="Arrival, The", year=2016, runtime=116))
+    await session.commit()
+
+    response = await client.get("/v1/movies/export", params={"chunk_size": 2})
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {"title": "Moana", "year": 2016, "runtime": 107, "id": 1},
+        {"title": "Léon", "year": 1994, "runtime": 110, "id": 2},
+        {"title": "Arrival, The", "year": 2016, "runtime": 116, "id": 3},
+    ]
+
+    response = await client.get(
+        "/v1/movies/export", params={"format": "csv", "chunk_size": 2}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/csv")
+    assert response.text.splitlines() == [
+        "title,year,runtime,id",
+        "Moana,2016,107,1",
+        "Léon,1994,110,2",
+        '"Arrival, The",2016,116,3',
+    ]
+
+
+@pytest.mark.anyio
+async def test_movie_cache(session: AsyncSession, client: AsyncClient) -> None:
+    movie = Movie(title="Moana", year=2015, runtime=107)
+    session.add(movie)
+    await session.commit()
+
+    assert (await client.get("/v1/movies/1")).json()["year"] == 2015
+    assert (await client.get("/v1/movies")).json()[0]["year"] == 2015
+    assert (await client.get("/v1/movies/1")).json()["year"] == 2015
+    assert (await client.get("/v1/movies")).json()[0]["year"] == 2015
+    stats = (await client.get("/v1/healthcheck/caches")).json()
+    assert (stats["movies"]["hits"], stats["movies"]["misses"]) == (1, 1)
+    assert (stats["movie_pages"]["hits"], stats["movie_pages"]["misses"]) == (1, 1)
+
+    await client.patch("/v1/movies/1", json={"year": 2016})
+    assert (await client.get("/v1/movies/1")).json()["year"] == 2016
+    assert (await client.get("/v1/movies")).json()[0]["year"] == 2016
+    await session.refresh(movie)
+    assert movie.version == 2
+
+    await client.delete("/v1/movies/1")
+    assert (await client.get("/v1/movies/1")).status_code == 404
+    assert (await client.get("/v1/movies")).json() == []
+
+
+@pytest.mark.anyio
+async def test_read_movie_etag(session: AsyncSession, client: AsyncClient) -> None:
+    session.add(Movie(title="Moana", year=2015, runtime=107))
+    await session.commit()
+
+    response = await client.get("/v1/movies/1")
+    etag = response.headers["ETag"]
+    assert etag == '"1-1"'
+
+    response = await client.get("/v1/movies/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    page = await client.get("/v1/movies")
+    response = await client.get(
+        "/v1/movies", headers={"If-None-Match": page.headers["ETag"]}
+    )
+    assert response.status_code == 304
+
+    await client.patch("/v1/movies/1", json={"year": 2016})
+    response = await client.get("/v1/movies/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"1-2"'
+    response = await client.get(
+        "/v1/movies", headers={"If-None-Match": page.headers["ETag"]}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.anyio
+async def test_writes_are_single_statements(
+    engine: AsyncEngine, client: AsyncClient
+) -> None:
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, *args) -> None:
+        statements.append(statement.split()[0])
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    movie = {"title": "Moana", "year": 2015, "runtime": 107}
+    assert (await client.post("/v1/movies", json=movie)).status_code == 200
+    assert (await client.patch("/v1/movies/1", json={"year": 2016})).status_code == 200
+    assert (await client.delete("/v1/movies/1")).status_code == 200
+    assert (await client.delete("/v1/movies/1")).status_code == 404
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert statements == ["INSERT", "UPDATE", "DELETE", "DELETE"]
+
+
+@pytest.mark.anyio
+async def test_update_movie_if_match(
+    session: AsyncSession, client: AsyncClient
+) -> None:
+    session.add(Movie(title="Moana", year=2015, runtime=107))
+    await session.commit()
+
+    response = await client.patch(
+        "/v1/movies/1", json={"year": 2016}, headers={"If-Match": '"1-1"'}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"1-2"'
+
+    response = await client.patch(
+        "/v1/movies/1", json={"year": 2017}, headers={"If-Match": '"1-1"'}
+    )
+    assert response.status_code == 412
+    assert response.json() == {"detail": "Movie Was Modified"}
+    assert (await client.get("/v1/movies/1")).json()["year"] == 2016
+
+    response = await client.patch(
+        "/v1/movies/2", json={"year": 2017}, headers={"If-Match": '"2-1"'}
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_deleted_movie_etag_is_not_reused(client: AsyncClient) -> None:
+    movie = {"title": "Moana", "year": 2015, "runtime": 107}
+    await client.post("/v1/movies", json=movie)
+    etag = (await client.get("/v1/movies/1")).headers["ETag"]
+    assert (await client.delete("/v1/movies/1")).status_code == 200
+
+    response = await client.post("/v1/movies", json=movie)
+    assert response.json()["id"] == 2
+    assert (await client.get("/v1/movies/2")).headers["ETag"] != etag
+    response = await client.patch(
+        "/v1/movies/1", json={"year": 2016}, headers={"If-Match": etag}
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_read_movies_body(session: AsyncSession, client: AsyncClient) -> None:
+    session.add(Movie(title="Amélie", year=2001, runtime=122))
+    session.add(Movie(title='"Spirited Away" 千と千尋の神隠し', year=2001, runtime=125))
+    await session.commit()
+
+    response = await client.get("/v1/movies")
+
+    assert response.headers["Content-Type"] == "application/json"
+    # Byte for byte what FastAPI renders for a `list[MoviePublic]` response model.
+    expected = [
+        MoviePublic(title="Amélie", year=2001, runtime=122, id=1).model_dump(),
+        MoviePublic(
+            title='"Spirited Away" 千と千尋の神隠し', year=2001, runtime=125, id=2
+        ).model_dump(),
+    ]
+    assert response.content == JSONResponse(expected).body
+
+
+@pytest.mark.anyio
+async def test_movie_changes(session: AsyncSession, client: AsyncClient) -> None:
+    session.add(Movie(title="Moana", year=2015, runtime=107))
+    session.add(Movie(title="The Martian", year=2015, runtime=151))
+    session.add(Movie(title="Arrival", year=2016, runtime=116))
+    await session.commit()
+
+    response = await client.get("/v1/movies/changes", params={"limit": 2})
+    data = response.json()
+
+    assert response.status_code == 200
+    assert [change["id"] for change in data["changes"]] == [1, 2]
+    assert data["changes"][0] == {
+        "seq": 1,
+        "id": 1,
+        "deleted": False,
+        "movie": {"title": "Moana", "year": 2015, "runtime": 107, "id": 1},
+    }
+    since = (await client.get("/v1/movies/changes")).json()["next_since"]
+    assert since == 3
+
+    await client.patch("/v1/movies/1", json={"year": 2016})
+    await client.patch("/v1/movies/1", json={"runtime": 108})
+    await client.delete("/v1/movies/2")
+
+    response = await client.get("/v1/movies/changes", params={"since": since})
+    data = response.json()
+
+    assert [(change["id"], change["deleted"]) for change in data["changes"]] == [
+        (1, False),
+        (2, True),
+    ]
+    assert data["changes"][0]["movie"]["runtime"] == 108
+    assert data["changes"][1]["movie"] is None
+    assert data["next_since"] == 6
+
+    response = await client.get("/v1/movies/changes", params={"since": 6})
+    assert response.json() == {"changes": [], "next_since": 6}
+
+
+@pytest.mark.anyio
+async def test_movie_changes_wait(client: AsyncClient) -> None:
+    async def create_movie() -> None:
+        await asyncio.sleep(0.1)
+        await client.post(
+            "/v1/movies", json={"title": "Moana", "year": 2016, "runtime": 107}
+        )
+
+    start = time.monotonic()
+    response, _ = await asyncio.gather(
+        client.get("/v1/movies/changes", params={"wait": 10}), create_movie()
+    )
+
+    assert time.monotonic() - start < 5
+    assert [change["id"] for change in response.json()["changes"]] == [1]
+
+    response = await client.get("/v1/movies/changes", params={"since": 1, "wait": 0.1})
+    assert response.json() == {"changes": [], "next_since": 1}
+
+
+async def scan_movie_stats(session: AsyncSession) -> dict:
+    # The statistics as a full scan of the catalog computes them.
+    conn = await session.connection()
+    rows = (
+        await conn.exec_driver_sql(
+            "SELECT year, count(*), avg(runtime) FROM movie GROUP BY year ORDER BY year"
+        )
+    ).all()
+    total = (
+        await conn.exec_driver_sql("SELECT count(*), avg(runtime) FROM movie")
+    ).one()
+    return {
+        "movies": total[0],
+        "average_runtime": total[1],
+        "years": [
+            {"year": year, "movies": movies, "average_runtime": average}
+            for year, movies, average in rows
+        ],
+    }
+
+
+@pytest.mark.anyio
+async def test_movie_stats(session: AsyncSession, client: AsyncClient) -> None:
+    response = await client.get("/v1/movies/stats")
+    assert response.json() == {"movies": 0, "average_runtime": None, "years": []}
+
+    for title, year, runtime in [
+        ("Moana", 2016, 107),
+        ("The Martian", 2015, 151),
+        ("Arrival", 2016, 116),
+    ]:
+        await client.post(
+            "/v1/movies", json={"title": title, "year": year, "runtime": runtime}
+        )
+    await client.post(
+        "/v1/movies/bulk",
+        content=b'{"title": "Her", "year": 2013, "runtime": 126}\n',
+    )
+    await client.patch("/v1/movies/1", json={"runtime": 108})
+    await client.patch("/v1/movies/2", json={"year": 2013})
+    await client.patch("/v1/movies/bulk", json={"movies": [{"id": 3, "year": 2017}]})
+    await client.delete("/v1/movies/4")
+
+    response = await client.get("/v1/movies/stats")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "movies": 3,
+        "average_runtime": (108 + 151 + 116) / 3,
+        "years": [
+            {"year": 2013, "movies": 1, "average_runtime": 151},
+            {"year": 2016, "movies": 1, "average_runtime": 108},
+            {"year": 2017, "movies": 1, "average_runtime": 116},
+        ],
+    }
+    assert response.json() == await scan_movie_stats(session)
+
+
+@pytest.mark.anyio
+async def test_concurrent_reads_share_a_query(
+    engine: AsyncEngine, session: AsyncSession, client: AsyncClient
+) -> None:
+    session.add(Movie(title="Moana", year=2016, runtime=107))
+    await session.commit()
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, *args) -> None:
+        statements.append(statement.split()[0])
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    responses = await asyncio.gather(
+        *(client.get("/v1/movies/1") for _ in range(5)),
+        *(client.get("/v1/movies/2") for _ in range(5)),
+        *(client.get("/v1/movies") for _ in range(5)),
+    )
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert [response.status_code for response in responses] == [200] * 5 + [404] * 5 + [
+        200
+    ] * 5
+    assert statements == ["SELECT"] * 3
+
+    await client.patch("/v1/movies/1", json={"year": 2017})
+    assert (await client.get("/v1/movies")).json()[0]["year"] == 2017
+
+
+@pytest.mark.anyio
+async def test_read_movies_filters(session: AsyncSession, client: AsyncClient) -> None:
+    session.add(Movie(title="Star Wars", year=1977, runtime=121))
+    session.add(Movie(title="Moana", year=2016, runtime=107))
+    session.add(Movie(title="star Trek", year=2009, runtime=127))
+    session.add(Movie(title="Stargate", year=1994, runtime=116))
+    session.add(Movie(title="Arrival", year=2016, runtime=116))
+    await session.commit()
+
+    async def titles(**params) -> list[str]:
+        response = await client.get("/v1/movies", params=params)
+        assert response.status_code == 200
+        return [movie["title"] for movie in response.json()]
+
+    assert await titles(year_min=1990, year_max=2010) == ["star Trek", "Stargate"]
+    assert await titles(runtime_max=116, sort="-runtime") == [
+        "Arrival",
+        "Stargate",
+        "Moana",
+    ]
+    assert await titles(title_prefix="STAR", sort="title") == [
+        "Star Wars",
+        "Stargate",
+        "star Trek",
+    ]
+    assert await titles(title_prefix="star ", year_min=2000) == ["star Trek"]
+    assert await titles(title_prefix="stars") == []
+
+    response = await client.get(
+        "/v1/movies", params={"year_min": 1990, "sort": "year", "limit": 2}
+    )
+    assert [movie["title"] for movie in response.json()] == ["Stargate", "star Trek"]
+    response = await client.get(
+        "/v1/movies",
+        params={
+            "year_min": 1990,
+            "sort": "year",
+            "limit": 2,
+            "cursor": response.headers["X-Next-Cursor"],
+        },
+    )
+    assert [movie["title"] for movie in response.json()] == ["Moana", "Arrival"]
+
+    response = await client.get("/v1/movies", params={"title_prefix": ""})
+    assert response.status_code == 422
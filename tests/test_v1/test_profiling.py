@@ -0,0 +1,46 @@
+import json
+import time
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.internal.profiling import install_profiling, sign_profile_request
+from app.middlewares import ProfilerMiddleware
+
+
+@pytest.fixture()
+def profiles(app: FastAPI, engine: AsyncEngine, tmp_path: Path) -> Path:
+    install_profiling([engine])
+    app.add_middleware(ProfilerMiddleware, directory=str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.anyio
+async def test_profile_request(client: AsyncClient, profiles: Path) -> None:
+    token = sign_profile_request("GET", "/v1/movies", int(time.time()) + 60)
+    response = await client.get("/v1/movies", headers={"X-Profile": token})
+    assert response.status_code == 200
+
+    profile_id = response.headers["X-Profile-Id"]
+    assert (profiles / f"{profile_id}.prof").exists()
+    summary = json.loads((profiles / f"{profile_id}.json").read_text())
+    assert summary["route"] == "/v1/movies"
+    assert summary["status"] == 200
+    # List pages are rendered by the endpoint, so FastAPI has nothing to serialize.
+    assert set(summary["phases"]) == {"dependencies", "endpoint"}
+    assert summary["sql"]["count"] == 1
+    assert summary["sql"]["statements"][0]["statement"].startswith("SELECT")
+
+
+@pytest.mark.anyio
+async def test_profile_request_unsigned(client: AsyncClient, profiles: Path) -> None:
+    expired = sign_profile_request("GET", "/v1/movies", int(time.time()) - 1)
+    other_path = sign_profile_request("GET", "/v1/users/me", int(time.time()) + 60)
+    for token in [expired, other_path, "1.forged"]:
+        response = await client.get("/v1/movies", headers={"X-Profile": token})
+        assert response.status_code == 200
+        assert "X-Profile-Id" not in response.headers
+    assert list(profiles.iterdir()) == []
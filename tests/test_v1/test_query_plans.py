@@ -0,0 +1,188 @@
+import itertools
+import math
+import random
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncGenerator, AsyncIterator, get_args
+
+import pytest
+from sqlalchemy import Select, create_engine, insert, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from sqlmodel import SQLModel, select
+
+from app.internal.pagination import encode_cursor
+from app.models.movies import Movie, now
+from app.models.users import User
+from app.routers.v1.movies import (
+    SORT_KEYS,
+    MovieSort,
+    page_index,
+    page_statement,
+)
+
+FILTERS: dict[str, dict[str, Any]] = {
+    "none": {},
+    "year": {"year_min": 1990, "year_max": 1999},
+    "year_min": {"year_min": 2020},
+    "year_min_any": {"year_min": 1888},
+    "year_max": {"year_max": 1950},
+    "runtime": {"runtime_min": 90, "runtime_max": 120},
+    "runtime_min": {"runtime_min": 180},
+    "runtime_min_any": {"runtime_min": 1},
+    "title_prefix": {"title_prefix": "star"},
+    "year_runtime": {"year_min": 2000, "runtime_max": 90},
+    "all": {
+        "year_min": 2000,
+        "year_max": 2010,
+        "runtime_min": 90,
+        "runtime_max": 120,
+        "title_prefix": "the",
+    },
+}
+SORTS: tuple[MovieSort, ...] = get_args(MovieSort)
+MOVIES = 10_000
+
+
+@pytest.fixture(scope="module")
+def analyzed_database(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """A catalog of `MOVIES` movies with the statistics of `ANALYZE`."""
+    path = tmp_path_factory.mktemp("query_plans") / "movies.db"
+    engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(engine)
+    rng = random.Random(0)
+    words = "star wars the night day dark king love moon sun".split()
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Movie),
+            [
+                {
+                    "title": " ".join(rng.choices(words, k=3)).title(),
+                    "year": rng.randint(1920, 2024),
+                    "runtime": rng.randint(60, 200),
+                    "created_at": now(),
+                    "version": 1,
+                }
+                for _ in range(MOVIES)
+            ],
+        )
+        conn.execute(text("ANALYZE"))
+    engine.dispose()
+    return path
+
+
+@pytest.fixture(params=["empty", "analyzed"])
+async def plan_engine(
+    request: pytest.FixtureRequest, engine: AsyncEngine, analyzed_database: Path
+) -> AsyncGenerator[AsyncEngine, None]:
+    if request.param == "empty":
+        yield engine
+        return
+    analyzed_engine = create_async_engine(f"sqlite+aiosqlite:///{analyzed_database}")
+    yield analyzed_engine
+    await analyzed_engine.dispose()
+
+
+async def query_plan(conn: AsyncConnection, statement: Select) -> list[str]:
+    compiled = statement.compile(conn.sync_connection)
+    params = tuple(compiled.params[name] for name in compiled.positiontup or [])
+    result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params)
+    return [row[3] for row in result]
+
+
+@asynccontextmanager
+async def counting_instructions(conn: AsyncConnection) -> AsyncIterator[list[int]]:
+    """Counts the virtual machine instructions SQLite runs, in tens."""
+    tens = [0]
+
+    def count() -> int:
+        tens[0] += 1
+        return 0
+
+    driver = (await conn.get_raw_connection()).driver_connection
+    assert driver is not None
+    await driver.set_progress_handler(count, 10)
+    try:
+        yield tens
+    finally:
+        await driver.set_progress_handler(None, 0)
+
+
+def cursor(sort: str) -> str:
+    values: dict[str, Any] = {"id": 5000, "title": "Love", "year": 1970, "runtime": 130}
+    return encode_cursor(
+        sort, tuple(values[key] for key in SORT_KEYS[sort.lstrip("-")])
+    )
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "filter_name, sort, paging",
+    itertools.product(FILTERS, SORTS, ["offset", "cursor"]),
+)
+async def test_list_movies_query_plan(
+    plan_engine: AsyncEngine, filter_name: str, sort: MovieSort, paging: str
+) -> None:
+    offset = 100 if paging == "offset" else 0
+    limit = 100
+    values = FILTERS[filter_name]
+    filters = (
+        values.get("year_min"),
+        values.get("year_max"),
+        values.get("runtime_min"),
+        values.get("runtime_max"),
+        values.get("title_prefix"),
+    )
+
+    columns = {name.split("_")[0] for name in values}
+
+    def statement(indexed: str | None) -> Select:
+        return page_statement(
+            offset=offset,
+            cursor=cursor(sort) if paging == "cursor" else None,
+            limit=limit,
+            sort=sort,
+            filters=filters,
+            indexed=indexed,
+        )
+
+    async with plan_engine.connect() as conn:
+        async with counting_instructions(conn) as instructions:
+            indexed = await page_index(conn, offset + limit, sort, filters)
+            await conn.execute(statement(indexed))
+        plan = await query_plan(conn, statement(indexed))
+        alternatives = []
+        for other in [None, *columns]:
+            async with counting_instructions(conn) as other_instructions:
+                await conn.execute(statement(other))
+            alternatives.append(other_instructions[0])
+
+    # A page either reads the rows that match from an index and sorts them, or
+    # walks an index in the order of `sort`, which stops once the page is full.
+    scans = [step for step in plan if step.startswith("SCAN")]
+    sorted_in_temp_b_tree = any("TEMP B-TREE" in step for step in plan)
+    assert not (scans and sorted_in_temp_b_tree), plan
+    # A page sorted by a column it has a range on reads the range in order. The
+    # `NOCASE` title index is not in the order of `sort=title`.
+    ranges = columns - {"title"}
+    if sort.lstrip("-") in ranges:
+        assert not sorted_in_temp_b_tree, plan
+    # Whether few movies match or all of them do, a page costs at most twice the
+    # cheapest of the walk and the range of each filtered index, plus the tens of
+    # instructions it takes to count up to about `sqrt(rows * n)` entries of each
+    # index, and to sample the walk, to pick between them.
+    counting = (len(columns) + 1) * math.isqrt((offset + limit) * MOVIES)
+    assert instructions[0] <= 2 * min(alternatives) + counting, (
+        instructions[0],
+        alternatives,
+        plan,
+    )
+
+
+@pytest.mark.anyio
+async def test_user_lookup_query_plan(engine: AsyncEngine) -> None:
+    statement = select(User).where(User.username == "johndoe")
+
+    async with engine.connect() as conn:
+        plan = await query_plan(conn, statement)
+
+    assert plan == ["SEARCH user USING INDEX ix_user_username (username=?)"]
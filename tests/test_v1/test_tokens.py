@@ -0,0 +1,164 @@
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+from fastapi import Request
+from httpx import ASGITransport, AsyncClient
+from passlib.context import CryptContext
+from sqlalchemy import insert
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.dependencies import READ_METHODS, get_engine, get_read_session
+from app.internal import security
+from app.internal.database import create_engine
+from app.internal.security import PasswordVerifier
+from app.main import create_app
+from app.models.users import User
+
+fast_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+
+
+@pytest.fixture()
+async def user(session: AsyncSession) -> User:
+    # Hashed with fewer rounds than the application uses, so it gets rehashed.
+    hashed_password = fast_context.hash("secret")
+    user = User(username="johndoe", hashed_password=hashed_password)
+    session.add(user)
+    await session.commit()
+    await session.refresh(user)
+    return user
+
+
+@pytest.mark.anyio
+async def test_login(session: AsyncSession, client: AsyncClient, user: User) -> None:
+    old_hash = user.hashed_password
+
+    response = await client.post(
+        "/v1/tokens", data={"username": "johndoe", "password": "secret"}
+    )
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data["token_type"] == "bearer"
+    await session.refresh(user)
+    assert user.hashed_password != old_hash
+    assert security.pwd_context.verify("secret", user.hashed_password)
+
+
+@pytest.mark.anyio
+async def test_login_incorrect_password(client: AsyncClient, user: User) -> None:
+    response = await client.post(
+        "/v1/tokens", data={"username": "johndoe", "password": "wrong"}
+    )
+    assert response.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_login_overloaded(
+    monkeypatch: pytest.MonkeyPatch, client: AsyncClient, user: User
+) -> None:
+    verifier = PasswordVerifier(1, max_pending=0, queue_timeout=0.1)
+    monkeypatch.setattr(security, "password_verifier", verifier)
+
+    await verifier.semaphore.acquire()
+    response = await client.post(
+        "/v1/tokens", data={"username": "johndoe", "password": "secret"}
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+@pytest.mark.anyio
+async def test_password_verifier_queue_timeout() -> None:
+    verifier = PasswordVerifier(1, max_pending=10, queue_timeout=0.05)
+    hashed_password = fast_context.hash("secret")
+
+    await verifier.semaphore.acquire()
+    with pytest.raises(security.PasswordVerifierOverloadedError):
+        await verifier.verify_and_update("secret", hashed_password)
+    verifier.semaphore.release()
+
+    verifier.queue_timeout = 5
+    results = await asyncio.gather(
+        verifier.verify_and_update("secret", hashed_password),
+        verifier.verify_and_update("wrong", hashed_password),
+    )
+    assert [verified for verified, _ in results] == [True, False]
+
+
+@pytest.mark.anyio
+async def test_concurrent_logins_do_not_hold_the_writer(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    # The conftest engine is a single shared connection, so this test runs against
+    # a writer with one connection and a pool of readers, as in production.
+    path = str(tmp_path / "test.db")
+    writer = create_engine(path)
+    readers = create_engine(path, pool_size=4, readonly=True)
+    async with writer.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.execute(
+            insert(User),
+            [
+                {"username": f"user{i}", "hashed_password": fast_context.hash("secret")}
+                for i in range(4)
+            ],
+        )
+
+    def slow_verify_and_update(password: str, hashed_password: str):
+        time.sleep(0.3)
+        return True, fast_context.hash(password)
+
+    monkeypatch.setattr(
+        security,
+        "password_verifier",
+        PasswordVerifier(4, max_pending=0, queue_timeout=1),
+    )
+    monkeypatch.setattr(
+        security.pwd_context, "verify_and_update", slow_verify_and_update
+    )
+
+    async def get_read_session_override():
+        async with AsyncSession(readers) as session:
+            yield session
+
+    app = create_app(enable_rate_limiter=False)
+
+    def get_engine_override(request: Request):
+        return readers if request.method in READ_METHODS else writer
+
+    app.dependency_overrides[get_engine] = get_engine_override
+    app.dependency_overrides[get_read_session] = get_read_session_override
+
+    async def login(username: str) -> float:
+        response = await client.post(
+            "/v1/tokens", data={"username": username, "password": "secret"}
+        )
+        assert response.status_code == 200
+        return time.perf_counter() - start
+
+    async def write() -> float:
+        # Starts once the logins are all waiting for bcrypt.
+        await asyncio.sleep(0.1)
+        async with writer.begin() as conn:
+            await conn.execute(insert(User), {"username": "new", "hashed_password": ""})
+        return time.perf_counter() - start
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app),  # type: ignore
+        base_url="http://test",
+    ) as client:
+        start = time.perf_counter()
+        *logins, written = await asyncio.gather(
+            *(login(f"user{i}") for i in range(4)), write()
+        )
+
+    # The four verifications run side by side, and the unrelated write does not
+    # wait for them.
+    assert max(logins) < 0.6
+    assert written < 0.3
+    await writer.dispose()
+    await readers.dispose()
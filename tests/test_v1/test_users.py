@@ -0,0 +1,87 @@
+import datetime as dt
+
+import pytest
+from httpx import AsyncClient
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.dependencies import token_cache, user_cache
+from app.internal.security import create_access_token
+from app.models.users import User
+
+
+@pytest.fixture()
+async def user(session: AsyncSession) -> User:
+    user = User(username="johndoe", hashed_password="unused")
+    session.add(user)
+    await session.commit()
+    await session.refresh(user)
+    return user
+
+
+@pytest.fixture()
+def headers(user: User) -> dict[str, str]:
+    token = create_access_token({"sub": user.username})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.anyio
+async def test_read_users_me(
+    client: AsyncClient, user: User, headers: dict[str, str]
+) -> None:
+    for _ in range(3):
+        response = await client.get("/v1/users/me", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["username"] == "johndoe"
+
+    assert (token_cache.hits, token_cache.misses) == (2, 1)
+    assert (user_cache.hits, user_cache.misses) == (2, 1)
+
+    response = await client.get("/v1/healthcheck/caches")
+    assert response.json()["users"]["hit_rate"] == pytest.approx(2 / 3)
+
+
+@pytest.mark.anyio
+async def test_read_users_me_invalid_token(client: AsyncClient) -> None:
+    response = await client.get(
+        "/v1/users/me", headers={"Authorization": "Bearer invalid"}
+    )
+    assert response.status_code == 401
+    assert len(token_cache) == 0
+
+
+@pytest.mark.anyio
+async def test_read_users_me_expired_token(client: AsyncClient, user: User) -> None:
+    token = create_access_token({"sub": user.username}, dt.timedelta(seconds=-1))
+    response = await client.get(
+        "/v1/users/me", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 401
+    assert len(token_cache) == 0
+
+
+@pytest.mark.anyio
+async def test_disabled_user_invalidated(
+    session: AsyncSession, client: AsyncClient, user: User, headers: dict[str, str]
+) -> None:
+    assert (await client.get("/v1/users/me", headers=headers)).status_code == 200
+
+    user.disabled = True
+    session.add(user)
+    await session.commit()
+
+    response = await client.get("/v1/users/me", headers=headers)
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Inactive User"}
+
+
+@pytest.mark.anyio
+async def test_deleted_user_invalidated(
+    session: AsyncSession, client: AsyncClient, user: User, headers: dict[str, str]
+) -> None:
+    assert (await client.get("/v1/users/me", headers=headers)).status_code == 200
+
+    await session.delete(user)
+    await session.commit()
+
+    response = await client.get("/v1/users/me", headers=headers)
+    assert response.status_code == 401
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.internal.writes import GroupCommitWriter
+from app.models.movies import Movie
+
+
+@pytest.mark.anyio
+async def test_group_commit(engine: AsyncEngine, session: AsyncSession) -> None:
+    writer = GroupCommitWriter(engine, window=0.01, max_batch=10)
+    commits: list[object] = []
+    event.listen(engine.sync_engine, "commit", commits.append)
+
+    def create(title: str):
+        async def write(session: AsyncSession) -> int | None:
+            if not title:
+                raise ValueError("Empty Title")
+            movie = Movie(title=title, year=2016, runtime=107)
+            session.add(movie)
+            await session.flush()
+            return movie.id
+
+        return write
+
+    titles = [f"Movie {i}" for i in range(15)] + [""]
+    results = await asyncio.gather(
+        *(writer.run(create(title)) for title in titles), return_exceptions=True
+    )
+    await writer.close()
+
+    assert sorted(results[:-1]) == list(range(1, 16))  # type: ignore[type-var]
+    assert isinstance(results[-1], ValueError)
+    count = await session.exec(select(func.count()).select_from(Movie))
+    assert count.one() == 15
+    # A batch of 10 and a batch of 6, which fails and is retried one by one.
+    assert len(commits) == 1 + 5
+
+
+@pytest.mark.anyio
+async def test_group_commit_app(
+    engine: AsyncEngine, app: FastAPI, client: AsyncClient
+) -> None:
+    app.state.group_commit_writer = GroupCommitWriter(engine)
+
+    responses = await asyncio.gather(
+        *(
+            client.post(
+                "/v1/movies", json={"title": f"Movie {i}", "year": 2016, "runtime": 1}
+            )
+            for i in range(20)
+        )
+    )
+    assert {response.status_code for response in responses} == {200}
+
+    response = await client.patch("/v1/movies/1", json={"year": 2017})
+    assert response.json()["year"] == 2017
+    response = await client.patch("/v1/movies/100", json={"year": 2017})
+    assert response.status_code == 404
+    assert (await client.delete("/v1/movies/1")).json() == {"ok": True}
+    assert (await client.get("/v1/movies/1")).status_code == 404
+    await app.state.group_commit_writer.close()